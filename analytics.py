@@ -0,0 +1,88 @@
+"""Vectorized progress analytics over a user's attempt history, memoized on the store version"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from performance_store import shared_store
+from telemetry import traced
+
+ROLLING_WINDOW = 5
+DAILY_ROLLING_DAYS = 7
+PERCENTILES = [0.25, 0.5, 0.75, 0.9]
+
+
+def attempts_frame(columns: Dict[str, List[Any]]) -> pd.DataFrame:
+    """DataFrame of attempts (as returned by PerformanceStore.attempt_columns) sorted by time"""
+    df = pd.DataFrame(columns)
+    if df.empty:
+        return pd.DataFrame(columns=['category', 'question_id', 'topic', 'score', 'time_to_answer',
+                                     'created_at', 'timestamp'])
+    df['timestamp'] = pd.to_datetime(df['created_at'], unit='s')
+    df['score'] = df['score'].astype('float64')
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+@traced("analytics.build_report")
+def build_report(df: pd.DataFrame, window: int = ROLLING_WINDOW) -> Dict[str, pd.DataFrame]:
+    """Summary, rolling, daily and per-topic views for every category, using group-bys only"""
+    if df.empty:
+        return {'summary': pd.DataFrame(), 'rolling': pd.DataFrame(), 'daily': pd.DataFrame(),
+                'daily_rolling': pd.DataFrame(), 'topics': pd.DataFrame()}
+
+    by_category = df.groupby('category', sort=True)['score']
+
+    # Rolling mean of the last `window` attempts within each category
+    rolling = df[['category', 'timestamp', 'score']].copy()
+    rolling['rolling_mean'] = (
+        by_category.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+    )
+
+    # Improvement: mean of the latest window minus mean of the first window
+    first_window = df.groupby('category').head(window).groupby('category')['score'].mean()
+    last_window = df.groupby('category').tail(window).groupby('category')['score'].mean()
+    summary = by_category.agg(attempts='count', average='mean', best='max', latest='last')
+    summary['improvement'] = last_window - first_window
+    summary['avg_time_to_answer'] = df.groupby('category')['time_to_answer'].mean()
+
+    daily = (
+        df.set_index('timestamp')
+        .groupby('category')['score']
+        .resample('D')
+        .mean()
+        .unstack(level=0)
+    )
+    daily_rolling = daily.rolling(DAILY_ROLLING_DAYS, min_periods=1).mean()
+
+    topics = (
+        df.dropna(subset=['topic'])
+        .groupby(['category', 'topic'])['score']
+        .quantile(PERCENTILES)
+        .unstack()
+    )
+    if not topics.empty:
+        topics.columns = [f"p{int(q * 100)}" for q in topics.columns]
+        topics['attempts'] = df.dropna(subset=['topic']).groupby(['category', 'topic']).size()
+
+    return {
+        'summary': summary,
+        'rolling': rolling,
+        'daily': daily,
+        'daily_rolling': daily_rolling,
+        'topics': topics,
+    }
+
+
+@lru_cache(maxsize=256)
+def _cached_report(user_id: str, version: int) -> Dict[str, pd.DataFrame]:
+    return build_report(attempts_frame(shared_store().attempt_columns(user_id)))
+
+
+def progress_report(user_id: str, version: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Report for user_id; recomputed only when they have recorded a new attempt
+
+    The returned frames are shared between reruns, so callers must not mutate them.
+    """
+    if version is None:
+        version = shared_store().version(user_id)
+    return _cached_report(user_id, version)
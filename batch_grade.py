@@ -0,0 +1,169 @@
+"""Headless batch grader: grade stored mock answers from JSONL with a bounded worker pool
+
+Each input line is a JSON object with "category", "question" and "answer" (and
+optionally "id"; the line number is used otherwise). Graded records are appended to
+the output file as they finish, so the output doubles as the checkpoint: rerunning
+the same command skips every id already present there.
+
+    python batch_grade.py answers.jsonl -o graded.jsonl --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from client_pool import shared_registry
+from grading import grade_answer
+from llm_backend import backend_needs_api_key, model_for
+from prompts import CLAUDE_MODEL, MAX_TOKENS
+
+
+def read_answers(path: str, on_error: Optional[Callable[[int, str], None]] = None
+                 ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (id, record) for every non-blank line of a JSONL file
+
+    A line that is not a JSON object is skipped and reported to on_error(line_number, problem).
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                problem = f"invalid JSON: {e}"
+            else:
+                if isinstance(record, dict):
+                    yield str(record.get('id', line_number)), record
+                    continue
+                problem = "not a JSON object"
+            if on_error is not None:
+                on_error(line_number, problem)
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Ids already graded in a previous (possibly interrupted) run"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)['id']))
+            except (ValueError, KeyError):
+                # A run killed mid-write can leave a truncated last line; that item is simply regraded
+                continue
+    return done
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_batch(input_path: str, output_path: str, client, workers: int = 8,
+              model: str = CLAUDE_MODEL, max_tokens: int = MAX_TOKENS,
+              limit: int = 0) -> Dict[str, Any]:
+    """Grade every unfinished answer in input_path, streaming results to output_path"""
+    done = load_checkpoint(output_path)
+    latencies = []
+    failed = 0
+    skipped = 0
+    graded = 0
+    start = time.perf_counter()
+
+    def grade(item_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        result = grade_answer(client, record['question'], record['answer'], record['category'],
+                              model=model, max_tokens=max_tokens)
+        result.update({
+            'id': item_id,
+            'category': record['category'],
+            'graded_at': datetime.now().isoformat(),
+        })
+        return result
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+
+        def drain():
+            """Wait for at least one in-flight item and write out everything that finished"""
+            nonlocal failed, graded
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item_id = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[{item_id}] failed: {e}", file=sys.stderr)
+                    continue
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                latencies.append(result['latency'])
+                graded += 1
+
+        def malformed(line_number: int, problem: str):
+            nonlocal failed
+            failed += 1
+            print(f"[line {line_number}] failed: {problem}", file=sys.stderr)
+
+        submitted = 0
+        for item_id, record in read_answers(input_path, on_error=malformed):
+            if item_id in done:
+                skipped += 1
+                continue
+            if limit and submitted >= limit:
+                break
+            # Keep at most 2x workers items in flight so huge inputs are read lazily
+            while len(in_flight) >= workers * 2:
+                drain()
+            in_flight[pool.submit(grade, item_id, record)] = item_id
+            done.add(item_id)
+            submitted += 1
+        while in_flight:
+            drain()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'graded': graded,
+        'failed': failed,
+        'skipped': skipped,
+        'elapsed_seconds': round(elapsed, 3),
+        'items_per_second': round(graded / elapsed, 3) if elapsed else 0.0,
+        'latency_p50': round(percentile(latencies, 50), 3),
+        'latency_p95': round(percentile(latencies, 95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade mock interview answers offline")
+    parser.add_argument("input", help="JSONL file of answers")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file for graded results (also the checkpoint)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent grading calls")
+    parser.add_argument("--model", default=model_for('grading'), help="Defaults to GRADING_MODEL")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--limit", type=int, default=0, help="Grade at most this many new items")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and regrade everything")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+    if not api_key and backend_needs_api_key():
+        parser.error("ANTHROPIC_API_KEY must be set (or LLM_BACKEND=fake)")
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+
+    summary = run_batch(args.input, args.output, shared_registry().get(api_key or "local"), workers=args.workers,
+                        model=args.model, max_tokens=args.max_tokens, limit=args.limit)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
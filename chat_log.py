@@ -0,0 +1,178 @@
+"""Bounded chat transcript: recent messages in memory as compact records, older ones spilled to disk
+
+A ChatLog behaves like a read-only sequence of ChatMessage indexed from the first message
+ever sent. At most max_in_memory messages are kept in memory. Older ones are appended
+to a JSON-lines file and read back by byte offset only when a page of old messages is
+viewed or summarized.
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from array import array
+from typing import Any, Dict, List, Optional, Union
+
+
+class ChatMessage:
+    """One chat turn; roles are interned and the timestamp is epoch seconds"""
+
+    __slots__ = ('role', 'content', 'timestamp')
+
+    def __init__(self, role: str, content: str, timestamp: Optional[float] = None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def as_turn(self) -> Dict[str, str]:
+        """The {'role', 'content'} form the Messages API takes"""
+        return {'role': self.role, 'content': self.content}
+
+    def to_row(self) -> List[Any]:
+        return [self.role, round(self.timestamp, 3), self.content]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "ChatMessage":
+        role, timestamp, content = row
+        return cls(role, content, timestamp)
+
+
+class ChatLog:
+    """Chat transcript holding at most max_in_memory messages in memory"""
+
+    def __init__(self, spill_path: str, max_in_memory: int = 100):
+        self.spill_path = spill_path
+        self.max_in_memory = max(4, max_in_memory)
+        self._recent: List[ChatMessage] = []
+        self._spilled = 0
+        # Byte offset of each spilled message, rebuilt from the file when missing (e.g. after a restore)
+        self._offsets: Optional[array] = array('Q')
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._recent)
+
+    @property
+    def spilled(self) -> int:
+        """How many of the oldest messages live only on disk"""
+        return self._spilled
+
+    @property
+    def available_from(self) -> int:
+        """Index of the oldest message that can still be read (spill files are per host)"""
+        if self._spilled and not os.path.exists(self.spill_path):
+            return self._spilled
+        return 0
+
+    def append(self, role: str, content: str, timestamp: Optional[float] = None) -> ChatMessage:
+        message = ChatMessage(role, content, timestamp)
+        self._recent.append(message)
+        if len(self._recent) > self.max_in_memory:
+            # Spill down to three quarters full so the file is opened once per batch, not per message
+            self._spill(len(self._recent) - self.max_in_memory * 3 // 4)
+        return message
+
+    def _spill(self, count: int):
+        directory = os.path.dirname(self.spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        offsets = self._load_offsets()
+        with open(self.spill_path, "ab") as f:
+            for message in self._recent[:count]:
+                offsets.append(f.tell())
+                f.write(json.dumps(message.to_row(), ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        del self._recent[:count]
+        self._spilled += count
+
+    def _load_offsets(self) -> array:
+        if self._offsets is None:
+            offsets = array('Q')
+            if os.path.exists(self.spill_path):
+                with open(self.spill_path, "rb") as f:
+                    position = 0
+                    for line in f:
+                        if len(offsets) == self._spilled:
+                            break
+                        offsets.append(position)
+                        position += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def _read_spilled(self, start: int, stop: int) -> List[ChatMessage]:
+        start = max(start, self.available_from)
+        if start >= stop:
+            return []
+        offsets = self._load_offsets()
+        messages = []
+        with open(self.spill_path, "rb") as f:
+            f.seek(offsets[start])
+            for _ in range(start, min(stop, len(offsets))):
+                messages.append(ChatMessage.from_row(json.loads(f.readline())))
+        return messages
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("ChatLog slices do not support a step")
+            messages = self._read_spilled(start, min(stop, self._spilled)) if start < self._spilled else []
+            return messages + self._recent[max(start - self._spilled, 0):max(stop - self._spilled, 0)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chat log index out of range")
+        if index >= self._spilled:
+            return self._recent[index - self._spilled]
+        messages = self._read_spilled(index, index + 1)
+        if not messages:
+            raise IndexError(f"message {index} was spilled on another server")
+        return messages[0]
+
+    def __iter__(self):
+        # Iterating the whole log would read every spilled message; pages and slices are the way in
+        raise TypeError("iterate over chat_log.page(...) or a slice instead")
+
+    def page_count(self, page_size: int) -> int:
+        readable = len(self) - self.available_from
+        return max(1, -(-readable // page_size))
+
+    def page(self, number: int, page_size: int) -> List[ChatMessage]:
+        """Messages on page number, where page 0 holds the newest page_size messages"""
+        stop = len(self) - number * page_size
+        return self[max(stop - page_size, self.available_from, 0):max(stop, 0)]
+
+    def state(self) -> Dict[str, Any]:
+        """What has to be persisted to rebuild this log elsewhere: the in-memory tail and where the rest lives"""
+        return {
+            'spill_path': self.spill_path,
+            'spilled': self._spilled,
+            'recent': [message.to_row() for message in self._recent],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], max_in_memory: int = 100) -> "ChatLog":
+        log = cls(state['spill_path'], max_in_memory)
+        log._spilled = state['spilled']
+        log._offsets = None if log._spilled else array('Q')
+        log._recent = [ChatMessage.from_row(row) for row in state['recent']]
+        return log
+
+
+def _memory_messages() -> int:
+    return int(os.environ.get("CHAT_LOG_MEMORY_MESSAGES", "100"))
+
+
+def new_chat_log(user_id: str) -> ChatLog:
+    """An empty log spilling under CHAT_LOG_DIR, sized from CHAT_LOG_MEMORY_MESSAGES"""
+    directory = os.environ.get("CHAT_LOG_DIR", os.path.join("data", "chat_logs"))
+    return ChatLog(os.path.join(directory, f"{user_id}-{uuid.uuid4().hex[:8]}.jsonl"), _memory_messages())
+
+
+def restore_chat_log(state: Any, current: ChatLog) -> ChatLog:
+    """Rebuild a persisted log; a plain list of message dicts (the older format) is replayed into current"""
+    if isinstance(state, dict):
+        return ChatLog.from_state(state, _memory_messages())
+    for message in state:
+        timestamp = message.get('timestamp')
+        current.append(message['role'], message['content'],
+                       timestamp.timestamp() if hasattr(timestamp, 'timestamp') else timestamp)
+    return current
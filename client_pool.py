@@ -0,0 +1,419 @@
+"""Process-wide model client registry with token-bucket admission, jittered retries, deadlines,
+hedged attempts and a circuit breaker (see resilience.py)"""
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from llm_backend import LLMBackend, create_backend
+from resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, LatencyTracker, hedge
+from telemetry import shared_telemetry, span
+
+
+class AdmissionRejected(Exception):
+    """Raised when the request queue for an API key is full or the wait times out"""
+
+
+class TokenBucket:
+    """Token-bucket admission controller; callers block until a token is available"""
+
+    def __init__(self, rate: float, capacity: float, max_waiters: int = 64):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_waiters = max_waiters
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._waiters = 0
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Take one token, waiting up to timeout seconds; rejects when too many callers are queued"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            if self._waiters >= self.max_waiters:
+                raise AdmissionRejected(f"{self._waiters} requests already queued, try again shortly")
+            self._waiters += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise AdmissionRejected("Timed out waiting for a rate-limit slot")
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters -= 1
+
+    def queued(self) -> int:
+        with self._cond:
+            return self._waiters
+
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx/overloaded responses and connection failures are worth retrying"""
+    # Imported here so the SDK only loads once a backend has actually been created
+    import anthropic
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Failures that say the service is unhealthy (what the circuit breaker counts), as opposed to a bad request
+
+    A 429 is the service pacing this key, which the token bucket and retries already back off
+    from; counting it would let one burst open the breaker for every user.
+    """
+    if getattr(error, 'status_code', None) == 429:
+        return False
+    return isinstance(error, DeadlineExceeded) or is_retryable(error)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-suggested delay from a Retry-After header, if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def usage_record(message) -> Dict[str, Any]:
+    """Input tokens of one response split into uncached, cache-written and cache-read"""
+    usage = message.usage
+    return {
+        'at': time.time(),
+        'model': getattr(message, 'model', ''),
+        'input_tokens': usage.input_tokens or 0,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+        'output_tokens': usage.output_tokens or 0,
+    }
+
+
+class _OpenedStream:
+    """A message stream whose first text chunk has already arrived (the point a hedge races for)"""
+
+    def __init__(self, manager, stream):
+        self.manager = manager
+        self.stream = stream
+        self._closed = False
+        self._chunks = iter(stream.text_stream)
+        self._first = next(self._chunks, None)
+        self.text_stream = self._text()
+
+    def _text(self):
+        if self._first is not None:
+            yield self._first
+        yield from self._chunks
+
+    def __getattr__(self, name: str):
+        # get_final_message, current_message_snapshot, ... come from the SDK stream
+        return getattr(self.stream, name)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.manager.__exit__(None, None, None)
+
+
+class ManagedClient:
+    """Shared model backend whose calls go through admission control, retries, hedging and a circuit breaker"""
+
+    def __init__(self, backend: LLMBackend, bucket: TokenBucket, max_retries: int = 4,
+                 base_delay: float = 0.5, max_delay: float = 20.0, admission_timeout: float = 30.0,
+                 usage_history: int = 200, deadline: float = 60.0, hedge_percentile: float = 95.0,
+                 hedge_share: float = 0.1, hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.backend = backend
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.admission_timeout = admission_timeout
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_share = hedge_share
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self._trackers: Dict[Tuple[str, str, bool], LatencyTracker] = {}
+        # Each call earns hedge_share of a hedge, so hedges stay a bounded share of traffic even when everything is slow
+        self._hedge_credit = 1.0
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'retries': 0, 'rejected': 0, 'failures': 0,
+                          'deadline_exceeded': 0, 'hedged': 0, 'hedge_wins': 0}
+        self._usage = deque(maxlen=usage_history)
+        self._usage_totals = {'input_tokens': 0, 'cache_creation_input_tokens': 0,
+                              'cache_read_input_tokens': 0, 'output_tokens': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _call(self, fn: Callable[[float], Any], deadline: float) -> Any:
+        """Run fn(seconds left) under admission control with full-jitter exponential backoff, all before deadline"""
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("No response before the call's deadline")
+            try:
+                self.bucket.acquire(timeout=min(self.admission_timeout, remaining))
+            except AdmissionRejected:
+                self._count('rejected')
+                raise
+            try:
+                return fn(max(0.001, deadline - time.monotonic()))
+            except Exception as e:
+                if time.monotonic() >= deadline:
+                    raise DeadlineExceeded("No response before the call's deadline") from e
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = max(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))),
+                            retry_after_seconds(e) or 0)
+                if time.monotonic() + delay >= deadline:
+                    # The retry could not finish in time anyway
+                    raise
+                self._count('retries')
+                time.sleep(delay)
+
+    def _tracker(self, kind: str, kwargs: Dict[str, Any]) -> LatencyTracker:
+        """Latency history per kind of call; tool-use grading and chat replies take very different times"""
+        key = (kind, kwargs.get('model', ''), bool(kwargs.get('tools')))
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker(self.hedge_percentile,
+                                                               min_samples=self.hedge_min_samples)
+            return tracker
+
+    def _allow_hedge(self, peek: bool = False) -> bool:
+        """Spend a hedge credit, or with peek only check one is available"""
+        with self._lock:
+            if self._hedge_credit < 1:
+                return False
+            if not peek:
+                self._hedge_credit -= 1
+            return True
+
+    def _guarded(self, attempt: Callable[[float], Any], tracker: LatencyTracker, attributes: Dict[str, Any],
+                 discard: Callable[[Any], None] = lambda value: None) -> Any:
+        """attempt(deadline) behind the circuit breaker, hedged once it is slower than the tracker's threshold"""
+        with self._lock:
+            self._counters['calls'] += 1
+            self._hedge_credit = min(10.0, self._hedge_credit + self.hedge_share)
+        try:
+            self.breaker.before_call()
+        except CircuitOpen:
+            attributes['short_circuited'] = True
+            raise
+        deadline = time.monotonic() + self.deadline
+        delay = tracker.threshold() if self.hedge_percentile > 0 else None
+        try:
+            value, hedged, hedge_won = hedge(lambda: attempt(deadline), delay, self._allow_hedge, deadline, discard)
+        except Exception as e:
+            self._count('failures')
+            if isinstance(e, DeadlineExceeded):
+                self._count('deadline_exceeded')
+            if is_upstream_failure(e):
+                self.breaker.record(False)
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record(True)
+        attributes.update(hedged=hedged, hedge_won=hedge_won)
+        if hedged:
+            self._count('hedged')
+        if hedge_won:
+            self._count('hedge_wins')
+        return value
+
+    def _record_usage(self, message, attributes: Dict[str, Any]):
+        record = usage_record(message)
+        with self._lock:
+            self._usage.append(record)
+            for name in self._usage_totals:
+                self._usage_totals[name] += record[name]
+        attributes.update((name, record[name]) for name in
+                          ('input_tokens', 'output_tokens', 'cache_read_input_tokens'))
+
+    def create(self, **kwargs):
+        """messages.create with a deadline, admission control, retries, hedging and the circuit breaker"""
+        with span("llm.create", model=kwargs.get('model')) as attributes:
+            tracker = self._tracker('create', kwargs)
+
+            def attempt(deadline: float):
+                started = time.monotonic()
+                message = self._call(lambda remaining: self.backend.create(timeout=remaining, **kwargs), deadline)
+                tracker.observe(time.monotonic() - started)
+                return message
+
+            message = self._guarded(attempt, tracker, attributes)
+            self._record_usage(message, attributes)
+        return message
+
+    @contextmanager
+    def stream(self, **kwargs):
+        """messages.stream; opening a stream up to its first token is retried and hedged, never a partially consumed one"""
+        def open_stream(remaining: float):
+            manager = self.backend.stream(timeout=remaining, **kwargs)
+            return manager, manager.__enter__()
+
+        with span("llm.stream", model=kwargs.get('model')) as attributes:
+            tracker = self._tracker('stream', kwargs)
+
+            def attempt(deadline: float) -> _OpenedStream:
+                started = time.monotonic()
+                manager, stream = self._call(open_stream, deadline)
+                try:
+                    opened = _OpenedStream(manager, stream)
+                except BaseException:
+                    manager.__exit__(None, None, None)
+                    raise
+                tracker.observe(time.monotonic() - started)
+                return opened
+
+            # A hedge that loses the race to the first token is closed, which cancels its request
+            stream = self._guarded(attempt, tracker, attributes, discard=_OpenedStream.close)
+            try:
+                yield stream
+                try:
+                    self._record_usage(stream.current_message_snapshot, attributes)
+                except AssertionError:
+                    # Closed before the first event arrived, so there is no usage to record
+                    pass
+            finally:
+                stream.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+        stats['queued'] = self.bucket.queued()
+        breaker = self.breaker.stats()
+        stats.update(breaker_state=breaker['state'], breaker_opened=breaker['opened'],
+                     short_circuited=breaker['short_circuited'],
+                     recent_failure_rate=breaker['recent_failure_rate'])
+        stats['hedge_rate'] = stats['hedged'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
+
+    def usage(self) -> Dict[str, Any]:
+        """Token totals since start-up plus the most recent calls, newest first"""
+        with self._lock:
+            totals = dict(self._usage_totals)
+            recent: List[Dict[str, Any]] = list(reversed(self._usage))
+        prompt_tokens = (totals['input_tokens'] + totals['cache_creation_input_tokens']
+                         + totals['cache_read_input_tokens'])
+        totals['cached_share'] = totals['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+        return {'totals': totals, 'recent': recent}
+
+
+class ClientRegistry:
+    """One ManagedClient (and HTTP connection pool) per API key, shared by all sessions"""
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, max_waiters: int = 64,
+                 max_retries: int = 4, admission_timeout: float = 30.0,
+                 client_options: Optional[Dict[str, Any]] = None,
+                 breaker_options: Optional[Dict[str, Any]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_waiters = max_waiters
+        self.max_retries = max_retries
+        self.admission_timeout = admission_timeout
+        # Deadline and hedging settings passed to every ManagedClient, and each client's CircuitBreaker settings
+        self.client_options = client_options or {}
+        self.breaker_options = breaker_options or {}
+        self._clients: Dict[str, ManagedClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> ManagedClient:
+        """Return the shared client for api_key, creating it on first use"""
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        with self._lock:
+            managed = self._clients.get(key_hash)
+            if managed is None:
+                managed = ManagedClient(
+                    create_backend(api_key),
+                    TokenBucket(self.rate, self.burst, self.max_waiters),
+                    max_retries=self.max_retries,
+                    admission_timeout=self.admission_timeout,
+                    breaker=CircuitBreaker(**self.breaker_options),
+                    **self.client_options
+                )
+                self._clients[key_hash] = managed
+            return managed
+
+    def prometheus_lines(self) -> List[str]:
+        """Breaker state and hedge counters per client (labelled by a short hash of its key)"""
+        with self._lock:
+            clients = list(self._clients.items())
+        metrics = (
+            ("interview_prep_llm_breaker_open", "gauge", "1 while the circuit breaker is open or probing",
+             lambda stats: int(stats['breaker_state'] != CircuitBreaker.CLOSED)),
+            ("interview_prep_llm_breaker_opened_total", "counter", "Times the circuit breaker opened",
+             lambda stats: stats['breaker_opened']),
+            ("interview_prep_llm_short_circuited_total", "counter", "Calls failed fast by the open breaker",
+             lambda stats: stats['short_circuited']),
+            ("interview_prep_llm_calls_total", "counter", "Model calls (create and stream)",
+             lambda stats: stats['calls']),
+            ("interview_prep_llm_hedged_total", "counter", "Calls that fired a hedged second attempt",
+             lambda stats: stats['hedged']),
+            ("interview_prep_llm_hedge_wins_total", "counter", "Hedged calls answered by the second attempt",
+             lambda stats: stats['hedge_wins']),
+            ("interview_prep_llm_deadline_exceeded_total", "counter", "Calls that ran out of time",
+             lambda stats: stats['deadline_exceeded']),
+        )
+        snapshots = [(key_hash[:8], managed.stats()) for key_hash, managed in clients]
+        lines = []
+        for metric, kind, help_text, value in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{client="{client}"}} {value(stats)}' for client, stats in snapshots]
+        return lines
+
+
+_shared_registry = None
+_shared_registry_lock = threading.Lock()
+
+
+def shared_registry() -> ClientRegistry:
+    """Process-wide registry, configured from the environment on first use"""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = ClientRegistry(
+                rate=float(os.environ.get("AI_RATE_LIMIT_RPS", "5")),
+                burst=float(os.environ.get("AI_RATE_LIMIT_BURST", "10")),
+                max_waiters=int(os.environ.get("AI_MAX_QUEUED_REQUESTS", "64")),
+                max_retries=int(os.environ.get("AI_MAX_RETRIES", "4")),
+                admission_timeout=float(os.environ.get("AI_ADMISSION_TIMEOUT_SECONDS", "30")),
+                client_options={
+                    'deadline': float(os.environ.get("AI_CALL_DEADLINE_SECONDS", "60")),
+                    'hedge_percentile': float(os.environ.get("AI_HEDGE_PERCENTILE", "95")),
+                    'hedge_share': float(os.environ.get("AI_HEDGE_MAX_SHARE", "0.1")),
+                    'hedge_min_samples': int(os.environ.get("AI_HEDGE_MIN_SAMPLES", "20")),
+                },
+                breaker_options={
+                    'failure_rate': float(os.environ.get("AI_BREAKER_FAILURE_RATE", "0.5")),
+                    'min_calls': int(os.environ.get("AI_BREAKER_MIN_CALLS", "10")),
+                    'window': float(os.environ.get("AI_BREAKER_WINDOW_SECONDS", "30")),
+                    'cooldown': float(os.environ.get("AI_BREAKER_COOLDOWN_SECONDS", "15")),
+                },
+            )
+            shared_telemetry().add_collector(_shared_registry.prometheus_lines)
+        return _shared_registry
@@ -0,0 +1,457 @@
+"""Runs Python DSA submissions against the question's test cases and measures how they scale
+
+Each submission runs in a fresh child process (this file with --child) under CPU, memory
+and file-size rlimits plus a wall-clock timeout; a bounded pool caps how many run at once.
+The child first checks the function against the question's test_cases, then times it at
+growing input sizes from the question's benchmark generator. The parent fits those
+timings against common complexity classes:
+
+    report = shared_runner().run(question, code)
+    format_report(report)   # plain text for the grading request
+
+Submissions are untrusted, so CODE_RUNNER_SANDBOX decides whether and how they run:
+"off" (default) never executes them and DSA answers are graded from the code alone;
+"bwrap" runs the child under bubblewrap as an unprivileged uid in fresh user, pid, network
+and IPC namespaces, with no network, an empty environment, its own /proc, and only the
+Python runtime and this file mounted read-only; "unsandboxed" runs it as a plain child of
+the app and is only for running your own code locally.
+"""
+import argparse
+import copy
+import gc
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telemetry import span
+
+# Complexity classes tried by fit_complexity, simplest first
+COMPLEXITY_MODELS: List[Tuple[str, Callable[[int], float]]] = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n²)", lambda n: float(n) ** 2),
+    ("O(n³)", lambda n: float(n) ** 3),
+]
+# A simpler class wins unless a more complex one fits this much better
+SIMPLER_FIT_TOLERANCE = 4
+MAX_REPORTED_FAILURES = 3
+SANDBOXES = ("off", "bwrap", "unsandboxed")
+# Host paths the bwrap sandbox mounts read-only when they exist: the interpreter and its shared libraries
+SANDBOX_SYSTEM_PATHS = ("/usr", "/lib", "/lib64", "/lib32", "/bin", "/sbin")
+# Unprivileged uid/gid ("nobody") the submission runs as inside the sandbox
+SANDBOX_UID = 65534
+
+
+class TreeNode:
+    """Binary tree node handed to submissions for "tree" arguments"""
+
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+
+
+def build_tree(values: List[Any]) -> Optional[TreeNode]:
+    """Tree from a level-order list with None for missing children (LeetCode layout)"""
+    if not values or values[0] is None:
+        return None
+    root = TreeNode(values[0])
+    level = [root]
+    position = 1
+    while level and position < len(values):
+        next_level = []
+        for node in level:
+            for side in ('left', 'right'):
+                if position < len(values) and values[position] is not None:
+                    child = TreeNode(values[position])
+                    setattr(node, side, child)
+                    next_level.append(child)
+                position += 1
+        level = next_level
+    return root
+
+
+def _balanced_bst(low: int, high: int) -> Optional[TreeNode]:
+    if low > high:
+        return None
+    middle = (low + high) // 2
+    return TreeNode(middle, _balanced_bst(low, middle - 1), _balanced_bst(middle + 1, high))
+
+
+def _two_sum_pair_at_end(n: int, rng: random.Random) -> List[Any]:
+    # Even numbers plus a single odd one, so the only pair hitting the odd target is the last two
+    nums = [2 * value for value in rng.sample(range(1, 10 * n), n - 1)] + [1]
+    return [nums, nums[-2] + 1]
+
+
+# Input generators for benchmarks: name -> fn(n, rng) returning the argument list for size n
+INPUT_GENERATORS: Dict[str, Callable[[int, random.Random], List[Any]]] = {
+    "two_sum_pair_at_end": _two_sum_pair_at_end,
+    "repeated_char_string": lambda n, rng: ["a" * n],
+    "balanced_bst": lambda n, rng: [_balanced_bst(1, n)],
+}
+
+# Argument converters for test cases stored as JSON
+ARG_TYPES: Dict[str, Callable[[Any], Any]] = {
+    "tree": build_tree,
+}
+
+
+def has_tests(question: Any) -> bool:
+    return isinstance(question, dict) and bool(question.get('test_cases'))
+
+
+# --- child side: runs inside the limited process ---
+
+def _set_limits(cpu_seconds: int, memory_mb: int):
+    """preexec_fn for the child: rlimits apply to that process only"""
+    import resource
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+
+
+def find_entry_point(namespace: Dict[str, Any], name: Optional[str]) -> Callable:
+    """The function to call: the question's entry point, a LeetCode-style Solution method, or the only/last function defined"""
+    if name and callable(namespace.get(name)):
+        return namespace[name]
+    solution = namespace.get('Solution')
+    if isinstance(solution, type):
+        methods = [attr for attr, value in vars(solution).items() if callable(value) and not attr.startswith('_')]
+        if methods:
+            return getattr(solution(), methods[0])
+    functions = [value for value in namespace.values()
+                 if callable(value) and getattr(value, '__module__', None) == '__submission__'
+                 and not isinstance(value, type)]
+    if not functions:
+        raise LookupError(f"no function named {name or 'solution'} found")
+    return functions[-1]
+
+
+def _matches(result: Any, case: Dict[str, Any], compare: str) -> bool:
+    expected = case.get('any_of', [case.get('expected')])
+    if compare == 'unordered' and isinstance(result, (list, tuple)):
+        return any(isinstance(e, list) and sorted(result) == sorted(e) for e in expected)
+    if isinstance(result, tuple):
+        result = list(result)
+    return result in expected
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _time_call(function: Callable, args: List[Any], budget: float) -> float:
+    """Best per-call seconds over repeated calls on fresh copies of args, within about budget seconds
+
+    Copying counts against the budget but not the timing; the collector is paused while
+    timing, as timeit does.
+    """
+    best = math.inf
+    started = time.perf_counter()
+    runs = 0
+    while runs < 3 or (time.perf_counter() - started < budget / 4 and runs < 50):
+        call_args = copy.deepcopy(args)
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function(*call_args)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        runs += 1
+        if elapsed > budget:
+            break
+    return best
+
+
+def run_child(job: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]):
+    """Execute one submission and emit one event per test case and per benchmark size"""
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    namespace = {'__name__': '__submission__', 'TreeNode': TreeNode, 'List': List, 'Optional': Optional}
+    try:
+        exec(compile(job['code'], "<submission>", "exec"), namespace)
+        function = find_entry_point(namespace, job.get('entry_point'))
+    except BaseException as e:
+        emit({'event': 'error', 'error': f"{type(e).__name__}: {e}"})
+        return
+    converters = [ARG_TYPES.get(kind) for kind in job.get('arg_types', [])]
+
+    passed = 0
+    for number, case in enumerate(job['tests']):
+        args = [converter(arg) if converter else arg
+                for converter, arg in zip(converters + [None] * len(case['args']), case['args'])]
+        event = {'event': 'test', 'case': number}
+        try:
+            result = function(*copy.deepcopy(args))
+            event['passed'] = _matches(result, case, job.get('compare', 'exact'))
+            if not event['passed']:
+                event.update(input=_short(case['args']), expected=_short(case.get('expected', case.get('any_of'))),
+                             got=_short(result))
+        except Exception as e:
+            event.update(passed=False, input=_short(case['args']), error=f"{type(e).__name__}: {e}")
+        passed += event['passed']
+        emit(event)
+
+    benchmark = job.get('benchmark')
+    # A solution that fails its tests is not worth timing
+    if not benchmark or passed < len(job['tests']):
+        return
+    generator = INPUT_GENERATORS[benchmark['generator']]
+    for n in benchmark['sizes']:
+        args = generator(n, random.Random(n))
+        try:
+            seconds = _time_call(function, args, job['size_budget'])
+        except Exception as e:
+            emit({'event': 'error', 'error': f"benchmark at n={n}: {type(e).__name__}: {e}"})
+            return
+        emit({'event': 'timing', 'n': n, 'seconds': seconds})
+        # Bigger sizes would only blow the time limit
+        if seconds > job['size_budget']:
+            return
+
+
+def child_main():
+    job = json.loads(sys.stdin.read())
+    protocol = sys.stdout
+    # Whatever the submission prints must not end up in the event stream
+    sys.stdout = open(os.devnull, "w")
+
+    def emit(event: Dict[str, Any]):
+        protocol.write(json.dumps(event) + "\n")
+        protocol.flush()
+
+    run_child(job, emit)
+
+
+# --- parent side ---
+
+def fit_complexity(timings: List[Tuple[int, float]]) -> Optional[Dict[str, Any]]:
+    """Best-fitting complexity class for (n, seconds) pairs, or None with fewer than three sizes
+
+    Each class is fitted as seconds = c * f(n) by least squares on relative error, so large
+    and small sizes weigh the same. exponent is the log-log slope, i.e. the k in n^k.
+    """
+    points = [(n, seconds) for n, seconds in timings if n > 1 and seconds > 0]
+    if len(points) < 3:
+        return None
+    errors = []
+    for label, f in COMPLEXITY_MODELS:
+        ratios = [f(n) / seconds for n, seconds in points]
+        scale = sum(ratios) / sum(r * r for r in ratios)
+        errors.append((label, sum((1 - scale * r) ** 2 for r in ratios) / len(points)))
+    best_error = min(error for _, error in errors)
+    label, error = next((label, error) for label, error in errors
+                        if error <= best_error * SIMPLER_FIT_TOLERANCE + 1e-4)
+
+    logs = [(math.log(n), math.log(seconds)) for n, seconds in points]
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    exponent = (sum((x - mean_x) * (y - mean_y) for x, y in logs)
+                / sum((x - mean_x) ** 2 for x, _ in logs))
+    return {'label': label, 'fit_error': round(error, 4), 'exponent': round(exponent, 2)}
+
+
+def sandbox_command(python: str = sys.executable) -> List[str]:
+    """bwrap invocation running this file's child side with nothing of the host but the Python runtime"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [
+        "bwrap", "--unshare-all", "--die-with-parent", "--new-session", "--cap-drop", "ALL",
+        "--uid", str(SANDBOX_UID), "--gid", str(SANDBOX_UID),
+        "--proc", "/proc", "--dev", "/dev", "--tmpfs", "/tmp", "--dir", "/work", "--chdir", "/work",
+    ]
+    mounts = [path for path in SANDBOX_SYSTEM_PATHS if os.path.exists(path)]
+    for prefix in sorted({sys.base_prefix, sys.prefix, os.path.dirname(os.path.realpath(python))}, key=len):
+        if not any(prefix == path or prefix.startswith(path + os.sep) for path in mounts):
+            mounts.append(prefix)
+    for path in mounts:
+        command += ["--ro-bind", path, path]
+    # The child imports telemetry at module level; nothing else from the app is visible
+    for name in ("code_runner.py", "telemetry.py"):
+        command += ["--ro-bind", os.path.join(here, name), f"/sandbox/{name}"]
+    return command + ["--", python, "-E", "-s", "/sandbox/code_runner.py", "--child"]
+
+
+class CodeRunner:
+    """Bounded pool of limited child processes running submissions"""
+
+    def __init__(self, max_workers: int = 2, timeout: float = 20.0, cpu_seconds: int = 15,
+                 memory_mb: int = 512, size_budget: float = 1.0, sandbox: str = "off"):
+        if sandbox not in SANDBOXES:
+            raise ValueError(f"Unknown CODE_RUNNER_SANDBOX {sandbox!r}, expected one of {', '.join(SANDBOXES)}")
+        if sandbox == "bwrap" and shutil.which("bwrap") is None:
+            raise ValueError("CODE_RUNNER_SANDBOX is bwrap but bubblewrap is not installed")
+        self.sandbox = sandbox
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.size_budget = size_budget
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="code-runner")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether submissions are executed at all"""
+        return self.sandbox != "off"
+
+    def run(self, question: Dict[str, Any], code: str) -> Dict[str, Any]:
+        """Run code against question's tests and benchmark; blocks until the child finishes"""
+        if not self.enabled:
+            raise RuntimeError("Running submissions is disabled; set CODE_RUNNER_SANDBOX to enable it")
+        return self._pool.submit(self._run, question, code).result()
+
+    def _run(self, question: Dict[str, Any], code: str) -> Dict[str, Any]:
+        job = {
+            'code': code,
+            'entry_point': question.get('entry_point'),
+            'arg_types': question.get('arg_types', []),
+            'compare': question.get('compare', 'exact'),
+            'tests': question.get('test_cases', []),
+            'benchmark': question.get('benchmark'),
+            'size_budget': self.size_budget,
+        }
+        with span("code_runner.run", question_id=question.get('id'), sandbox=self.sandbox) as attributes:
+            stdout, error = self._spawn(job)
+            report = self._collect(job, stdout, error)
+            attributes.update(passed=report['passed'], total=report['total'],
+                              complexity=(report['complexity'] or {}).get('label'))
+            if report['error']:
+                attributes['error'] = report['error'][:80]
+            return report
+
+    def _spawn(self, job: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """Child stdout plus why it stopped early, if it did"""
+        if self.sandbox == "bwrap":
+            command = sandbox_command()
+        else:
+            command = [sys.executable, "-E", "-s", os.path.abspath(__file__), "--child"]
+        with tempfile.TemporaryDirectory(prefix="code-runner-") as workdir:
+            child = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=workdir, env={'PATH': os.environ.get('PATH', ''), 'PYTHONHASHSEED': '0'},
+                text=True, start_new_session=True,
+                preexec_fn=lambda: _set_limits(self.cpu_seconds, self.memory_mb),
+            )
+            try:
+                stdout, stderr = child.communicate(json.dumps(job), timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                child.kill()
+                stdout, _ = child.communicate()
+                return stdout, f"timed out after {self.timeout:g}s"
+        if child.returncode == 0:
+            return stdout, None
+        # bwrap reports a child killed by a signal as 128 + the signal number
+        if child.returncode in (-9, -24, 128 + 9, 128 + 24):
+            return stdout, f"exceeded the {self.cpu_seconds}s CPU limit"
+        if "MemoryError" in stderr:
+            return stdout, f"exceeded the {self.memory_mb} MB memory limit"
+        last_line = stderr.strip().splitlines()[-1:] or [f"exit status {child.returncode}"]
+        return stdout, f"crashed: {last_line[0]}"
+
+    def _collect(self, job: Dict[str, Any], stdout: str, error: Optional[str]) -> Dict[str, Any]:
+        tests = []
+        timings = []
+        for line in stdout.splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event['event'] == 'test':
+                tests.append(event)
+            elif event['event'] == 'timing':
+                timings.append((event['n'], event['seconds']))
+            elif event['event'] == 'error':
+                error = event['error']
+        return {
+            'passed': sum(1 for test in tests if test['passed']),
+            'total': len(job['tests']),
+            'failures': [test for test in tests if not test['passed']][:MAX_REPORTED_FAILURES],
+            'timings': timings,
+            'complexity': fit_complexity(timings),
+            'error': error,
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text summary of a run, for the grading request"""
+    lines = [f"Test cases passed: {report['passed']}/{report['total']}"]
+    for failure in report['failures']:
+        outcome = failure.get('error') or f"expected {failure['expected']}, got {failure['got']}"
+        lines.append(f"- case {failure['case'] + 1} failed on input {failure['input']}: {outcome}")
+    if report['error']:
+        lines.append(f"Run stopped: {report['error']}")
+    if report['timings']:
+        points = ", ".join(f"n={n}: {seconds * 1000:.2f}ms" for n, seconds in report['timings'])
+        lines.append(f"Timings: {points}")
+    complexity = report['complexity']
+    if complexity:
+        line = f"Measured time complexity: {complexity['label']} (time grows like n^{complexity['exponent']})"
+        if complexity['label'] in ("O(n)", "O(n log n)"):
+            # Cache effects alone bend a linear curve upwards, so timings cannot separate these two
+            line += "; timings alone cannot reliably tell O(n) from O(n log n)"
+        lines.append(line)
+    elif report['passed'] == report['total'] and not report['error']:
+        lines.append("Measured time complexity: not enough input sizes finished in time to fit a curve")
+    return "\n".join(lines)
+
+
+_shared_runner = None
+_shared_runner_lock = threading.Lock()
+
+
+def shared_runner() -> CodeRunner:
+    """Process-wide code runner, configured from the environment on first use"""
+    global _shared_runner
+    with _shared_runner_lock:
+        if _shared_runner is None:
+            _shared_runner = CodeRunner(
+                max_workers=int(os.environ.get("CODE_RUNNER_WORKERS", "2")),
+                timeout=float(os.environ.get("CODE_RUNNER_TIMEOUT_SECONDS", "20")),
+                cpu_seconds=int(os.environ.get("CODE_RUNNER_CPU_SECONDS", "15")),
+                memory_mb=int(os.environ.get("CODE_RUNNER_MEMORY_MB", "512")),
+                size_budget=float(os.environ.get("CODE_RUNNER_SIZE_BUDGET_SECONDS", "1")),
+                sandbox=os.environ.get("CODE_RUNNER_SANDBOX", "off"),
+            )
+        return _shared_runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Python solution against a built-in DSA question")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("question_id", nargs="?", type=int, help="Id of a built-in DSA question")
+    parser.add_argument("solution", nargs="?", help="Python file with the solution")
+    parser.add_argument("--sandbox", choices=SANDBOXES[1:], default="unsandboxed",
+                        help="How to run the solution; the default suits your own code, use bwrap for anyone else's")
+    args = parser.parse_args()
+
+    if args.child:
+        child_main()
+        return
+    if args.question_id is None or args.solution is None:
+        parser.error("question_id and solution are required")
+
+    from question_data import DSA_QUESTIONS
+    question = next((q for q in DSA_QUESTIONS if q['id'] == args.question_id), None)
+    if not has_tests(question):
+        parser.error(f"DSA question {args.question_id} has no test cases")
+    with open(args.solution, encoding="utf-8") as f:
+        code = f.read()
+    print(format_report(CodeRunner(sandbox=args.sandbox).run(question, code)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Token-budgeted conversation memory for the chat coach: recent turns verbatim, older turns summarized"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from chat_log import ChatMessage
+from llm_backend import model_for
+from prompts import build_summary_prompt
+from telemetry import span
+
+# Rough chars-per-token ratio for English; good enough for budgeting without a tokenizer round-trip
+CHARS_PER_TOKEN = 4
+
+_summarizer_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("CHAT_SUMMARY_WORKERS", "2")),
+                                      thread_name_prefix="chat-summary")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ConversationMemory:
+    """Per-session memory; chat_log[:summarized_upto] is represented only by `summary`
+
+    history arguments are chat_log.ChatLog instances (or lists of ChatMessage). Turns past
+    the verbatim budget keep being sent until a summary covering them has landed, up to
+    overflow_token_budget more tokens; past that the oldest of them are dropped, so a
+    summarizer that keeps failing cannot grow the prompt without bound.
+    """
+
+    def __init__(self, recent_token_budget: int = 2000, summary_token_budget: int = 400,
+                 overflow_token_budget: int = 2000):
+        self.recent_token_budget = recent_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.overflow_token_budget = overflow_token_budget
+        self.summary = ""
+        self.summarized_upto = 0
+        self._folding = False
+        self._lock = threading.Lock()
+
+    def _recent_start(self, history: Sequence[ChatMessage], budget: Optional[int] = None) -> int:
+        """Index of the oldest turn that still fits budget (the verbatim budget by default), aligned to a user turn"""
+        budget = self.recent_token_budget if budget is None else budget
+        used = 0
+        start = len(history)
+        # Turns before summarized_upto are covered by the summary, so the walk never reaches into them
+        oldest = max(self.summarized_upto, getattr(history, 'available_from', 0))
+        for position in range(len(history) - 1, oldest - 1, -1):
+            cost = estimate_tokens(history[position].content)
+            if used + cost > budget:
+                break
+            used += cost
+            start = position
+        start = max(start, self.summarized_upto)
+        # The Messages API wants the conversation to open with a user turn
+        while start < len(history) and history[start].role != 'user':
+            start += 1
+        return start
+
+    def build_messages(self, history: Sequence[ChatMessage]) -> List[Dict[str, str]]:
+        """Prior turns to send verbatim (history excludes the message being asked now)"""
+        with self._lock:
+            # Unsummarized turns wait for their fold within the overflow allowance, never beyond it
+            start = self._recent_start(history, self.recent_token_budget + self.overflow_token_budget)
+        return [turn.as_turn() for turn in history[start:]]
+
+    def context(self, base_context: str) -> str:
+        """base_context plus the rolling summary of turns no longer sent verbatim"""
+        with self._lock:
+            summary = self.summary
+        if not summary:
+            return base_context
+        return f"{base_context}\n\nSummary of the earlier conversation: {summary}"
+
+    def fold_async(self, history: Sequence[ChatMessage], client, model: Optional[str] = None):
+        """Summarize turns that fell out of the verbatim window, off the request path
+
+        Only the newly evicted turns are sent along with the previous summary, so the
+        cost of a fold does not grow with the length of the conversation.
+        """
+        model = model or model_for('summary')
+        with self._lock:
+            if self._folding:
+                return
+            end = self._recent_start(history)
+            if end <= self.summarized_upto:
+                return
+            # Only the evicted range is read, so spilled turns come off disk just this once
+            evicted = [turn.as_turn() for turn in history[self.summarized_upto:end]]
+            previous_summary = self.summary
+            self._folding = True
+
+        def fold():
+            # A failed fold is recorded on its span; the turns stay verbatim and the next fold retries them
+            try:
+                with span("conversation.fold", turns=len(evicted)):
+                    message = client.create(
+                        model=model,
+                        max_tokens=self.summary_token_budget,
+                        messages=[{"role": "user", "content": build_summary_prompt(previous_summary, evicted)}]
+                    )
+                with self._lock:
+                    self.summary = message.content[0].text.strip()
+                    self.summarized_upto = end
+            finally:
+                with self._lock:
+                    self._folding = False
+
+        _summarizer_pool.submit(fold)
+
+    def state(self) -> Dict[str, Any]:
+        """What has to be persisted to rebuild this memory in another process"""
+        with self._lock:
+            return {'summary': self.summary, 'summarized_upto': self.summarized_upto}
+
+    def load_state(self, state: Dict[str, Any]) -> "ConversationMemory":
+        with self._lock:
+            self.summary = state['summary']
+            self.summarized_upto = state['summarized_upto']
+        return self
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'summary': self.summary,
+                'summarized_upto': self.summarized_upto,
+                'summary_tokens': estimate_tokens(self.summary) if self.summary else 0,
+            }
+
@@ -0,0 +1,89 @@
+"""In-process job queue that runs answer evaluations off the Streamlit script thread"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class EvaluationJob:
+    """State of one queued evaluation, polled by the page that submitted it"""
+
+    def __init__(self, job_id: str, category: str):
+        self.id = job_id
+        self.category = category
+        self.status = 'pending'
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+
+class EvaluationQueue:
+    """Worker pool draining evaluation jobs; finished jobs are kept for a while so pages can collect them"""
+
+    def __init__(self, max_workers: int = 4, keep_finished_seconds: float = 3600):
+        self.keep_finished_seconds = keep_finished_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evaluation")
+        self._jobs: Dict[str, EvaluationJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, category: str, evaluate: Callable[[EvaluationJob], Dict[str, Any]],
+               on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """Queue evaluate(job); on_done(result) runs on the worker thread once it succeeds"""
+        with self._lock:
+            self._prune()
+            job = EvaluationJob(f"eval-{next(self._ids)}", category)
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, evaluate, on_done)
+        return job.id
+
+    def _run(self, job: EvaluationJob, evaluate, on_done):
+        job.status = 'running'
+        try:
+            job.result = evaluate(job)
+            if on_done:
+                on_done(job.result)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_finished_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ('pending', 'running', 'done', 'failed')}
+
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def shared_queue() -> EvaluationQueue:
+    """Process-wide evaluation queue, sized from the environment on first use"""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = EvaluationQueue(
+                max_workers=int(os.environ.get("EVAL_WORKERS", "4")),
+            )
+        return _shared_queue
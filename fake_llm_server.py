@@ -0,0 +1,419 @@
+"""Local stand-in for the Anthropic Messages API, for load tests and CI runs without a key
+
+Speaks enough of POST /v1/messages for the official SDK (pointed at it through base_url)
+to work unchanged: plain and streamed (SSE) responses, forced tool calls, usage with
+simulated prompt caching, and injected 429/5xx errors. Message Batches
+(/v1/messages/batches) are accepted too and end after --batch-seconds. Output is deterministic: the same
+request always gets the same text or grade.
+
+    python fake_llm_server.py --port 8765 --latency-ms 400 --rate-limit-rate 0.02
+    LLM_BASE_URL=http://127.0.0.1:8765 streamlit run interview_prep_main.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+CHARS_PER_TOKEN = 4
+
+CANNED_REPLY = (
+    "Here is how I would approach this. Start by restating the problem and clarifying the "
+    "constraints, then walk through a brute-force idea before optimizing. State the time and "
+    "space complexity explicitly and test an edge case out loud. Follow-up: how would your "
+    "answer change if the input did not fit in memory?"
+)
+
+
+def _tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _digest(payload: Any) -> int:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], "big")
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if block.get('type') == "text":
+            parts.append(block['text'])
+        elif block.get('type') == "tool_result":
+            parts.append(_content_text(block.get('content', "")))
+        elif block.get('type') == "tool_use":
+            parts.append(json.dumps(block.get('input', {})))
+    return "".join(parts)
+
+
+CANNED_WORDS = sorted({word.strip(".,:?").lower() for word in CANNED_REPLY.split()})
+
+
+def _canned_value(name: str, schema: Dict[str, Any], rng: random.Random) -> Any:
+    kind = schema.get('type')
+    if 'enum' in schema:
+        return rng.choice(schema['enum'])
+    if kind == "integer":
+        return rng.randint(max(schema.get('minimum', 0), 3), min(schema.get('maximum', 10), 9))
+    if kind == "object":
+        return {sub: _canned_value(sub, sub_schema, rng) for sub, sub_schema in schema.get('properties', {}).items()}
+    if kind == "array":
+        items = schema.get('items', {})
+        if items.get('type') == "object":
+            count = rng.randint(schema.get('minItems', 1), schema.get('maxItems', 3))
+            return [_canned_value(name, items, rng) for _ in range(count)]
+        return [f"Canned {name.rstrip('s')} #{rng.randint(1, 99)}"]
+    # Free text varies with the seed so generated items are not all identical
+    return f"Canned {name}: " + " ".join(rng.sample(CANNED_WORDS, 8))
+
+
+def canned_tool_input(tool: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """A schema-valid input for a forced tool call (record_grade, record_questions), derived from the request hash"""
+    rng = random.Random(seed)
+    return _canned_value(tool['name'], dict(tool.get('input_schema', {}), type="object"), rng)
+
+
+class FakeLLM:
+    """Response generation and fault injection, independent of the HTTP plumbing"""
+
+    def __init__(self, latency_ms: float = 300.0, latency_sigma: float = 0.5, ttft_share: float = 0.3,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after_seconds: float = 1.0,
+                 chunk_chars: int = 24, seed: int = 0, batch_seconds: float = 2.0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.ttft_share = ttft_share
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.chunk_chars = chunk_chars
+        self.batch_seconds = batch_seconds
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._rng = random.Random(seed)
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'streamed': 0, 'rate_limited': 0, 'errors': 0, 'batches': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def latency(self) -> float:
+        """Seconds for one response: lognormal around latency_ms (fixed when sigma is 0)"""
+        with self._lock:
+            factor = self._rng.lognormvariate(0, self.latency_sigma) if self.latency_sigma > 0 else 1.0
+        return self.latency_ms / 1000 * factor
+
+    def fault(self) -> Optional[Tuple[int, str]]:
+        """(status, error type) to fail this request with, if one was drawn"""
+        with self._lock:
+            draw = self._rng.random()
+            overloaded = self._rng.random() < 0.5
+        if draw < self.rate_limit_rate:
+            self._count('rate_limited')
+            return 429, "rate_limit_error"
+        if draw < self.rate_limit_rate + self.error_rate:
+            self._count('errors')
+            return (529, "overloaded_error") if overloaded else (500, "api_error")
+        return None
+
+    def usage(self, request: Dict[str, Any]) -> Dict[str, int]:
+        """Input tokens split the way the real API reports prompt caching"""
+        system = request.get('system') or []
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        prefix_tokens = 0
+        cached_upto = 0
+        prefix: List[Any] = [request.get('model'), request.get('tools')]
+        breakpoints = []
+        for block in system:
+            prefix.append(block.get('text', ""))
+            prefix_tokens += _tokens(block.get('text', ""))
+            if block.get('cache_control'):
+                breakpoints.append((_digest(prefix), prefix_tokens))
+        written = 0
+        with self._lock:
+            for key, tokens in breakpoints:
+                if key in self._cached_prefixes:
+                    cached_upto = tokens
+            for key, tokens in breakpoints:
+                if tokens > cached_upto and key not in self._cached_prefixes:
+                    self._cached_prefixes.add(key)
+                    written = tokens - cached_upto
+        message_tokens = sum(_tokens(_content_text(m['content'])) for m in request.get('messages', []))
+        return {
+            'input_tokens': prefix_tokens - cached_upto - written + message_tokens,
+            'cache_creation_input_tokens': written,
+            'cache_read_input_tokens': cached_upto,
+        }
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The complete Message for a request (content is deterministic in the request)"""
+        seed = _digest([request.get('system'), request.get('messages'), request.get('tools')])
+        forced = (request.get('tool_choice') or {}).get('name')
+        tools = {tool['name']: tool for tool in request.get('tools') or []}
+        if forced in tools:
+            tool_input = canned_tool_input(tools[forced], seed)
+            content = [{"type": "tool_use", "id": f"toolu_{seed:016x}", "name": forced, "input": tool_input}]
+            output_tokens = _tokens(json.dumps(tool_input))
+            stop_reason = "tool_use"
+        else:
+            words = CANNED_REPLY.split()
+            start = seed % len(words)
+            text = " ".join(words[start:] + words[:start])
+            limit = int(request.get('max_tokens', 1024)) * CHARS_PER_TOKEN
+            content = [{"type": "text", "text": text[:limit]}]
+            output_tokens = _tokens(content[0]['text'])
+            stop_reason = "end_turn" if len(text) <= limit else "max_tokens"
+        usage = self.usage(request)
+        usage['output_tokens'] = output_tokens
+        return {
+            "id": f"msg_{seed:016x}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get('model', "fake"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+    def create_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """Queue a Message Batch; every result is decided now and released batch_seconds later"""
+        results = []
+        for item in requests:
+            fault = self.fault()
+            if fault:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": fault[1], "message": "Injected fault"}}}
+            else:
+                result = {"type": "succeeded", "message": self.respond(item['params'])}
+            results.append({"custom_id": item['custom_id'], "result": result})
+        self._count('batches')
+        with self._lock:
+            batch_id = f"msgbatch_{len(self._batches) + 1:06d}{_digest(requests) % 10 ** 6:06d}"
+            self._batches[batch_id] = {'created': time.time(), 'results': results}
+        return batch_id
+
+    def batch(self, batch_id: str, results_url: str) -> Optional[Dict[str, Any]]:
+        """The MessageBatch object for batch_id, or None if there is no such batch"""
+        with self._lock:
+            entry = self._batches.get(batch_id)
+        if entry is None:
+            return None
+        created = entry['created']
+        ended = time.time() >= created + self.batch_seconds
+        outcomes = [item['result']['type'] for item in entry['results']]
+        stamp = lambda seconds: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(outcomes),
+                "succeeded": outcomes.count("succeeded") if ended else 0,
+                "errored": outcomes.count("errored") if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": stamp(created),
+            "ended_at": stamp(created + self.batch_seconds) if ended else None,
+            "expires_at": stamp(created + 86400),
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": results_url if ended else None,
+        }
+
+    def batch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._batches[batch_id]['results'])
+
+    def events(self, message: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """The SSE event sequence the API sends for message when streaming"""
+        usage = message['usage']
+        start = dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+        events = [("message_start", {"type": "message_start", "message": start})]
+        for index, block in enumerate(message['content']):
+            if block['type'] == "text":
+                events.append(("content_block_start", {
+                    "type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}
+                }))
+                text = block['text']
+                for offset in range(0, len(text), self.chunk_chars):
+                    events.append(("content_block_delta", {
+                        "type": "content_block_delta", "index": index,
+                        "delta": {"type": "text_delta", "text": text[offset:offset + self.chunk_chars]}
+                    }))
+            else:
+                events.append(("content_block_start", {
+                    "type": "content_block_start", "index": index,
+                    "content_block": dict(block, input={})
+                }))
+                events.append(("content_block_delta", {
+                    "type": "content_block_delta", "index": index,
+                    "delta": {"type": "input_json_delta", "partial_json": json.dumps(block['input'])}
+                }))
+            events.append(("content_block_stop", {"type": "content_block_stop", "index": index}))
+        events.append(("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message['stop_reason'], "stop_sequence": None},
+            "usage": {"output_tokens": usage['output_tokens']},
+        }))
+        events.append(("message_stop", {"type": "message_stop"}))
+        return events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeLLM/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self):
+        self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def _results_url(self, batch_id: str) -> str:
+        return f"http://{self.headers.get('Host')}/v1/messages/batches/{batch_id}/results"
+
+    def do_GET(self):
+        """Message Batch status and results (GET /v1/messages/batches/<id>[/results])"""
+        llm: FakeLLM = self.server.llm
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+            self._not_found()
+            return
+        batch = llm.batch(parts[3], self._results_url(parts[3]))
+        if batch is None:
+            self._not_found()
+            return
+        if len(parts) == 4:
+            self._send_json(200, batch)
+            return
+        if parts[4] != "results" or batch['processing_status'] != "ended":
+            self._not_found()
+            return
+        body = "".join(json.dumps(line) + "\n" for line in llm.batch_results(parts[3])).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/binary")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        llm: FakeLLM = self.server.llm
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"type": "error", "error": {"type": "invalid_request_error", "message": "Bad JSON"}})
+            return
+        path = self.path.split("?")[0]
+        if path == "/v1/messages/batches":
+            batch_id = llm.create_batch(request['requests'])
+            self._send_json(200, llm.batch(batch_id, self._results_url(batch_id)))
+            return
+        if path != "/v1/messages":
+            self._not_found()
+            return
+
+        llm._count('requests')
+        fault = llm.fault()
+        if fault:
+            status, error_type = fault
+            headers = {"retry-after": str(llm.retry_after_seconds)} if status == 429 else None
+            self._send_json(status, {"type": "error", "error": {"type": error_type, "message": "Injected fault"}},
+                            headers)
+            return
+
+        message = llm.respond(request)
+        latency = llm.latency()
+        if not request.get('stream'):
+            time.sleep(latency)
+            self._send_json(200, message)
+            return
+
+        llm._count('streamed')
+        events = llm.events(message)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(latency * llm.ttft_share)
+        per_event = latency * (1 - llm.ttft_share) / max(1, len(events) - 1)
+        self.close_connection = True
+        try:
+            for position, (event, data) in enumerate(events):
+                if position:
+                    time.sleep(per_event)
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early, e.g. a hedged attempt that lost the race
+            pass
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, llm: FakeLLM, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.llm = llm
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_in_thread(llm: Optional[FakeLLM] = None, host: str = "127.0.0.1", port: int = 0) -> FakeLLMServer:
+    """Serve on a daemon thread (port 0 picks a free port); stop with server.shutdown()"""
+    server = FakeLLMServer(llm or FakeLLM(), host, port)
+    threading.Thread(target=server.serve_forever, name="fake-llm-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake of the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median response time")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal spread (0 = fixed latency)")
+    parser.add_argument("--ttft-share", type=float, default=0.3, help="Share of the latency spent before the first streamed event")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500/529")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after header sent with 429s")
+    parser.add_argument("--batch-seconds", type=float, default=2.0, help="How long a Message Batch stays in progress")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    llm = FakeLLM(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, ttft_share=args.ttft_share,
+                  error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                  retry_after_seconds=args.retry_after, seed=args.seed, batch_seconds=args.batch_seconds)
+    server = FakeLLMServer(llm, args.host, args.port)
+    print(f"Fake Messages API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(llm.counters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Local stand-in for a Redis server, for running the session-state backend without Redis
+
+Speaks RESP2 over TCP and implements just the commands session_store.RedisSessionBackend
+uses: hashes, EXPIRE, and optimistic transactions (WATCH/MULTI/EXEC). Data is in memory
+only and all databases share one keyspace.
+
+    python fake_redis_server.py --port 6380
+    SESSION_STATE_BACKEND=redis SESSION_STATE_REDIS_URL=redis://127.0.0.1:6380/0 streamlit run interview_prep_main.py
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class RedisError(Exception):
+    """An error reply (-ERR ...)"""
+
+
+class FakeRedis:
+    """Keyspace and command implementations, independent of the socket plumbing"""
+
+    def __init__(self):
+        self._hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self._expires: Dict[bytes, float] = {}
+        # Bumped on every write to a key; WATCH compares it at EXEC time
+        self._revisions: Dict[bytes, int] = {}
+        self.lock = threading.RLock()
+        self.commands = 0
+
+    def _expire_if_due(self, key: bytes):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self._hashes.pop(key, None)
+            self._expires.pop(key, None)
+            self._touch(key)
+
+    def _touch(self, key: bytes):
+        self._revisions[key] = self._revisions.get(key, 0) + 1
+
+    def revision(self, key: bytes) -> int:
+        with self.lock:
+            self._expire_if_due(key)
+            return self._revisions.get(key, 0)
+
+    def execute(self, args: List[bytes]) -> Any:
+        """Run one command; returns the reply value or raises RedisError"""
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise RedisError(f"ERR unknown command '{name}'")
+        with self.lock:
+            self.commands += 1
+            for key in args[1:2]:
+                self._expire_if_due(key)
+            return handler(*args[1:])
+
+    def cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_auth(self, *args):
+        return "OK"
+
+    def cmd_flushdb(self):
+        for key in list(self._hashes):
+            self._touch(key)
+        self._hashes.clear()
+        self._expires.clear()
+        return "OK"
+
+    def cmd_hget(self, key, field):
+        return self._hashes.get(key, {}).get(field)
+
+    def cmd_hgetall(self, key):
+        return [item for pair in self._hashes.get(key, {}).items() for item in pair]
+
+    def cmd_hset(self, key, *pairs):
+        if not pairs or len(pairs) % 2:
+            raise RedisError("ERR wrong number of arguments for 'hset' command")
+        fields = self._hashes.setdefault(key, {})
+        added = sum(1 for field in pairs[::2] if field not in fields)
+        fields.update(zip(pairs[::2], pairs[1::2]))
+        self._touch(key)
+        return added
+
+    def cmd_hdel(self, key, *fields):
+        existing = self._hashes.get(key, {})
+        removed = sum(1 for field in fields if existing.pop(field, None) is not None)
+        if key in self._hashes and not existing:
+            del self._hashes[key]
+            self._expires.pop(key, None)
+        if removed:
+            self._touch(key)
+        return removed
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            self._expire_if_due(key)
+            if self._hashes.pop(key, None) is not None:
+                removed += 1
+                self._expires.pop(key, None)
+                self._touch(key)
+        return removed
+
+    def cmd_expire(self, key, seconds):
+        if key not in self._hashes:
+            return 0
+        self._expires[key] = time.time() + int(seconds)
+        return 1
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, e.g. from `nc`
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, value: Any) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, str):
+            return b"+" + value.encode() + b"\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if isinstance(value, RedisError):
+            return b"-" + str(value).encode() + b"\r\n"
+        return b"*%d\r\n" % len(value) + b"".join(self._encode(item) for item in value)
+
+    def handle(self):
+        redis: FakeRedis = self.server.redis
+        watched: Dict[bytes, int] = {}
+        queued: Optional[List[List[bytes]]] = None
+        while True:
+            args = self._read_command()
+            if not args:
+                return
+            name = args[0].upper()
+            if name == b"WATCH":
+                for key in args[1:]:
+                    watched[key] = redis.revision(key)
+                reply = "OK"
+            elif name == b"UNWATCH":
+                watched.clear()
+                reply = "OK"
+            elif name == b"MULTI":
+                queued = []
+                reply = "OK"
+            elif name == b"DISCARD":
+                queued = None
+                watched.clear()
+                reply = "OK"
+            elif name == b"EXEC":
+                if queued is None:
+                    reply = RedisError("ERR EXEC without MULTI")
+                else:
+                    with redis.lock:
+                        if any(redis.revision(key) != revision for key, revision in watched.items()):
+                            reply = None
+                        else:
+                            reply = []
+                            for command in queued:
+                                try:
+                                    reply.append(redis.execute(command))
+                                except RedisError as e:
+                                    reply.append(e)
+                    queued = None
+                    watched.clear()
+            elif queued is not None:
+                queued.append(args)
+                reply = "QUEUED"
+            else:
+                try:
+                    reply = redis.execute(args)
+                except RedisError as e:
+                    reply = e
+            self.wfile.write(self._encode(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, redis: Optional[FakeRedis] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.redis = redis or FakeRedis()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+
+def start_in_thread(redis: Optional[FakeRedis] = None, host: str = "127.0.0.1", port: int = 0) -> FakeRedisServer:
+    """Serve on a daemon thread (port 0 picks a free port); stop with server.shutdown()"""
+    server = FakeRedisServer(redis, host, port)
+    threading.Thread(target=server.serve_forever, name="fake-redis-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local in-memory stand-in for Redis (RESP2)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(host=args.host, port=args.port)
+    print(f"Fake Redis listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.redis.commands} commands served")
+
+
+if __name__ == "__main__":
+    main()
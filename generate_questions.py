@@ -0,0 +1,370 @@
+"""Headless question generator: grow the question banks in bulk through the model
+
+Each request asks for several questions on one angle (a DSA topic and difficulty, a System
+Design domain, a Leadership Principle), with a few bank questions on that angle to steer away
+from. Requests run concurrently through the shared client or go to the provider's batch API
+(--mode batch: slower, cheaper, no rate limit pressure). Candidates are normalized to the bank
+schema, near-duplicates of the existing bank and of each other are dropped with MinHash/LSH
+(near_duplicates.py), and the rest is written to the next versioned bank file, e.g.
+question_banks/dsa_generated_v003.jsonl, which the running app picks up on its own.
+
+    python generate_questions.py DSA --count 500 --workers 8
+    python generate_questions.py Behavioral --count 160 --mode batch
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from client_pool import shared_registry
+from llm_backend import backend_needs_api_key, model_for
+from near_duplicates import LSHIndex
+from prompts import build_generation_request, generation_system_blocks
+from question_bank import CATEGORY_FILE_PREFIXES, QuestionStore, content_id
+from question_data import (BEHAVIORAL_QUESTIONS, DSA_QUESTIONS, LEADERSHIP_PRINCIPLES,
+                           SYSTEM_DESIGN_QUESTIONS)
+
+QUESTIONS_TOOL_NAME = "record_questions"
+MANIFEST_NAME = "generated_manifest.json"
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+DSA_TOPICS = [
+    "Arrays", "Strings", "Hash Tables", "Linked Lists", "Stacks and Queues", "Trees", "Graphs", "Heaps",
+    "Tries", "Intervals", "Two Pointers", "Sliding Window", "Binary Search", "Backtracking",
+    "Dynamic Programming", "Greedy", "Bit Manipulation",
+]
+SYSTEM_DESIGN_DOMAINS = [
+    "social media", "e-commerce", "payments", "messaging", "video streaming", "ride sharing", "search",
+    "file storage", "maps and location", "notifications", "ads", "observability", "collaboration tools",
+    "developer infrastructure", "gaming", "IoT",
+]
+
+MIN_QUESTION_CHARS = 20
+MAX_LIST_ITEMS = 6
+EXAMPLES_PER_REQUEST = 5
+
+
+def question_schema(category: str) -> Dict[str, Any]:
+    """JSON schema of one generated question, matching the bank fields (ids are assigned here)"""
+    text = {"type": "string"}
+    text_list = {"type": "array", "items": text, "minItems": 1, "maxItems": MAX_LIST_ITEMS}
+    if category == "DSA":
+        properties = {
+            "difficulty": {"type": "string", "enum": DIFFICULTIES},
+            "topic": text,
+            "question": text,
+            "hints": text_list,
+            "expected_approach": dict(text, description="Approach and its time complexity"),
+        }
+    elif category == "System Design":
+        properties = {"question": text, "focus_areas": text_list, "key_components": text_list}
+    else:
+        properties = {"principle": {"type": "string", "enum": LEADERSHIP_PRINCIPLES}, "question": text}
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+def questions_tool(category: str, per_request: int) -> Dict[str, Any]:
+    return {
+        "name": QUESTIONS_TOOL_NAME,
+        "description": f"Record new {category} interview questions.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "questions": {"type": "array", "items": question_schema(category), "minItems": 1,
+                              "maxItems": per_request},
+            },
+            "required": ["questions"],
+        },
+    }
+
+
+def angles(category: str) -> List[Tuple[str, Dict[str, str]]]:
+    """(what to ask for, bank filters selecting similar questions) for every angle of a category"""
+    if category == "DSA":
+        return [(f"{difficulty} DSA questions on {topic}", {'topic': topic, 'difficulty': difficulty})
+                for topic in DSA_TOPICS for difficulty in DIFFICULTIES]
+    if category == "System Design":
+        return [(f"System Design questions about {domain} systems", {}) for domain in SYSTEM_DESIGN_DOMAINS]
+    return [(f'Behavioral questions for the Leadership Principle "{principle}"', {'principle': principle})
+            for principle in LEADERSHIP_PRINCIPLES]
+
+
+def plan_requests(category: str, count: int, per_request: int, store: QuestionStore, model: str,
+                  max_tokens: int, seed: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    """(custom_id, create kwargs) for enough requests to yield count candidates, cycling through the angles"""
+    rng = random.Random(seed)
+    prefix = CATEGORY_FILE_PREFIXES[category]
+    index = store.index(category)
+    system = generation_system_blocks(category)
+    tool = questions_tool(category, per_request)
+    options = angles(category)
+    requests = []
+    for number in range(-(-count // per_request)):
+        angle, filters = options[number % len(options)]
+        round_number = number // len(options)
+        if round_number:
+            # Repeated angles ask for another set, so identical prompts do not come back identical
+            angle += f" (set {round_number + 1})"
+        ids = index.ids(**filters)
+        examples = [index.get(question_id)['question'] for question_id in rng.sample(ids, min(EXAMPLES_PER_REQUEST, len(ids)))]
+        requests.append((f"{prefix}-{number:05d}", {
+            'model': model,
+            'max_tokens': max_tokens,
+            'system': system,
+            'tools': [tool],
+            'tool_choice': {"type": "tool", "name": QUESTIONS_TOOL_NAME},
+            'messages': [{"role": "user", "content": build_generation_request(per_request, angle, examples)}],
+        }))
+    return requests
+
+
+def generate_concurrently(client, requests: List[Tuple[str, Dict[str, Any]]],
+                          workers: int) -> Iterator[Tuple[str, Any]]:
+    """(custom_id, message) as requests finish through the managed client; failures come back as the exception"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(client.create, **params): custom_id for custom_id, params in requests}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def generate_in_batches(backend, requests: List[Tuple[str, Dict[str, Any]]], batch_size: int,
+                        poll_seconds: float) -> Iterator[Tuple[str, Any]]:
+    """(custom_id, message) from the provider's batch API, submitting batch_size requests per batch"""
+    pending = []
+    for start in range(0, len(requests), batch_size):
+        chunk = requests[start:start + batch_size]
+        batch_id = backend.submit_batch([{'custom_id': custom_id, 'params': params} for custom_id, params in chunk])
+        print(f"submitted batch {batch_id} ({len(chunk)} requests)", file=sys.stderr)
+        pending.append(batch_id)
+    while pending:
+        time.sleep(poll_seconds)
+        for batch_id in [batch_id for batch_id in pending if backend.batch_ended(batch_id)]:
+            pending.remove(batch_id)
+            yield from backend.batch_results(batch_id)
+
+
+def _text(value: Any) -> str:
+    return " ".join(value.split()) if isinstance(value, str) else ""
+
+
+def _text_list(value: Any) -> List[str]:
+    """Non-empty strings with whitespace collapsed, case-insensitive repeats dropped, at most MAX_LIST_ITEMS"""
+    items, seen = [], set()
+    for item in value if isinstance(value, list) else []:
+        item = _text(item)
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            items.append(item)
+    return items[:MAX_LIST_ITEMS]
+
+
+def normalize_candidate(raw: Any, category: str, topics: Dict[str, str]) -> Dict[str, Any]:
+    """A bank entry built from one generated question; ValueError names what was wrong with it
+
+    topics maps lower-cased topic names to the spelling already used in the bank, so
+    "dynamic programming" lands in the same topic index as "Dynamic Programming".
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("not an object")
+    question = _text(raw.get('question'))
+    if len(question) < MIN_QUESTION_CHARS:
+        raise ValueError("question too short")
+    question_id = content_id(category, question)
+    if category == "DSA":
+        difficulty = {d.lower(): d for d in DIFFICULTIES}.get(_text(raw.get('difficulty')).lower())
+        topic = _text(raw.get('topic'))
+        hints = _text_list(raw.get('hints'))
+        approach = _text(raw.get('expected_approach'))
+        if difficulty is None:
+            raise ValueError("unknown difficulty")
+        if not topic or not hints or not approach:
+            raise ValueError("missing topic, hints or expected approach")
+        return {
+            "id": question_id,
+            "difficulty": difficulty,
+            "topic": topics.get(topic.lower(), topic),
+            "question": question,
+            "hints": hints,
+            "expected_approach": approach,
+        }
+    if category == "System Design":
+        focus_areas = _text_list(raw.get('focus_areas'))
+        key_components = _text_list(raw.get('key_components'))
+        if not focus_areas or not key_components:
+            raise ValueError("missing focus areas or key components")
+        return {"id": question_id, "question": question, "focus_areas": focus_areas, "key_components": key_components}
+    principle = {p.lower(): p for p in LEADERSHIP_PRINCIPLES}.get(_text(raw.get('principle')).lower())
+    if principle is None:
+        raise ValueError("unknown Leadership Principle")
+    return {"id": question_id, "principle": principle, "question": question}
+
+
+def _generated_questions(message: Any) -> List[Any]:
+    for block in message.content:
+        if getattr(block, 'type', None) == "tool_use" and block.name == QUESTIONS_TOOL_NAME:
+            questions = block.input.get('questions')
+            if isinstance(questions, list):
+                return questions
+    raise ValueError(f"no {QUESTIONS_TOOL_NAME} call in the response")
+
+
+def next_version(directory: str, prefix: str) -> int:
+    versions = [int(match.group(1)) for path in glob.glob(os.path.join(directory, f"{prefix}_generated_v*.jsonl"))
+                for match in [re.search(r"_v(\d+)\.jsonl$", path)] if match]
+    return max(versions, default=0) + 1
+
+
+def _write_atomically(path: str, text: str):
+    """Write to a temporary name first so the app's hot reload never sees a half-written file"""
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def write_bank(directory: str, category: str, questions: List[Dict[str, Any]], details: Dict[str, Any]) -> str:
+    """Write questions to the next versioned bank file and record it in the manifest; returns its path"""
+    os.makedirs(directory, exist_ok=True)
+    prefix = CATEGORY_FILE_PREFIXES[category]
+    version = next_version(directory, prefix)
+    path = os.path.join(directory, f"{prefix}_generated_v{version:03d}.jsonl")
+    _write_atomically(path, "".join(json.dumps(q, ensure_ascii=False) + "\n" for q in questions))
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    manifest = []
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    manifest.append(dict(details, file=os.path.basename(path), category=category, version=version,
+                         questions=len(questions), created_at=datetime.now().isoformat()))
+    _write_atomically(manifest_path, json.dumps(manifest, indent=2) + "\n")
+    return path
+
+
+def run_generation(category: str, count: int, client, directory: str, mode: str = "concurrent",
+                   per_request: int = 10, workers: int = 8, model: str = "", max_tokens: int = 4096,
+                   threshold: float = 0.6, batch_size: int = 1000, poll_seconds: float = 30.0,
+                   seed: int = 0, dry_run: bool = False) -> Dict[str, Any]:
+    """Generate, normalize and deduplicate about count new questions for category; returns a summary"""
+    model = model or model_for('generation')
+    start = time.perf_counter()
+    store = QuestionStore(directory, builtin={
+        "DSA": DSA_QUESTIONS,
+        "System Design": SYSTEM_DESIGN_QUESTIONS,
+        "Behavioral": BEHAVIORAL_QUESTIONS,
+    })
+    requests = plan_requests(category, count, per_request, store, model, max_tokens, seed)
+    if mode == "batch":
+        source = generate_in_batches(client.backend, requests, batch_size, poll_seconds)
+    else:
+        source = generate_concurrently(client, requests, workers)
+    responses = {}
+    for custom_id, message in source:
+        responses[custom_id] = message
+        if isinstance(message, Exception):
+            print(f"[{custom_id}] failed: {message}", file=sys.stderr)
+    generated_at = time.perf_counter()
+
+    # Index the bank first, then take candidates in request order so reruns keep the same survivors
+    bank = store.index(category)
+    index = LSHIndex(threshold=threshold, seed=seed + 1)
+    for question_id in bank.ids():
+        index.add(('bank', question_id), index.signature(bank.get(question_id)['question']))
+    topics = {topic.lower(): topic for topic in DSA_TOPICS + bank.values('topic')}
+    accepted: List[Dict[str, Any]] = []
+    rejected: Counter = Counter()
+    duplicates = Counter()
+    failed = 0
+    candidates = 0
+    for custom_id, _ in requests:
+        message = responses.get(custom_id, RuntimeError("no result"))
+        try:
+            if isinstance(message, Exception):
+                raise message
+            raw_questions = _generated_questions(message)
+        except Exception:
+            failed += 1
+            continue
+        for raw in raw_questions:
+            candidates += 1
+            try:
+                question = normalize_candidate(raw, category, topics)
+            except ValueError as e:
+                rejected[str(e)] += 1
+                continue
+            signature = index.signature(question['question'])
+            match = index.query(signature)
+            if match is not None:
+                duplicates['of_bank' if match[0] == 'bank' else 'within_batch'] += 1
+                continue
+            index.add(('new', question['id']), signature)
+            accepted.append(question)
+    deduplicated_at = time.perf_counter()
+
+    details = {
+        'mode': mode,
+        'model': model,
+        'requests': len(requests),
+        'failed_requests': failed,
+        'candidates': candidates,
+        'rejected': dict(rejected),
+        'duplicates_of_bank': duplicates['of_bank'],
+        'duplicates_within_batch': duplicates['within_batch'],
+        'threshold': threshold,
+    }
+    output = None if dry_run or not accepted else write_bank(directory, category, accepted, details)
+    elapsed = time.perf_counter() - start
+    return dict(
+        details,
+        written=0 if output is None else len(accepted),
+        output=output,
+        bank_size=len(bank),
+        generation_seconds=round(generated_at - start, 3),
+        dedup_seconds=round(deduplicated_at - generated_at, 3),
+        candidates_per_second=round(candidates / elapsed, 3) if elapsed else 0.0,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate new interview questions in bulk")
+    parser.add_argument("category", choices=list(CATEGORY_FILE_PREFIXES))
+    parser.add_argument("--count", type=int, default=100, help="Candidate questions to ask for")
+    parser.add_argument("--per-request", type=int, default=10, help="Questions asked for in one model call")
+    parser.add_argument("--mode", choices=["concurrent", "batch"], default="concurrent",
+                        help="Concurrent calls through the shared client, or the provider's batch API")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent calls (concurrent mode)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Requests per submitted batch (batch mode)")
+    parser.add_argument("--poll-seconds", type=float, default=30.0, help="How often batches are checked (batch mode)")
+    parser.add_argument("--threshold", type=float, default=0.6,
+                        help="Estimated Jaccard similarity of character shingles at which a question is a near-duplicate")
+    parser.add_argument("--output-dir", default=os.environ.get("QUESTION_BANK_DIR", "question_banks"))
+    parser.add_argument("--model", default=model_for('generation'), help="Defaults to GENERATION_MODEL")
+    parser.add_argument("--max-tokens", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the bank examples shown in each request")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be written without writing it")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+    if not api_key and backend_needs_api_key():
+        parser.error("ANTHROPIC_API_KEY must be set (or LLM_BACKEND=fake)")
+
+    summary = run_generation(args.category, args.count, shared_registry().get(api_key or "local"), args.output_dir,
+                             mode=args.mode, per_request=args.per_request, workers=args.workers, model=args.model,
+                             max_tokens=args.max_tokens, threshold=args.threshold, batch_size=args.batch_size,
+                             poll_seconds=args.poll_seconds, seed=args.seed, dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
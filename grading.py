@@ -0,0 +1,182 @@
+"""Structured answer grading that works without Streamlit (used by the app and by batch_grade.py)
+
+The model is forced to call a record_grade tool whose input schema carries the overall
+score and per-dimension sub-scores, so nothing has to be scraped out of free text.
+"""
+import time
+from typing import Any, Dict, List
+
+from prompts import CLAUDE_MODEL, MAX_TOKENS, build_evaluation_request, evaluation_system_blocks
+
+GRADING_TOOL_NAME = "record_grade"
+
+# Sub-score dimensions per category, each graded 0-10
+SUB_SCORE_DIMENSIONS = {
+    "DSA": {
+        "correctness": "Does the solution handle the general case and the edge cases",
+        "complexity_analysis": "Are time and space complexity stated and right",
+    },
+    "System Design": {
+        "requirements": "Functional and non-functional requirements, scale estimates",
+        "high_level_design": "Components, APIs and data flow",
+        "database": "Data model, storage choice, partitioning and replication",
+        "deep_dive": "Bottlenecks, trade-offs and failure handling",
+    },
+    "Behavioral": {
+        "situation": "Context is specific and concise",
+        "task": "The candidate's own responsibility is clear",
+        "action": "Concrete actions the candidate took, tied to the Leadership Principle",
+        "result": "Measurable outcome and what was learned",
+    },
+}
+
+FEEDBACK_LISTS = ("strengths", "weaknesses", "suggestions")
+
+
+class GradingError(Exception):
+    """Raised when the model's grade is still invalid after the repair attempt"""
+
+
+def grading_tool(category: str) -> Dict[str, Any]:
+    """Tool definition whose input schema is the grade for one answer in category"""
+    dimensions = SUB_SCORE_DIMENSIONS[category]
+    score = {"type": "integer", "minimum": 0, "maximum": 10}
+    text_list = {"type": "array", "items": {"type": "string"}, "minItems": 1}
+    return {
+        "name": GRADING_TOOL_NAME,
+        "description": f"Record the evaluation of a {category} interview answer.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "score": dict(score, description="Overall score out of 10"),
+                "sub_scores": {
+                    "type": "object",
+                    "properties": {name: dict(score, description=text) for name, text in dimensions.items()},
+                    "required": list(dimensions),
+                    "additionalProperties": False,
+                },
+                "strengths": text_list,
+                "weaknesses": dict(text_list, description="Areas for improvement"),
+                "suggestions": dict(text_list, description="Specific, actionable suggestions"),
+            },
+            "required": ["score", "sub_scores", *FEEDBACK_LISTS],
+        },
+    }
+
+
+def _is_score(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 10
+
+
+def validate_grade(grade: Any, category: str) -> List[str]:
+    """Problems with a record_grade input, empty when it matches the schema"""
+    if not isinstance(grade, dict):
+        return ["input must be an object"]
+    errors = []
+    if not _is_score(grade.get('score')):
+        errors.append("score must be an integer from 0 to 10")
+    sub_scores = grade.get('sub_scores')
+    dimensions = SUB_SCORE_DIMENSIONS[category]
+    if not isinstance(sub_scores, dict):
+        errors.append(f"sub_scores must be an object with {', '.join(dimensions)}")
+    else:
+        for name in dimensions:
+            if not _is_score(sub_scores.get(name)):
+                errors.append(f"sub_scores.{name} must be an integer from 0 to 10")
+        for name in sub_scores:
+            if name not in dimensions:
+                errors.append(f"sub_scores.{name} is not a {category} dimension")
+    for field in FEEDBACK_LISTS:
+        items = grade.get(field)
+        if not isinstance(items, list) or not items or not all(isinstance(i, str) and i.strip() for i in items):
+            errors.append(f"{field} must be a non-empty list of strings")
+    return errors
+
+
+def format_feedback(grade: Dict[str, Any], category: str) -> str:
+    """Readable feedback text for a validated grade, in the app's Score/Strengths/... layout"""
+    sub_scores = ", ".join(
+        f"{name.replace('_', ' ').capitalize()} {grade['sub_scores'][name]}/10"
+        for name in SUB_SCORE_DIMENSIONS[category]
+    )
+    lines = [f"Score: {grade['score']}/10", f"Breakdown: {sub_scores}"]
+    for field in FEEDBACK_LISTS:
+        lines.append(f"{field.capitalize()}: " + "; ".join(item.strip() for item in grade[field]))
+    return "\n".join(lines)
+
+
+def grading_request(question: Any, answer: str, category: str, measured: str = "",
+                    question_rubric: str = "") -> Dict[str, Any]:
+    """Keyword arguments (besides model and max_tokens) for the grading call"""
+    return {
+        'system': evaluation_system_blocks(question, category, question_rubric),
+        'tools': [grading_tool(category)],
+        'tool_choice': {"type": "tool", "name": GRADING_TOOL_NAME},
+        'messages': [{"role": "user", "content": build_evaluation_request(answer, category, measured)}],
+    }
+
+
+def _tool_use(message):
+    for block in message.content:
+        if getattr(block, 'type', None) == "tool_use" and block.name == GRADING_TOOL_NAME:
+            return block
+    return None
+
+
+def _repair_turns(message, tool_use, errors: List[str]) -> List[Dict[str, Any]]:
+    """Assistant turn echoing the bad grade plus a user turn listing what to fix"""
+    feedback = "Invalid grade: " + "; ".join(errors) + f". Call {GRADING_TOOL_NAME} again with corrected input."
+    if tool_use is None:
+        text = "".join(getattr(block, 'text', "") for block in message.content) or "(no grade)"
+        return [{"role": "assistant", "content": text}, {"role": "user", "content": feedback}]
+    return [
+        {"role": "assistant", "content": [
+            {"type": "tool_use", "id": tool_use.id, "name": tool_use.name, "input": tool_use.input}
+        ]},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": tool_use.id, "is_error": True, "content": feedback}
+        ]},
+    ]
+
+
+def grade_answer(client, question: Any, answer: str, category: str,
+                 model: str = CLAUDE_MODEL, max_tokens: int = MAX_TOKENS, measured: str = "",
+                 question_rubric: str = "") -> Dict[str, Any]:
+    """Grade one answer with a forced record_grade call; client is a client_pool.ManagedClient
+
+    An invalid grade gets exactly one repair round trip with the validation errors; if
+    that is invalid too, GradingError is raised rather than guessing a score. question
+    may be the question text or the full question dict; measured is code_runner's report
+    on the submitted code, when it was run, and question_rubric a rubric written for
+    this question (see prefetch.py).
+    """
+    request = grading_request(question, answer, category, measured, question_rubric)
+    start = time.perf_counter()
+    input_tokens = output_tokens = 0
+    repaired = False
+    for attempt in range(2):
+        message = client.create(model=model, max_tokens=max_tokens, **request)
+        input_tokens += message.usage.input_tokens
+        output_tokens += message.usage.output_tokens
+        tool_use = _tool_use(message)
+        errors = validate_grade(tool_use.input if tool_use else None, category)
+        if not errors:
+            break
+        if attempt == 1:
+            raise GradingError("Model returned an invalid grade: " + "; ".join(errors))
+        request = dict(request, messages=request['messages'] + _repair_turns(message, tool_use, errors))
+        repaired = True
+
+    grade = tool_use.input
+    return {
+        'score': grade['score'],
+        'sub_scores': {name: grade['sub_scores'][name] for name in SUB_SCORE_DIMENSIONS[category]},
+        'strengths': grade['strengths'],
+        'weaknesses': grade['weaknesses'],
+        'suggestions': grade['suggestions'],
+        'feedback': format_feedback(grade, category),
+        'repaired': repaired,
+        'latency': time.perf_counter() - start,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+    }
@@ -0,0 +1,137 @@
+"""Import-time report: what each page costs to open in a fresh process
+
+Every scenario runs in its own `python -X importtime` child that renders the app once with
+streamlit's AppTest, so module caches from one scenario never flatter the next. Only imports
+triggered by the render itself are counted (AppTest's own imports are excluded).
+
+    python import_report.py
+    python import_report.py --json import_report.json
+
+The "all pages (eager)" row imports every page module before rendering, which is what the
+single-file app used to pay on its first render whatever page was open; savings are measured
+against it.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interview_prep_main.py")
+# Third-party packages worth deferring, reported with their cumulative import time
+HEAVY_PACKAGES = ("pandas", "numpy", "plotly.express", "plotly.graph_objects", "anthropic")
+RENDER_MARKER = "--- render ---"
+EAGER = "all pages (eager)"
+
+# scenario name -> (environment, page opened, import every page module first)
+SCENARIOS = {
+    "no API key yet": ({"LLM_BACKEND": "anthropic"}, None, False),
+    "🏠 Dashboard": ({"LLM_BACKEND": "fake"}, "🏠 Dashboard", False),
+    "💬 AI Chat Coach": ({"LLM_BACKEND": "fake"}, "💬 AI Chat Coach", False),
+    "📝 Mock Interview": ({"LLM_BACKEND": "fake"}, "📝 Mock Interview", False),
+    "📈 Progress Tracking": ({"LLM_BACKEND": "fake"}, "📈 Progress Tracking", False),
+    "📚 Resources": ({"LLM_BACKEND": "fake"}, "📚 Resources", False),
+    EAGER: ({"LLM_BACKEND": "fake"}, "💬 AI Chat Coach", True),
+}
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+
+
+def render_once(page: str, eager: bool) -> Dict[str, Any]:
+    """Child side: render the app once on page and report which heavy packages got loaded"""
+    import importlib
+    import pkgutil
+    import warnings
+    warnings.simplefilter("ignore")
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    if page:
+        app.session_state["page"] = page
+    sys.stderr.write(RENDER_MARKER + "\n")
+    sys.stderr.flush()
+    start = time.perf_counter()
+    if eager:
+        import views
+        for page_module in pkgutil.iter_modules(views.__path__, "views."):
+            importlib.import_module(page_module.name)
+    app.run()
+    return {
+        'render_seconds': time.perf_counter() - start,
+        'errors': [str(e.value) for e in app.exception],
+    }
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """Total self time of the imports after the render marker, plus cumulative time per heavy package"""
+    lines = stderr.split(RENDER_MARKER, 1)[-1].splitlines()
+    total_us = 0
+    packages = {}
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, module = match.groups()
+        total_us += int(self_us)
+        if module in HEAVY_PACKAGES and module not in packages:
+            packages[module] = int(cumulative_us) / 1000
+    return {'import_ms': total_us / 1000, 'heavy_packages_ms': packages}
+
+
+def run_scenario(name: str) -> Dict[str, Any]:
+    environment, page, eager = SCENARIOS[name]
+    env = dict(os.environ, **environment)
+    # A throwaway store so the report neither reads nor pollutes real history
+    data_dir = tempfile.mkdtemp(prefix="import-report-")
+    env["PERFORMANCE_DB_PATH"] = os.path.join(data_dir, "performance.sqlite3")
+    env["SESSION_STATE_PATH"] = os.path.join(data_dir, "session_state.sqlite3")
+    env.pop("ANTHROPIC_API_KEY", None)
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", name],
+        env=env, capture_output=True, text=True, cwd=os.path.dirname(APP_PATH)
+    )
+    if child.returncode != 0:
+        raise RuntimeError(f"{name}: child failed\n{child.stderr[-2000:]}")
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result.update(parse_importtime(child.stderr), scenario=name)
+    return result
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    eager = next((r for r in results if r['scenario'] == EAGER), None)
+    lines = [f"{'scenario':<24} {'imports':>9} {'render':>9} {'saved':>9}  heavy packages loaded (cumulative ms)"]
+    for result in results:
+        saved = "" if eager is None or result is eager else f"{eager['import_ms'] - result['import_ms']:.0f}ms"
+        heavy = ", ".join(f"{name} {ms:.0f}" for name, ms in result['heavy_packages_ms'].items()) or "none"
+        lines.append(
+            f"{result['scenario']:<24} {result['import_ms']:>7.0f}ms {result['render_seconds'] * 1000:>7.0f}ms "
+            f"{saved:>9}  {heavy}"
+        )
+        for error in result['errors']:
+            lines.append(f"    error: {error}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page import cost of the app in fresh processes")
+    parser.add_argument("--json", help="Also write the results as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _, page, eager = SCENARIOS[args.child]
+        print(json.dumps(render_once(page, eager)))
+        return
+
+    results = [run_scenario(name) for name in SCENARIOS]
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
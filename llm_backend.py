@@ -0,0 +1,140 @@
+"""Pluggable model backends behind client_pool.ManagedClient, plus the model used at each call site
+
+A backend exposes Messages-API shaped create(**kwargs) and stream(**kwargs) (a context
+manager like the SDK's messages.stream) and raises anthropic.APIStatusError /
+APIConnectionError on failure so retries and error handling stay provider independent.
+Offline tools can also submit work through the provider's batch API (submit_batch).
+
+LLM_BACKEND picks the implementation: "anthropic" (default; honours LLM_BASE_URL) or
+"fake", which starts fake_llm_server in-process and points the real SDK at it.
+"""
+import abc
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from prompts import CLAUDE_MODEL
+
+# Environment variable naming the model for each call site; unset falls back to CLAUDE_MODEL
+MODEL_ENV = {
+    'chat': "CHAT_MODEL",
+    'grading': "GRADING_MODEL",
+    'summary': "SUMMARY_MODEL",
+    'generation': "GENERATION_MODEL",
+}
+
+
+def model_for(call_site: str) -> str:
+    """Model for a call site, so chat can run on a cheaper model than grading"""
+    return os.environ.get(MODEL_ENV[call_site]) or CLAUDE_MODEL
+
+
+class LLMBackend(abc.ABC):
+    """Interface the app's model calls go through"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def create(self, **kwargs):
+        """Messages-API create; returns the message"""
+
+    @abc.abstractmethod
+    def stream(self, **kwargs):
+        """Messages-API stream; returns a context manager like the SDK's messages.stream"""
+
+    def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """Queue [{'custom_id', 'params'}] with the provider's batch API; returns the batch id"""
+        raise NotImplementedError(f"The {self.name} backend has no batch API")
+
+    def batch_ended(self, batch_id: str) -> bool:
+        raise NotImplementedError(f"The {self.name} backend has no batch API")
+
+    def batch_results(self, batch_id: str) -> Iterator[Tuple[str, Any]]:
+        """(custom_id, message) for every request of an ended batch; message is an exception for failed ones"""
+        raise NotImplementedError(f"The {self.name} backend has no batch API")
+
+
+class AnthropicBackend(LLMBackend):
+    """The official SDK; base_url can point it at a proxy or at fake_llm_server"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        # Imported here so pages render without loading the SDK until a key is configured
+        import anthropic
+        # Retries are handled by ManagedClient so backoff and admission stay in one place
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url, max_retries=0)
+
+    def create(self, **kwargs):
+        return self.client.messages.create(**kwargs)
+
+    def stream(self, **kwargs):
+        return self.client.messages.stream(**kwargs)
+
+    def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        return self.client.messages.batches.create(requests=requests).id
+
+    def batch_ended(self, batch_id: str) -> bool:
+        return self.client.messages.batches.retrieve(batch_id).processing_status == "ended"
+
+    def batch_results(self, batch_id: str) -> Iterator[Tuple[str, Any]]:
+        for item in self.client.messages.batches.results(batch_id):
+            if item.result.type == "succeeded":
+                yield item.custom_id, item.result.message
+            elif item.result.type == "errored":
+                yield item.custom_id, RuntimeError(f"{item.result.error.error.type}: {item.result.error.error.message}")
+            else:
+                yield item.custom_id, RuntimeError(f"Batch request {item.result.type}")
+
+
+class FakeBackend(AnthropicBackend):
+    """The SDK talking to a process-local fake_llm_server, so no key or network is needed"""
+
+    name = "fake"
+
+    def __init__(self, api_key: str = "", base_url: Optional[str] = None):
+        super().__init__(api_key or "fake-key", base_url=base_url or shared_fake_server_url())
+
+
+BACKENDS: Dict[str, Callable[[str], LLMBackend]] = {
+    'anthropic': lambda api_key: AnthropicBackend(api_key, base_url=os.environ.get("LLM_BASE_URL") or None),
+    'fake': FakeBackend,
+}
+
+
+def backend_name() -> str:
+    return os.environ.get("LLM_BACKEND", "anthropic")
+
+
+def backend_needs_api_key() -> bool:
+    """Whether the sidebar has to ask for an API key before the configured backend can be used"""
+    return backend_name() != "fake"
+
+
+def create_backend(api_key: str) -> LLMBackend:
+    """A new backend of the configured kind for api_key"""
+    name = backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND {name!r}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](api_key)
+
+
+_fake_server = None
+_fake_server_lock = threading.Lock()
+
+
+def shared_fake_server_url() -> str:
+    """Start the in-process fake server on first use (configured from FAKE_LLM_* variables)"""
+    global _fake_server
+    with _fake_server_lock:
+        if _fake_server is None:
+            from fake_llm_server import FakeLLM, start_in_thread
+            _fake_server = start_in_thread(FakeLLM(
+                latency_ms=float(os.environ.get("FAKE_LLM_LATENCY_MS", "300")),
+                latency_sigma=float(os.environ.get("FAKE_LLM_LATENCY_SIGMA", "0.5")),
+                error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0")),
+                rate_limit_rate=float(os.environ.get("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+                seed=int(os.environ.get("FAKE_LLM_SEED", "0")),
+                batch_seconds=float(os.environ.get("FAKE_LLM_BATCH_SECONDS", "2")),
+            ))
+        return _fake_server.base_url
@@ -0,0 +1,353 @@
+"""Concurrent-session load test: N simulated users driving the real app against the fake model backend
+
+Every session is a streamlit AppTest running interview_prep_main.py in this process, so all
+sessions share the response cache, client pool, evaluation queue and performance store exactly
+as browser sessions on one server do. Each iteration a session sends a chat message, submits a
+DSA answer and waits for its grade, then opens the progress page.
+
+    python load_test.py --sessions 20 --iterations 3 -o bench.json
+    python load_test.py --sessions 20 --iterations 3 -o bench-new.json --compare bench.json
+
+The JSON report holds per-action script-rerun times, end-to-end latency (p50/p95/p99),
+model-call latency, memory per session and throughput.
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interview_prep_main.py")
+PERCENTILES = (50, 95, 99)
+
+
+def configure_environment(args):
+    """Fake backend and a throwaway store, set before any app module reads the environment"""
+    data_dir = tempfile.mkdtemp(prefix="load-test-")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        "PERFORMANCE_DB_PATH": os.path.join(data_dir, "performance.sqlite3"),
+        "SESSION_STATE_PATH": os.path.join(data_dir, "session_state.sqlite3"),
+    })
+    # The point is to load the app, not the admission controller; respect explicit settings though
+    os.environ.setdefault("AI_RATE_LIMIT_RPS", "1000")
+    os.environ.setdefault("AI_RATE_LIMIT_BURST", "1000")
+    os.environ.setdefault("AI_MAX_QUEUED_REQUESTS", "10000")
+    os.environ.pop("AI_CACHE_PATH", None)
+
+
+def install_shared_runtime():
+    """Let several AppTests run at once
+
+    AppTest installs a mock Runtime singleton (and patches config.get_option) for the length
+    of each run and tears both down afterwards, which breaks overlapping runs. Here one shared
+    mock runtime stays installed, as the single real runtime would in a server, and AppTest's
+    per-run setup writes to a throwaway subclass instead. The compiled script is shared too,
+    as it is in a server; AppTest would otherwise recompile it on every run (and concurrent
+    ast.parse calls are not thread-safe on some CPython versions).
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    components = app_test.BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = components
+    Runtime._instance = runtime
+    app_test.Runtime = type("SessionRuntime", (Runtime,), {})
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        # Peak rather than current RSS where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class Recorder:
+    """Thread-safe lists of samples per metric and action"""
+
+    def __init__(self):
+        self.samples: Dict[str, Dict[str, List[float]]] = {}
+        self.errors: List[str] = []
+        self._lock = threading.Lock()
+
+    def add(self, metric: str, action: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(metric, {}).setdefault(action, []).append(seconds)
+
+    def error(self, message: str):
+        with self._lock:
+            self.errors.append(message)
+
+    def count(self, metric: str) -> int:
+        with self._lock:
+            return sum(len(values) for values in self.samples.get(metric, {}).values())
+
+    def summary(self, metric: str) -> Dict[str, Dict[str, float]]:
+        from batch_grade import percentile
+
+        with self._lock:
+            actions = {action: list(values) for action, values in self.samples.get(metric, {}).items()}
+        result = {}
+        for action, values in sorted(actions.items()):
+            stats = {'count': len(values), 'mean': round(sum(values) / len(values), 4)}
+            for pct in PERCENTILES:
+                stats[f'p{pct}'] = round(percentile(values, pct), 4)
+            result[action] = stats
+        return result
+
+
+class TimedBackend:
+    """Wraps a backend to record client-observed model latency"""
+
+    def __init__(self, backend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def create(self, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.backend.create(**kwargs)
+        finally:
+            call = 'tool call' if 'tools' in kwargs else 'create'
+            self.recorder.add('model_call_seconds', call, time.perf_counter() - start)
+
+    @contextmanager
+    def stream(self, **kwargs):
+        start = time.perf_counter()
+        with self.backend.stream(**kwargs) as stream:
+            yield stream
+        self.recorder.add('model_call_seconds', 'stream', time.perf_counter() - start)
+
+
+class Session:
+    """One simulated user; every interaction is a real script rerun"""
+
+    def __init__(self, number: int, recorder: Recorder, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.recorder = recorder
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.app.query_params["user"] = f"load-{number}"
+
+    def _run(self, action: str, interact=None) -> float:
+        """Apply interact (a widget change) and rerun, recording the rerun time"""
+        start = time.perf_counter()
+        (interact() if interact else self.app).run()
+        elapsed = time.perf_counter() - start
+        self.recorder.add('rerun_seconds', action, elapsed)
+        if self.app.exception:
+            raise RuntimeError(f"{action}: {self.app.exception[0].message}")
+        return elapsed
+
+    def _page(self, name: str):
+        self._run(f"open {name}", lambda: self.app.sidebar.selectbox[0].select(name))
+
+    def start(self):
+        self._run("first load")
+
+    def chat(self, iteration: int):
+        self._page("💬 AI Chat Coach")
+        message = f"Session {self.number}, question {iteration}: how should I pace a 45 minute coding round?"
+        elapsed = self._run("chat message", lambda: self.app.chat_input[0].set_value(message))
+        self.recorder.add('end_to_end_seconds', 'chat', elapsed)
+
+    def mock_interview(self, iteration: int):
+        from eval_queue import shared_queue
+
+        self._page("📝 Mock Interview")
+        start = time.perf_counter()
+        self._run("new question", lambda: next(b for b in self.app.button if b.label.startswith("Generate New")).click())
+        code, explanation = self.app.text_area[0], self.app.text_area[1]
+        code.input(f"def solution(nums):  # session {self.number} iteration {iteration}\n    return sorted(nums)")
+        explanation.input("Sort, then scan once. O(n log n) time, O(n) space.")
+        self._run("submit answer", lambda: next(b for b in self.app.button if b.label == "Submit Solution").click())
+
+        queue = shared_queue()
+        job_ids = list(self.app.session_state.pending_evaluations)
+        while not all((job := queue.get(job_id)) is None or job.finished for job_id in job_ids):
+            time.sleep(0.05)
+        self._run("show grade")
+        self.recorder.add('end_to_end_seconds', 'graded answer', time.perf_counter() - start)
+        if not any("Score:" in m.value for m in self.app.markdown):
+            failed = [e.value for e in self.app.error]
+            raise RuntimeError(f"no grade shown{': ' + failed[0] if failed else ''}")
+
+    def progress(self):
+        elapsed = self._run("progress page", lambda: self.app.sidebar.selectbox[0].select("📈 Progress Tracking"))
+        self.recorder.add('end_to_end_seconds', 'progress page', elapsed)
+
+
+def run_session(number: int, iterations: int, delay: float, recorder: Recorder, timeout: float,
+                started: threading.Barrier):
+    time.sleep(delay)
+    try:
+        session = Session(number, recorder, timeout)
+        session.start()
+    except Exception as e:
+        recorder.error(f"session {number} start: {e}")
+        started.wait()
+        return
+    started.wait()
+    for iteration in range(iterations):
+        for step in (lambda: session.chat(iteration), lambda: session.mock_interview(iteration), session.progress):
+            try:
+                step()
+            except Exception as e:
+                recorder.error(f"session {number}: {e}")
+
+
+def git_version() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP_PATH), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_load_test(args) -> Dict[str, Any]:
+    from client_pool import shared_registry
+
+    install_shared_runtime()
+    recorder = Recorder()
+
+    # One untimed session pays the import and first-render cost before the baseline is taken
+    Session(-1, Recorder(), args.timeout).start()
+    client = shared_registry().get("local")
+    client.backend = TimedBackend(client.backend, recorder)
+    baseline = rss_mb()
+
+    started = threading.Barrier(args.sessions + 1)
+    threads = [
+        threading.Thread(target=run_session, name=f"session-{n}",
+                         args=(n, args.iterations, args.ramp_seconds * n / args.sessions, recorder,
+                               args.timeout, started))
+        for n in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    started.wait()
+    loaded = rss_mb()
+    peak = loaded
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.25)
+        peak = max(peak, rss_mb())
+    wall = time.perf_counter() - start
+
+    actions = recorder.count('end_to_end_seconds')
+    return {
+        'version': git_version(),
+        'started_at': datetime.now().isoformat(timespec="seconds"),
+        'config': {
+            'sessions': args.sessions,
+            'iterations': args.iterations,
+            'ramp_seconds': args.ramp_seconds,
+            'latency_ms': args.latency_ms,
+            'latency_sigma': args.latency_sigma,
+            'error_rate': args.error_rate,
+            'rate_limit_rate': args.rate_limit_rate,
+            'seed': args.seed,
+        },
+        'wall_seconds': round(wall, 3),
+        'throughput': {
+            'actions_per_second': round(actions / wall, 3),
+            'model_calls_per_second': round(recorder.count('model_call_seconds') / wall, 3),
+        },
+        'end_to_end_seconds': recorder.summary('end_to_end_seconds'),
+        'rerun_seconds': recorder.summary('rerun_seconds'),
+        'model_call_seconds': recorder.summary('model_call_seconds'),
+        'memory_mb': {
+            'baseline': round(baseline, 1),
+            'after_sessions_started': round(loaded, 1),
+            'peak': round(peak, 1),
+            'per_session': round((loaded - baseline) / args.sessions, 2),
+        },
+        'client': client.stats(),
+        'errors': {'count': len(recorder.errors), 'samples': recorder.errors[:20]},
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    """Lines describing how p50/p95 end-to-end latency and throughput moved since previous"""
+    def change(new: float, old: float) -> str:
+        return f"{old:.3f} -> {new:.3f} ({(new - old) / old:+.0%})" if old else f"{old} -> {new}"
+
+    lines = [f"Compared with {previous.get('version') or 'previous run'} ({previous.get('started_at')}):"]
+    for action, stats in current['end_to_end_seconds'].items():
+        old = previous.get('end_to_end_seconds', {}).get(action)
+        if old:
+            lines.append(f"  {action}: p50 {change(stats['p50'], old['p50'])}, p95 {change(stats['p95'], old['p95'])}")
+    old_rate = previous.get('throughput', {}).get('actions_per_second', 0)
+    lines.append(f"  actions/s: {change(current['throughput']['actions_per_second'], old_rate)}")
+    old_memory = previous.get('memory_mb', {}).get('per_session', 0)
+    lines.append(f"  MB/session: {change(current['memory_mb']['per_session'], old_memory)}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated sessions")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=2, help="Chat/mock/progress rounds per user")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="Spread session start-up over this long")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median fake model latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal spread of model latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of model calls failing with 500/529")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of model calls failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Longest a single rerun may take")
+    parser.add_argument("-o", "--output", default="load_test_results.json", help="JSON report path")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    # The app resolves question_banks/ relative to the working directory
+    args.output = os.path.abspath(args.output)
+    args.compare = args.compare and os.path.abspath(args.compare)
+    os.chdir(os.path.dirname(APP_PATH))
+    # The SDK warns about the default model's deprecation on every call
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    configure_environment(args)
+    report = run_load_test(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({key: report[key] for key in ('wall_seconds', 'throughput', 'end_to_end_seconds',
+                                                   'memory_mb', 'errors')}, indent=2))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print("\n".join(compare(report, json.load(f))))
+
+
+if __name__ == "__main__":
+    main()
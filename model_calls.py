@@ -0,0 +1,248 @@
+"""Model calls shared by the pages: coaching replies (plain and streamed) and structured grading
+
+All of them go through the shared response cache, coalesce identical in-flight requests
+into one upstream call and are instrumented with telemetry spans. Chat coach questions
+asked without earlier turns also go through the similarity cache (semantic_cache.py).
+"""
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import streamlit as st
+
+from code_runner import format_report
+from grading import GradingError, grade_answer, grading_request
+from llm_backend import model_for
+from prompts import MAX_TOKENS, build_coach_request, coach_system_blocks, system_text
+from resilience import CircuitOpen
+from response_cache import make_cache_key, shared_cache
+from semantic_cache import shared_semantic_cache
+from single_flight import shared_single_flight
+from telemetry import span
+
+def build_request(prompt: str, context: str, history: Optional[List[Dict]] = None,
+                  system: Optional[List[Dict]] = None):
+    """(system blocks, messages) for a call; without system, prompt is a coaching request
+
+    The stable instructions travel in cache-marked system blocks and only the short
+    variable tail goes into the final user message.
+    """
+    if system is None:
+        system = coach_system_blocks()
+        prompt = build_coach_request(prompt, context)
+    return system, list(history or []) + [{"role": "user", "content": prompt}]
+
+def error_reply(error: Exception) -> str:
+    """What the user sees instead of a reply; an open circuit breaker gets a short notice, not a stack of errors"""
+    if isinstance(error, CircuitOpen):
+        return f"⚠️ {error}. Answers that were asked before are still served from the cache."
+    return f"Error getting AI response: {error}"
+
+def request_cache_key(model: str, system: List[Dict], messages: List[Dict]) -> str:
+    """Response cache key over everything that is sent to the model"""
+    return make_cache_key(messages[-1]['content'], system_text(system), model, MAX_TOKENS, messages[:-1])
+
+def semantic_scope(semantic: bool, model: str, system: List[Dict], context: str,
+                   history: Optional[List[Dict]]) -> Optional[str]:
+    """Similarity cache scope for a call, or None when a reworded question must not reuse an answer
+
+    Only standalone questions qualify: with earlier turns the reply depends on the conversation.
+    """
+    if not semantic or history:
+        return None
+    return make_cache_key("", f"{system_text(system)}\n\n{context}", model, MAX_TOKENS)
+
+def similar_reply(scope: Optional[str], prompt: str, attributes: Dict) -> Optional[str]:
+    """A cached reply to a close rewording of prompt, recording the hit on the span"""
+    if scope is None:
+        return None
+    similar = shared_semantic_cache().get(scope, prompt)
+    attributes['semantic_hit'] = similar is not None
+    if similar is None:
+        return None
+    attributes['similarity'] = round(similar[1], 3)
+    return similar[0]
+
+def complete(client, prompt: str, context: str = "", use_cache: bool = True,
+             history: Optional[List[Dict]] = None, system: Optional[List[Dict]] = None,
+             span_name: str = "get_ai_response", semantic: bool = False) -> str:
+    """Text of one model call, served from the shared response cache when possible; raises on failure
+
+    With semantic, a standalone question may also be answered from the similarity cache.
+    """
+    with span(span_name) as attributes:
+        model = model_for('chat')
+        scope = semantic_scope(semantic, model, system or coach_system_blocks(), context, history)
+        system, messages = build_request(prompt, context, history, system)
+        cache = shared_cache()
+        cache_key = request_cache_key(model, system, messages)
+        if use_cache:
+            cached = cache.get(cache_key)
+            attributes['cache_hit'] = cached is not None
+            if cached is not None:
+                return cached
+            similar = similar_reply(scope, prompt, attributes)
+            if similar is not None:
+                return similar
+        
+        def call() -> str:
+            start = time.perf_counter()
+            message = client.create(
+                model=model,
+                max_tokens=MAX_TOKENS,
+                system=system,
+                messages=messages
+            )
+            text = message.content[0].text
+            attributes.update(input_tokens=message.usage.input_tokens, output_tokens=message.usage.output_tokens)
+            
+            # Only successful responses are cached; errors propagate to the caller
+            cost = {
+                'latency': time.perf_counter() - start,
+                'input_tokens': message.usage.input_tokens,
+                'output_tokens': message.usage.output_tokens,
+            }
+            cache.set(cache_key, text, **cost)
+            if scope is not None:
+                shared_semantic_cache().set(scope, prompt, text, **cost)
+            return text
+        
+        # Identical requests already in flight (a cohort clicking the same suggestion) share one call
+        text, attributes['coalesced'] = shared_single_flight().do(cache_key, call)
+        return text
+
+def get_ai_response(prompt: str, context: str = "", use_cache: bool = True, client=None,
+                    history: Optional[List[Dict]] = None, system: Optional[List[Dict]] = None,
+                    semantic: bool = False) -> str:
+    """Get response from Claude API, served from the shared response cache when possible
+
+    Pass client explicitly when calling from a worker thread, where st.session_state is unavailable.
+    history holds earlier {'role', 'content'} turns to send ahead of this request. semantic
+    lets a standalone question reuse the answer to a close rewording (the chat coach).
+    """
+    client = client or st.session_state.claude_client
+    if not client:
+        return "Please configure Claude API key in the sidebar."
+    
+    try:
+        return complete(client, prompt, context, use_cache, history, system, semantic=semantic)
+    except Exception as e:
+        return error_reply(e)
+
+def stream_ai_response(prompt: str, context: str = "", use_cache: bool = True, client=None,
+                       history: Optional[List[Dict]] = None,
+                       system: Optional[List[Dict]] = None, semantic: bool = False) -> Iterator[str]:
+    """Yield Claude's response as it is generated; cache hits (exact or, with semantic, similar) arrive as a single chunk"""
+    client = client or st.session_state.claude_client
+    if not client:
+        yield "Please configure Claude API key in the sidebar."
+        return
+    
+    with span("stream_ai_response") as attributes:
+        model = model_for('chat')
+        scope = semantic_scope(semantic, model, system or coach_system_blocks(), context, history)
+        system, messages = build_request(prompt, context, history, system)
+        cache = shared_cache()
+        cache_key = request_cache_key(model, system, messages)
+        if use_cache:
+            cached = cache.get(cache_key)
+            attributes['cache_hit'] = cached is not None
+            if cached is None:
+                cached = similar_reply(scope, prompt, attributes)
+            if cached is not None:
+                yield cached
+                return
+        
+        def call(publish) -> Dict[str, int]:
+            start = time.perf_counter()
+            chunks = []
+            with client.stream(
+                model=model,
+                max_tokens=MAX_TOKENS,
+                system=system,
+                messages=messages
+            ) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    publish(text)
+                final_message = stream.get_final_message()
+            
+            cost = {
+                'latency': time.perf_counter() - start,
+                'input_tokens': final_message.usage.input_tokens,
+                'output_tokens': final_message.usage.output_tokens,
+            }
+            cache.set(cache_key, "".join(chunks), **cost)
+            if scope is not None:
+                shared_semantic_cache().set(scope, prompt, "".join(chunks), **cost)
+            return {'input_tokens': final_message.usage.input_tokens,
+                    'output_tokens': final_message.usage.output_tokens}
+        
+        try:
+            start = time.perf_counter()
+            # Followers of an identical in-flight stream read the same chunks as they arrive
+            flight, attributes['coalesced'] = shared_single_flight().do_stream(cache_key, call)
+            for position, text in enumerate(flight.iter_chunks()):
+                if not position:
+                    attributes['first_chunk_seconds'] = round(time.perf_counter() - start, 4)
+                yield text
+            if not attributes['coalesced']:
+                attributes.update(flight.result)
+        except Exception as e:
+            attributes['error'] = type(e).__name__
+            yield error_reply(e)
+
+def evaluate_answer(question: Dict, answer: str, category: str, client=None,
+                    execution: Optional[Dict] = None, question_rubric: str = "") -> Dict:
+    """Grade user's answer with a structured (tool-use) call, served from the response cache when possible
+
+    execution is code_runner's report on the submitted code; the grade then rests on the
+    measured pass rate and timing curve. question_rubric is the prefetched rubric for this
+    question. Raises GradingError instead of guessing a score when no valid grade comes back.
+    """
+    client = client or st.session_state.claude_client
+    if not client:
+        raise GradingError("Please configure Claude API key in the sidebar.")
+    
+    with span("evaluate_answer", category=category, question_rubric=bool(question_rubric)) as attributes:
+        model = model_for('grading')
+        measured = format_report(execution) if execution else ""
+        request = grading_request(question, answer, category, measured, question_rubric)
+        cache = shared_cache()
+        cache_key = make_cache_key(
+            request['messages'][-1]['content'],
+            json.dumps({'system': request['system'], 'tools': request['tools']}, sort_keys=True),
+            model,
+            MAX_TOKENS
+        )
+        cached = cache.get(cache_key)
+        attributes['cache_hit'] = cached is not None
+        
+        def grade_and_cache() -> Dict:
+            grade = grade_answer(client, question, answer, category, model=model, measured=measured,
+                                 question_rubric=question_rubric)
+            attributes.update(input_tokens=grade['input_tokens'], output_tokens=grade['output_tokens'],
+                              repaired=grade['repaired'])
+            cache.set(
+                cache_key,
+                json.dumps({k: v for k, v in grade.items() if k not in ('latency', 'input_tokens', 'output_tokens')}),
+                latency=grade['latency'],
+                input_tokens=grade['input_tokens'],
+                output_tokens=grade['output_tokens']
+            )
+            return grade
+        
+        if cached is not None:
+            grade = json.loads(cached)
+        else:
+            # A GradingError from the shared call reaches every answer that waited on it
+            grade, attributes['coalesced'] = shared_single_flight().do(cache_key, grade_and_cache)
+    
+    return {
+        'score': grade['score'],
+        'sub_scores': grade['sub_scores'],
+        'feedback': grade['feedback'],
+        'execution': execution,
+        'timestamp': datetime.now()
+    }
@@ -0,0 +1,142 @@
+"""Near-duplicate detection for question text with MinHash signatures and an LSH index
+
+Each text becomes a set of character shingles; a MinHash signature estimates the Jaccard
+similarity of two such sets. Signatures are split into bands and each band is hashed into a
+bucket, so a lookup only compares against texts sharing at least one bucket instead of the
+whole bank, which keeps deduplicating tens of thousands of questions far from quadratic.
+
+    index = LSHIndex(threshold=0.6)
+    for key, text in existing:
+        index.add(key, index.signature(text))
+    signature = index.signature(candidate)
+    duplicate_of = index.query(signature)   # a key, or None
+"""
+import hashlib
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Largest prime below 2**32, for the (a * x + b) mod p hash family over 32-bit shingle hashes
+_PRIME = (1 << 32) - 5
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lower case with punctuation and repeated whitespace collapsed to single spaces"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Character size-grams of the normalized text (the whole text when it is shorter)"""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def lsh_bands(num_perm: int, threshold: float, recall: float = 0.95) -> Tuple[int, int]:
+    """(bands, rows) splitting num_perm so a pair at the threshold becomes a candidate with at least recall
+
+    Candidates are checked against the threshold afterwards, so more rows per band only trades
+    fewer comparisons for missed duplicates; the most rows that still keep recall is used.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class LSHIndex:
+    """MinHash signatures of indexed texts, bucketed by band for sub-linear similarity lookups"""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        # a, b < p and shingle hashes < 2**32, so a * x + b never overflows uint64
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+        # Signatures are rows of one growing matrix, so a lookup compares all its candidates in one step;
+        # rows of removed keys are reused
+        self._keys: List[Optional[Hashable]] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._free: List[int] = []
+        self._matrix = np.empty((1024, num_perm), dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.minhash(shingles(text, self.shingle_size))
+
+    def minhash(self, grams: Iterable[str]) -> np.ndarray:
+        """Signature of any set of strings (e.g. words instead of character shingles)"""
+        grams = set(grams) or {""}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams),
+            dtype=np.uint64, count=len(grams),
+        )
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key: Hashable, signature: np.ndarray):
+        self.remove(key)
+        if self._free:
+            row = self._free.pop()
+            self._keys[row] = key
+        else:
+            row = len(self._keys)
+            if row == len(self._matrix):
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+            self._keys.append(key)
+        self._matrix[row] = signature
+        self._rows[key] = row
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(row)
+
+    def remove(self, key: Hashable):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        for bucket, band_key in zip(self._buckets, self._band_keys(self._matrix[row])):
+            rows = bucket[band_key]
+            rows.remove(row)
+            if not rows:
+                del bucket[band_key]
+        self._keys[row] = None
+        self._free.append(row)
+
+    def _candidate_rows(self, signature: np.ndarray) -> Set[int]:
+        rows = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            rows.update(bucket.get(band_key, ()))
+        return rows
+
+    def candidates(self, signature: np.ndarray) -> List[Hashable]:
+        """Keys sharing at least one band with signature, unverified (for callers with an exact check of their own)"""
+        return [self._keys[row] for row in self._candidate_rows(signature)]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+        return float(np.mean(first == second))
+
+    def query(self, signature: np.ndarray) -> Optional[Hashable]:
+        """Key of the most similar indexed text at or above the threshold, or None"""
+        candidates = self._candidate_rows(signature)
+        if not candidates:
+            return None
+        rows = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        similarities = (self._matrix[rows] == signature).mean(axis=1)
+        best = int(similarities.argmax())
+        return self._keys[rows[best]] if similarities[best] >= self.threshold else None
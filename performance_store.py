@@ -0,0 +1,270 @@
+"""Durable, append-only store of interview attempts (SQLite) with batched writes"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Attempts scoring at least this count as a solved question (same bar as the positive feedback card)
+SOLVED_SCORE = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    question_id TEXT,
+    topic TEXT,
+    score INTEGER NOT NULL,
+    time_to_answer REAL,
+    feedback_id INTEGER REFERENCES feedback(id),
+    created_at REAL NOT NULL,
+    sub_scores TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_time ON attempts (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_category_time ON attempts (user_id, category, created_at);
+CREATE TABLE IF NOT EXISTS category_totals (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    solved INTEGER NOT NULL,
+    study_seconds REAL NOT NULL,
+    PRIMARY KEY (user_id, category)
+);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    study_seconds REAL NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+"""
+
+# Running aggregates are bumped in the same transaction as the attempt insert
+UPSERT_CATEGORY_TOTALS = """
+INSERT INTO category_totals (user_id, category, attempts, score_sum, solved, study_seconds)
+VALUES (?, ?, 1, ?, ?, ?)
+ON CONFLICT (user_id, category) DO UPDATE SET
+    attempts = attempts + 1,
+    score_sum = score_sum + excluded.score_sum,
+    solved = solved + excluded.solved,
+    study_seconds = study_seconds + excluded.study_seconds
+"""
+
+UPSERT_DAILY_TOTALS = """
+INSERT INTO daily_totals (user_id, day, attempts, score_sum, study_seconds)
+VALUES (?, ?, 1, ?, ?)
+ON CONFLICT (user_id, day) DO UPDATE SET
+    attempts = attempts + 1,
+    score_sum = score_sum + excluded.score_sum,
+    study_seconds = study_seconds + excluded.study_seconds
+"""
+
+
+class PerformanceStore:
+    """One row per graded attempt; writes are buffered and flushed in batches"""
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._flusher = threading.Thread(target=self._flush_periodically, name="performance-store-flush", daemon=True)
+        self._flusher.start()
+
+    def _migrate(self):
+        """Add columns and backfill aggregates introduced after a database file was first created"""
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(attempts)")}
+        if 'topic' not in columns:
+            self._db.execute("ALTER TABLE attempts ADD COLUMN topic TEXT")
+        if 'sub_scores' not in columns:
+            self._db.execute("ALTER TABLE attempts ADD COLUMN sub_scores TEXT")
+        has_totals = self._db.execute("SELECT 1 FROM category_totals LIMIT 1").fetchone()
+        has_attempts = self._db.execute("SELECT 1 FROM attempts LIMIT 1").fetchone()
+        if has_attempts and not has_totals:
+            self._db.execute(
+                "INSERT INTO category_totals "
+                "SELECT user_id, category, COUNT(*), SUM(score), SUM(score >= ?), COALESCE(SUM(time_to_answer), 0) "
+                "FROM attempts GROUP BY user_id, category",
+                (SOLVED_SCORE,)
+            )
+            self._db.execute(
+                "INSERT INTO daily_totals "
+                "SELECT user_id, date(created_at, 'unixepoch', 'localtime'), COUNT(*), SUM(score), "
+                "COALESCE(SUM(time_to_answer), 0) FROM attempts GROUP BY 1, 2"
+            )
+        self._db.commit()
+
+    def record_attempt(self, user_id: str, category: str, score: int, question_id: Optional[Any] = None,
+                       topic: Optional[str] = None, time_to_answer: Optional[float] = None,
+                       feedback: Optional[str] = None, created_at: Optional[float] = None,
+                       sub_scores: Optional[Dict[str, int]] = None):
+        """Queue an attempt for the next batched write; sub_scores are stored as JSON"""
+        attempt = {
+            'user_id': user_id,
+            'category': category,
+            'question_id': None if question_id is None else str(question_id),
+            'topic': topic,
+            'score': int(score),
+            'time_to_answer': time_to_answer,
+            'feedback': feedback,
+            'created_at': created_at if created_at is not None else time.time(),
+            'sub_scores': json.dumps(sub_scores, sort_keys=True) if sub_scores else None,
+        }
+        with self._lock:
+            self._buffer.append(attempt)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        with self._db:
+            for attempt in self._buffer:
+                feedback_id = None
+                if attempt['feedback']:
+                    feedback_id = self._db.execute(
+                        "INSERT INTO feedback (text) VALUES (?)", (attempt['feedback'],)
+                    ).lastrowid
+                self._db.execute(
+                    "INSERT INTO attempts (user_id, category, question_id, topic, score, time_to_answer, feedback_id, "
+                    "created_at, sub_scores) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (attempt['user_id'], attempt['category'], attempt['question_id'], attempt['topic'],
+                     attempt['score'], attempt['time_to_answer'], feedback_id, attempt['created_at'],
+                     attempt['sub_scores'])
+                )
+                study_seconds = attempt['time_to_answer'] or 0.0
+                self._db.execute(
+                    UPSERT_CATEGORY_TOTALS,
+                    (attempt['user_id'], attempt['category'], attempt['score'],
+                     int(attempt['score'] >= SOLVED_SCORE), study_seconds)
+                )
+                day = datetime.fromtimestamp(attempt['created_at']).date().isoformat()
+                self._db.execute(
+                    UPSERT_DAILY_TOTALS,
+                    (attempt['user_id'], day, attempt['score'], study_seconds)
+                )
+        self._buffer.clear()
+
+    def flush(self):
+        """Write any buffered attempts now"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the buffer and try again on the next tick
+                continue
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        # Reads flush first so a user always sees their own latest attempt
+        with self._lock:
+            self._flush_locked()
+            cursor = self._db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def attempts(self, user_id: str, category: Optional[str] = None,
+                 since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """A user's attempts in time order, optionally filtered by category and start time"""
+        sql = ("SELECT id, category, question_id, topic, score, sub_scores, time_to_answer, feedback_id, created_at "
+               "FROM attempts WHERE user_id = ?")
+        params: List[Any] = [user_id]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        return self._query(sql + " ORDER BY created_at", tuple(params))
+
+    def attempt_columns(self, user_id: str) -> Dict[str, List[Any]]:
+        """A user's attempts as column lists (cheap to turn into a DataFrame)"""
+        with self._lock:
+            self._flush_locked()
+            cursor = self._db.execute(
+                "SELECT category, question_id, topic, score, time_to_answer, created_at "
+                "FROM attempts WHERE user_id = ? ORDER BY created_at",
+                (user_id,)
+            )
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {column: list(value) for column, value in zip(columns, values)}
+
+    def category_summary(self, user_id: str) -> Dict[str, Dict[str, float]]:
+        """Attempt count and average score per category"""
+        rows = self._query(
+            "SELECT category, COUNT(*) AS attempts, AVG(score) AS average FROM attempts "
+            "WHERE user_id = ? GROUP BY category",
+            (user_id,)
+        )
+        return {row['category']: {'attempts': row['attempts'], 'average': row['average']} for row in rows}
+
+    def category_totals(self, user_id: str) -> Dict[str, Dict[str, float]]:
+        """Running per-category totals (attempts, score_sum, solved, study_seconds) without touching attempts"""
+        rows = self._query(
+            "SELECT category, attempts, score_sum, solved, study_seconds FROM category_totals WHERE user_id = ?",
+            (user_id,)
+        )
+        return {row.pop('category'): row for row in rows}
+
+    def daily_totals(self, user_id: str, since: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Running per-day totals in date order, optionally from a given day onwards"""
+        since_day = (since or date.min).isoformat()
+        return self._query(
+            "SELECT day, attempts, score_sum, study_seconds FROM daily_totals "
+            "WHERE user_id = ? AND day >= ? ORDER BY day",
+            (user_id, since_day)
+        )
+
+    def study_seconds_since(self, user_id: str, days: int) -> float:
+        """Time spent answering questions over the last `days` days, including today"""
+        since = date.today() - timedelta(days=days - 1)
+        return sum(row['study_seconds'] for row in self.daily_totals(user_id, since))
+
+    def feedback(self, feedback_id: int) -> Optional[str]:
+        """Full feedback text behind an attempt's feedback_id"""
+        rows = self._query("SELECT text FROM feedback WHERE id = ?", (feedback_id,))
+        return rows[0]['text'] if rows else None
+
+    def version(self, user_id: str) -> int:
+        """Changes whenever the user gets a new attempt; cheap key for memoizing derived views"""
+        rows = self._query("SELECT COALESCE(MAX(id), 0) AS version FROM attempts WHERE user_id = ?", (user_id,))
+        return rows[0]['version']
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def shared_store() -> PerformanceStore:
+    """Process-wide store at PERFORMANCE_DB_PATH (default data/performance.sqlite3)"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = PerformanceStore(
+                os.environ.get("PERFORMANCE_DB_PATH", os.path.join("data", "performance.sqlite3")),
+                batch_size=int(os.environ.get("PERFORMANCE_DB_BATCH_SIZE", "50")),
+            )
+        return _shared_store
@@ -0,0 +1,174 @@
+"""Background prefetch of reference material for the active mock interview question
+
+As soon as a question is drawn, a grading rubric tailored to it, a model answer and likely
+follow-up questions are generated off the script thread:
+
+    job_id = shared_prefetcher().start(question, category, client)
+    job = shared_prefetcher().get(job_id)
+    job.result('reference')          # None until it is ready
+    job.result('rubric', timeout=5)  # wait a little if it is still being generated
+
+Everything goes through model_calls.complete, so the texts also land in the shared response
+cache and identical prefetches from other sessions share one call. Drawing the next question
+cancels the previous job: artifacts not started yet are dropped, a call already in flight
+finishes and is cached. The queue is bounded too: once more than max_pending artifacts are
+waiting for a worker, the oldest queued ones are dropped to make room, since their sessions
+have most likely moved on.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from grading import SUB_SCORE_DIMENSIONS
+from model_calls import complete
+from prompts import (FOLLOW_UP_INSTRUCTIONS, REFERENCE_ANSWER_INSTRUCTIONS, build_rubric_prompt,
+                     question_system_blocks)
+
+# In the order they are generated: evaluation waits on the rubric, the others only on a click
+ARTIFACTS = ('rubric', 'reference', 'follow_ups')
+
+
+def artifact_prompt(name: str, category: str) -> str:
+    if name == 'rubric':
+        return build_rubric_prompt(category, SUB_SCORE_DIMENSIONS[category])
+    if name == 'reference':
+        return REFERENCE_ANSWER_INSTRUCTIONS[category]
+    return FOLLOW_UP_INSTRUCTIONS
+
+
+class PrefetchJob:
+    """Reference material being generated for one question on behalf of one session"""
+
+    def __init__(self, job_id: str, question: Dict[str, Any], category: str):
+        self.id = job_id
+        self.question = question
+        self.category = category
+        self.question_id = question.get('id', question.get('principle'))
+        self.futures: Dict[str, Future] = {}
+        self.cancelled = threading.Event()
+        self.created_at = time.time()
+
+    def is_for(self, question: Dict[str, Any], category: str) -> bool:
+        return self.category == category and self.question_id == question.get('id', question.get('principle'))
+
+    def status(self, name: str) -> str:
+        """pending, running, done, failed or cancelled"""
+        future = self.futures[name]
+        if future.cancelled() or (future.done() and isinstance(future.exception(), CancelledError)):
+            return 'cancelled'
+        if future.done():
+            return 'failed' if future.exception() is not None else 'done'
+        return 'running' if future.running() else 'pending'
+
+    def result(self, name: str, timeout: float = 0) -> Optional[str]:
+        """The artifact's text, waiting up to timeout seconds; None if it is not (or never will be) ready"""
+        future = self.futures[name]
+        if timeout <= 0 and not future.done():
+            return None
+        try:
+            return future.result(timeout=timeout or None)
+        except Exception:
+            # Still running after timeout, cancelled, or the call failed (see error())
+            return None
+
+    def error(self, name: str) -> Optional[str]:
+        if self.status(name) != 'failed':
+            return None
+        return str(self.futures[name].exception())
+
+    @property
+    def finished(self) -> bool:
+        return all(future.done() for future in self.futures.values())
+
+    def cancel(self):
+        """Drop the artifacts that have not started; one already in flight still finishes and is cached"""
+        self.cancelled.set()
+        for future in self.futures.values():
+            future.cancel()
+
+
+class Prefetcher:
+    """Worker pool generating prefetch jobs; jobs are kept for a while so reruns and evaluations can collect them"""
+
+    def __init__(self, max_workers: int = 4, keep_seconds: float = 3600, max_pending: int = 12):
+        self.keep_seconds = keep_seconds
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._jobs: Dict[str, PrefetchJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._counters = {'started': 0, 'cancelled': 0, 'shed': 0}
+
+    def start(self, question: Dict[str, Any], category: str, client) -> str:
+        """Queue every artifact for question; client is captured because workers cannot read st.session_state"""
+        with self._lock:
+            self._prune()
+            self._shed(len(ARTIFACTS))
+            job = PrefetchJob(f"prefetch-{next(self._ids)}", question, category)
+            self._jobs[job.id] = job
+            self._counters['started'] += 1
+        for name in ARTIFACTS:
+            job.futures[name] = self._pool.submit(self._generate, job, name, client)
+        return job.id
+
+    def _generate(self, job: PrefetchJob, name: str, client) -> str:
+        if job.cancelled.is_set():
+            raise CancelledError()
+        return complete(
+            client,
+            artifact_prompt(name, job.category),
+            system=question_system_blocks(job.question, job.category),
+            span_name=f"prefetch.{name}",
+        )
+
+    def get(self, job_id: Optional[str]) -> Optional[PrefetchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: Optional[str]):
+        job = self.get(job_id)
+        if job is not None and not job.cancelled.is_set():
+            job.cancel()
+            with self._lock:
+                self._counters['cancelled'] += 1
+
+    def _shed(self, incoming: int):
+        """Drop the oldest queued artifacts so incoming more stay within max_pending"""
+        queued = [future for job in self._jobs.values() for future in list(job.futures.values())
+                  if not future.running() and not future.done()]
+        for future in queued[:max(0, len(queued) + incoming - self.max_pending)]:
+            if future.cancel():
+                self._counters['shed'] += 1
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.created_at < cutoff and job.finished]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            jobs: List[PrefetchJob] = list(self._jobs.values())
+            counters = dict(self._counters)
+        statuses = [job.status(name) for job in jobs for name in list(job.futures)]
+        counters.update({status: statuses.count(status) for status in ('pending', 'running', 'done', 'failed')})
+        return counters
+
+
+_shared_prefetcher = None
+_shared_prefetcher_lock = threading.Lock()
+
+
+def shared_prefetcher() -> Prefetcher:
+    """Process-wide prefetcher, sized from the environment on first use"""
+    global _shared_prefetcher
+    with _shared_prefetcher_lock:
+        if _shared_prefetcher is None:
+            _shared_prefetcher = Prefetcher(
+                max_workers=int(os.environ.get("PREFETCH_WORKERS", "4")),
+                max_pending=int(os.environ.get("PREFETCH_MAX_PENDING", "12")),
+            )
+        return _shared_prefetcher
@@ -0,0 +1,174 @@
+"""Prompt templates shared by the Streamlit app and the headless tools
+
+Stable instructions go in system blocks marked for provider-side prompt caching; only the
+short per-request tail (context, user message, answer) changes from call to call.
+"""
+from typing import Any, Dict, List
+
+CLAUDE_MODEL = "claude-3-sonnet-20240229"
+MAX_TOKENS = 1500
+
+COACH_INSTRUCTIONS = """You are an expert Amazon SDE II interview coach. You provide detailed, constructive feedback and guidance.
+
+Provide a comprehensive response that includes:
+1. Direct answer to the question/request
+2. Specific feedback and suggestions
+3. Areas for improvement
+4. Follow-up questions if appropriate"""
+
+EVALUATION_RUBRIC = """You are grading a mock interview answer for an Amazon SDE II position.
+
+Record the evaluation with the record_grade tool:
+- score: overall score out of 10, as an Amazon SDE II interviewer would give it
+- sub_scores: a 0-10 score for every dimension listed in the tool schema
+- strengths: what the answer did well
+- weaknesses: areas for improvement
+- suggestions: specific suggestions for a stronger answer
+
+When the answer comes with results measured by running the code, grade correctness and
+complexity on those results rather than on reading the code alone."""
+
+
+# Reference material prefetched for the active mock interview question (see prefetch.py)
+REFERENCE_ANSWER_INSTRUCTIONS = {
+    "DSA": "Write a model answer: an optimal Python solution, a short explanation of the approach, "
+           "and its time and space complexity.",
+    "System Design": "Write a model answer covering requirements and scale estimates, the high-level "
+                     "design, the data model, and a deep dive into bottlenecks and trade-offs.",
+    "Behavioral": "Write a model STAR answer (Situation, Task, Action, Result) that clearly demonstrates "
+                  "the Leadership Principle, with a measurable result.",
+}
+
+FOLLOW_UP_INSTRUCTIONS = """List 3 to 5 follow-up questions an Amazon interviewer is likely to ask after this question.
+Reply with one question per line and nothing else."""
+
+# Offline question generation (see generate_questions.py)
+GENERATION_INSTRUCTIONS = """You write new questions for an Amazon SDE II interview question bank.
+
+Record them with the record_questions tool. Every question must be self-contained, at the level
+of a real Amazon SDE II loop, and clearly different from the other questions you write and from
+the bank questions you are shown."""
+
+GENERATION_GUIDES = {
+    "DSA": "Each question is a coding problem with its difficulty, its topic, two or three hints that "
+           "do not give the solution away, and the expected approach with its time complexity.",
+    "System Design": "Each question asks to design a real system. List the focus areas an interviewer "
+                     "probes and the key components a strong answer includes.",
+    "Behavioral": "Each question asks for a past experience that shows the given Leadership Principle, "
+                  "phrased the way an Amazon interviewer would ask it.",
+}
+
+
+def cached_block(text: str) -> Dict[str, Any]:
+    """A system text block the provider may cache as a reusable prefix"""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def coach_system_blocks() -> List[Dict[str, Any]]:
+    """System prefix for chat coaching calls"""
+    return [cached_block(COACH_INSTRUCTIONS)]
+
+
+def question_brief(question: Any, category: str) -> str:
+    """Everything about the question itself (hints, focus areas, principle), independent of the answer"""
+    if not isinstance(question, dict):
+        return f"{category} question: {question}"
+    lines = [f"{category} question: {question['question']}"]
+    labels = {
+        'topic': "Topic",
+        'difficulty': "Difficulty",
+        'hints': "Hints",
+        'expected_approach': "Expected approach",
+        'focus_areas': "Focus areas",
+        'key_components': "Key components",
+        'principle': "Leadership Principle",
+    }
+    for field, label in labels.items():
+        value = question.get(field)
+        if value:
+            lines.append(f"{label}: {', '.join(value) if isinstance(value, list) else value}")
+    return "\n".join(lines)
+
+
+def evaluation_system_blocks(question: Any, category: str, question_rubric: str = "") -> List[Dict[str, Any]]:
+    """System prefix for grading: coach persona, rubric, then the per-question brief
+
+    Each block ends a cache breakpoint, so answers to the same question reuse the
+    whole prefix and answers to other questions still reuse persona + rubric.
+    question_rubric, a rubric written for this particular question, joins the brief.
+    """
+    brief = question_brief(question, category)
+    if question_rubric:
+        brief += f"\n\nGrading rubric for this question:\n{question_rubric}"
+    return [
+        {"type": "text", "text": COACH_INSTRUCTIONS},
+        cached_block(EVALUATION_RUBRIC),
+        cached_block(brief),
+    ]
+
+
+def question_system_blocks(question: Any, category: str) -> List[Dict[str, Any]]:
+    """System prefix for calls about one question (reference answer, rubric, follow-ups)"""
+    return [
+        {"type": "text", "text": COACH_INSTRUCTIONS},
+        cached_block(question_brief(question, category)),
+    ]
+
+
+def build_rubric_prompt(category: str, dimensions: Dict[str, str]) -> str:
+    """Ask for a grading rubric tailored to the question in the system brief"""
+    listed = "\n".join(f"- {name}: {text}" for name, text in dimensions.items())
+    return f"""Write a grading rubric for answers to this {category} question, using its hints, focus areas
+or Leadership Principle. For each dimension below, say what a 9-10 answer covers and the
+mistakes that cost points. Be concise: at most 200 words.
+
+{listed}"""
+
+
+def generation_system_blocks(category: str) -> List[Dict[str, Any]]:
+    """System prefix for question generation calls, shared by every request of a category"""
+    return [cached_block(f"{GENERATION_INSTRUCTIONS}\n\n{GENERATION_GUIDES[category]}")]
+
+
+def build_generation_request(count: int, angle: str, examples: List[str]) -> str:
+    """Ask for count new questions on one angle (topic, domain or principle), avoiding the examples"""
+    request = f"Write {count} new {angle}."
+    if examples:
+        listed = "\n".join(f"- {example}" for example in examples)
+        request += f"\n\nAlready in the bank, so do not repeat or reword these:\n{listed}"
+    return request
+
+
+def build_coach_request(prompt: str, context: str = "") -> str:
+    """Variable tail of a coaching call"""
+    return f"Context: {context}\n\nUser: {prompt}"
+
+
+def build_evaluation_request(answer: str, category: str, measured: str = "") -> str:
+    """Variable tail of a grading call; measured is what running the code found, if it was run"""
+    request = f"Evaluate this {category} interview answer:\n\n{answer}"
+    if measured:
+        request += f"\n\nMeasured by running the code against the question's test cases:\n{measured}"
+    return request
+
+
+def system_text(system: List[Dict[str, Any]]) -> str:
+    """Plain text of a system block list (for cache keys and logging)"""
+    return "\n\n".join(block['text'] for block in system)
+
+
+def build_summary_prompt(previous_summary: str, turns: List[Dict[str, Any]]) -> str:
+    """Fold a few evicted chat turns into the running conversation summary"""
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    return f"""
+    You are maintaining a running summary of an Amazon SDE II interview coaching conversation.
+
+    Current summary: {previous_summary or "(none yet)"}
+
+    New turns to fold in:
+    {transcript}
+
+    Rewrite the summary to include the new turns. Keep the candidate's goals, weak areas,
+    questions already covered and advice already given. Reply with the summary only, in
+    at most 150 words.
+    """
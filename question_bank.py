@@ -0,0 +1,315 @@
+"""Question banks loaded lazily from JSON/JSONL files, with secondary indexes and hot reload
+
+Files live in QUESTION_BANK_DIR (default question_banks/) and are matched to a category by
+name prefix: dsa*.jsonl, system_design*.jsonl, behavioral*.jsonl (.json arrays work too).
+JSONL files are memory-mapped; each line is parsed once to build the indexes and then
+dropped, and a question is parsed again from the map when it is drawn.
+
+Questions without an "id" get one derived from their text, so it stays the same when other
+lines or files change. A repeated id is skipped (with a warning) rather than shadowing the
+first question that has it. So is a line that is not a JSON object, e.g. one an editor or
+generate_questions.py is still writing, and if a rebuild fails outright the previous index
+keeps being served.
+"""
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+CATEGORY_FILE_PREFIXES = {
+    "DSA": "dsa",
+    "System Design": "system_design",
+    "Behavioral": "behavioral",
+}
+
+# Fields that get a secondary index; list-valued fields are indexed per element
+INDEX_FIELDS = ("topic", "difficulty", "focus_areas", "principle")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+logger = logging.getLogger(__name__)
+
+
+def content_id(category: str, text: str) -> str:
+    """Stable id for a question from its text (lower case, punctuation and spacing ignored)"""
+    normalized = _NON_WORD.sub(" ", text.lower()).strip()
+    return f"{CATEGORY_FILE_PREFIXES[category]}-{hashlib.blake2b(normalized.encode('utf-8'), digest_size=5).hexdigest()}"
+
+
+class _MappedFile:
+    """A memory-mapped JSONL file; records are addressed by (offset, length)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def lines(self):
+        """Yield (offset, length) of every non-blank line"""
+        offset = 0
+        size = len(self.map)
+        while offset < size:
+            end = self.map.find(b"\n", offset)
+            if end == -1:
+                end = size
+            if self.map[offset:end].strip():
+                yield offset, end - offset
+            offset = end + 1
+
+    def read(self, offset: int, length: int) -> Dict[str, Any]:
+        return json.loads(self.map[offset:offset + length])
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self._file.close()
+
+
+class CategoryIndex:
+    """All questions of one category plus id and secondary indexes over them"""
+
+    def __init__(self, category: str, builtin: List[Dict[str, Any]], paths: List[str], cache_size: int = 1024):
+        self.category = category
+        # Each entry is either an in-memory dict or a (mapped file, offset, length) reference
+        self._entries: List[Any] = []
+        self._ids: List[str] = []
+        self._files: List[_MappedFile] = []
+        self._by_id: Dict[str, int] = {}
+        self._indexes: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._parsed: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._intersections: "OrderedDict[Tuple, List[int]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+        self.duplicates = 0
+        self.malformed = 0
+        for question in builtin:
+            question = dict(question)
+            # Built-in behavioral questions have always been keyed by principle (see mock_interview)
+            self._add(question, question, legacy_id=question.get('principle'))
+        for path in paths:
+            self._load(path)
+
+    def _add(self, entry: Any, question: Dict[str, Any], legacy_id: Any = None):
+        question_id = question.get('id')
+        if question_id is None:
+            question_id = legacy_id if legacy_id is not None and str(legacy_id) not in self._by_id \
+                else content_id(self.category, question.get('question', ""))
+            if isinstance(entry, dict):
+                entry['id'] = question_id
+        if str(question_id) in self._by_id:
+            self.duplicates += 1
+            logger.warning("Skipping %s question with duplicate id %r", self.category, question_id)
+            return
+        position = len(self._entries)
+        self._entries.append(entry)
+        self._ids.append(str(question_id))
+        self._by_id[str(question_id)] = position
+        for field in INDEX_FIELDS:
+            value = question.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                if item is not None:
+                    self._indexes[field][str(item)].append(position)
+
+    def _skip_malformed(self, path: str, where: str, problem: str):
+        self.malformed += 1
+        logger.warning("Skipping malformed %s question in %s (%s): %s", self.category, path, where, problem)
+
+    def _load(self, path: str):
+        if path.endswith(".json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    questions = json.load(f)
+            except ValueError as e:
+                self._skip_malformed(path, "whole file", str(e))
+                return
+            for number, question in enumerate(questions if isinstance(questions, list) else []):
+                if isinstance(question, dict):
+                    self._add(question, question)
+                else:
+                    self._skip_malformed(path, f"item {number}", "not a JSON object")
+            return
+        mapped = _MappedFile(path)
+        self._files.append(mapped)
+        for offset, length in mapped.lines():
+            # Parsed once to index it; the full record is re-read from the map on demand
+            try:
+                question = mapped.read(offset, length)
+            except ValueError as e:
+                self._skip_malformed(path, f"byte {offset}", str(e))
+                continue
+            if not isinstance(question, dict):
+                self._skip_malformed(path, f"byte {offset}", "not a JSON object")
+                continue
+            self._add((mapped, offset, length), question)
+
+    def _question(self, position: int) -> Dict[str, Any]:
+        entry = self._entries[position]
+        if isinstance(entry, dict):
+            return entry
+        with self._lock:
+            cached = self._parsed.get(position)
+            if cached is not None:
+                self._parsed.move_to_end(position)
+                return cached
+        mapped, offset, length = entry
+        question = mapped.read(offset, length)
+        question.setdefault('id', self._ids[position])
+        with self._lock:
+            self._parsed[position] = question
+            if len(self._parsed) > self._cache_size:
+                self._parsed.popitem(last=False)
+        return question
+
+    def _candidates(self, filters: Dict[str, Any]) -> Optional[List[int]]:
+        """Positions matching every filter (None when unfiltered); starts from the smallest index list"""
+        active = {field: str(value) for field, value in filters.items() if value is not None}
+        if not active:
+            return None
+        postings = sorted((self._indexes[field].get(value, []) for field, value in active.items()), key=len)
+        if len(postings) == 1:
+            return postings[0]
+        # The index is immutable, so an intersection computed once stays valid until the next reload
+        key = tuple(sorted(active.items()))
+        with self._lock:
+            cached = self._intersections.get(key)
+            if cached is not None:
+                self._intersections.move_to_end(key)
+                return cached
+        rest = [set(p) for p in postings[1:]]
+        matches = [position for position in postings[0] if all(position in s for s in rest)]
+        with self._lock:
+            self._intersections[key] = matches
+            if len(self._intersections) > 256:
+                self._intersections.popitem(last=False)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, question_id: Any) -> Optional[Dict[str, Any]]:
+        position = self._by_id.get(str(question_id))
+        return None if position is None else self._question(position)
+
+    def ids(self, **filters) -> List[str]:
+        """Ids of questions matching the filters"""
+        candidates = self._candidates(filters)
+        if candidates is None:
+            return list(self._ids)
+        return [self._ids[position] for position in candidates]
+
+    def count(self, **filters) -> int:
+        candidates = self._candidates(filters)
+        return len(self._entries) if candidates is None else len(candidates)
+
+    def draw(self, rng: Optional[random.Random] = None, **filters) -> Optional[Dict[str, Any]]:
+        """A random question matching the filters; O(1) for a single filter or a repeated combination"""
+        rng = rng or random
+        candidates = self._candidates(filters)
+        if candidates is None:
+            if not self._entries:
+                return None
+            return self._question(rng.randrange(len(self._entries)))
+        return self._question(rng.choice(candidates)) if candidates else None
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values of an indexed field, e.g. every topic"""
+        return sorted(self._indexes[field])
+
+    def close(self):
+        for mapped in self._files:
+            mapped.close()
+
+
+class QuestionStore:
+    """Per-category question indexes, built on first use and rebuilt when the bank files change"""
+
+    def __init__(self, directory: str, builtin: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 reload_check_seconds: float = 2.0):
+        self.directory = directory
+        self.builtin = builtin or {}
+        self.reload_check_seconds = reload_check_seconds
+        self._indexes: Dict[str, Tuple[Tuple, CategoryIndex]] = {}
+        self._retired: Dict[str, CategoryIndex] = {}
+        self._last_checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, category: str) -> List[str]:
+        prefix = os.path.join(self.directory, CATEGORY_FILE_PREFIXES[category])
+        return sorted(glob.glob(prefix + "*.jsonl") + glob.glob(prefix + "*.json"))
+
+    def _signature(self, paths: List[str]) -> Tuple:
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def index(self, category: str) -> CategoryIndex:
+        """The index for category, (re)building it if its files appeared or changed"""
+        now = time.monotonic()
+        with self._lock:
+            current = self._indexes.get(category)
+            if current is not None and now - self._last_checked.get(category, 0) < self.reload_check_seconds:
+                return current[1]
+            self._last_checked[category] = now
+            paths = self._paths(category)
+            signature = self._signature(paths)
+            if current is not None and current[0] == signature:
+                return current[1]
+            try:
+                index = CategoryIndex(category, self.builtin.get(category, []), [p for p, _, _ in signature])
+            except Exception:
+                # e.g. a file removed or unreadable mid-rebuild; retried at the next check
+                logger.exception("Rebuilding the %s question index failed", category)
+                if current is not None:
+                    return current[1]
+                index = CategoryIndex(category, self.builtin.get(category, []), [])
+                signature = None
+            # The replaced index stays open for one more reload so in-flight reads can finish
+            if category in self._retired:
+                self._retired.pop(category).close()
+            if current is not None:
+                self._retired[category] = current[1]
+            self._indexes[category] = (signature, index)
+            return index
+
+    def draw(self, category: str, rng: Optional[random.Random] = None, **filters) -> Optional[Dict[str, Any]]:
+        return self.index(category).draw(rng, **filters)
+
+    def get(self, category: str, question_id: Any) -> Optional[Dict[str, Any]]:
+        return self.index(category).get(question_id)
+
+    def count(self, category: str, **filters) -> int:
+        return self.index(category).count(**filters)
+
+    def values(self, category: str, field: str) -> List[str]:
+        return self.index(category).values(field)
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def shared_question_store(builtin: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> QuestionStore:
+    """Process-wide store over QUESTION_BANK_DIR; builtin banks are taken from the first call"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = QuestionStore(
+                os.environ.get("QUESTION_BANK_DIR", "question_banks"),
+                builtin=builtin,
+                reload_check_seconds=float(os.environ.get("QUESTION_BANK_RELOAD_SECONDS", "2")),
+            )
+        return _shared_store
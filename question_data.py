@@ -0,0 +1,124 @@
+"""Built-in question banks and interview categories"""
+from question_bank import shared_question_store
+
+CATEGORIES = ["DSA", "System Design", "Behavioral"]
+
+# Amazon Leadership Principles
+LEADERSHIP_PRINCIPLES = [
+    "Customer Obsession", "Ownership", "Invent and Simplify", "Are Right, A Lot",
+    "Learn and Be Curious", "Hire and Develop the Best", "Insist on the Highest Standards",
+    "Think Big", "Bias for Action", "Frugality", "Earn Trust", "Dive Deep",
+    "Have Backbone; Disagree and Commit", "Deliver Results", "Strive to be Earth's Best Employer",
+    "Success and Scale Bring Broad Responsibility"
+]
+
+# Question banks
+# DSA entries with test_cases can be run by code_runner: entry_point names the function, arg_types
+# converts JSON arguments (e.g. a level-order list to a tree), compare "unordered" ignores order and
+# "any_of" lists every accepted answer; benchmark names an input generator and the sizes to time.
+DSA_QUESTIONS = [
+    {
+        "id": 1,
+        "difficulty": "Medium",
+        "topic": "Arrays",
+        "question": "Given an array of integers, find two numbers such that they add up to a specific target number. Return indices of the two numbers.",
+        "hints": ["Think about using a hash map", "What's the time complexity?"],
+        "expected_approach": "Hash map for O(n) solution",
+        "entry_point": "two_sum",
+        "signature": "def two_sum(nums: List[int], target: int) -> List[int]",
+        "compare": "unordered",
+        "test_cases": [
+            {"args": [[2, 7, 11, 15], 9], "expected": [0, 1]},
+            {"args": [[3, 2, 4], 6], "expected": [1, 2]},
+            {"args": [[3, 3], 6], "expected": [0, 1]},
+            {"args": [[-1, -2, -3, -4, -5], -8], "expected": [2, 4]},
+            {"args": [[0, 4, 3, 0], 0], "expected": [0, 3]}
+        ],
+        "benchmark": {"generator": "two_sum_pair_at_end", "sizes": [1000, 2000, 4000, 8000, 16000, 32000]}
+    },
+    {
+        "id": 2,
+        "difficulty": "Hard",
+        "topic": "Dynamic Programming",
+        "question": "Given a string s, find the longest palindromic substring in s. You may assume that the maximum length of s is 1000.",
+        "hints": ["Consider expand around centers", "Think about Manacher's algorithm"],
+        "expected_approach": "Expand around centers or dynamic programming",
+        "entry_point": "longest_palindrome",
+        "signature": "def longest_palindrome(s: str) -> str",
+        "test_cases": [
+            {"args": ["babad"], "any_of": ["bab", "aba"]},
+            {"args": ["cbbd"], "expected": "bb"},
+            {"args": ["a"], "expected": "a"},
+            {"args": ["ac"], "any_of": ["a", "c"]},
+            {"args": ["forgeeksskeegfor"], "expected": "geeksskeeg"}
+        ],
+        "benchmark": {"generator": "repeated_char_string", "sizes": [100, 200, 400, 800, 1600]}
+    },
+    {
+        "id": 3,
+        "difficulty": "Medium",
+        "topic": "Trees",
+        "question": "Given a binary tree, determine if it is a valid binary search tree (BST).",
+        "hints": ["In-order traversal should be sorted", "Think about bounds"],
+        "expected_approach": "In-order traversal or bounds checking",
+        "entry_point": "is_valid_bst",
+        "signature": "def is_valid_bst(root: Optional[TreeNode]) -> bool",
+        "arg_types": ["tree"],
+        "test_cases": [
+            {"args": [[2, 1, 3]], "expected": True},
+            {"args": [[5, 1, 4, None, None, 3, 6]], "expected": False},
+            {"args": [[5, 4, 6, None, None, 3, 7]], "expected": False},
+            {"args": [[1, 1]], "expected": False},
+            {"args": [[]], "expected": True}
+        ],
+        "benchmark": {"generator": "balanced_bst", "sizes": [1000, 2000, 4000, 8000, 16000]}
+    }
+]
+
+SYSTEM_DESIGN_QUESTIONS = [
+    {
+        "id": 1,
+        "question": "Design a URL shortening service like bit.ly",
+        "focus_areas": ["Scalability", "Database design", "Caching", "Load balancing"],
+        "key_components": ["URL encoding", "Database schema", "Cache layer", "Analytics"]
+    },
+    {
+        "id": 2,
+        "question": "Design a chat system like WhatsApp",
+        "focus_areas": ["Real-time messaging", "Message delivery", "Scalability", "Security"],
+        "key_components": ["WebSocket connections", "Message queuing", "Database design", "Push notifications"]
+    },
+    {
+        "id": 3,
+        "question": "Design Amazon's recommendation system",
+        "focus_areas": ["Machine learning", "Big data processing", "Real-time updates", "Personalization"],
+        "key_components": ["Collaborative filtering", "Content-based filtering", "Real-time processing", "A/B testing"]
+    }
+]
+
+BEHAVIORAL_QUESTIONS = [
+    {
+        "principle": "Customer Obsession",
+        "question": "Tell me about a time when you had to make a decision between what was best for the customer and what was best for the business."
+    },
+    {
+        "principle": "Ownership",
+        "question": "Describe a situation where you took ownership of a problem that wasn't necessarily your responsibility."
+    },
+    {
+        "principle": "Dive Deep",
+        "question": "Tell me about a time when you had to dig deep into data or details to solve a problem."
+    },
+    {
+        "principle": "Deliver Results",
+        "question": "Give me an example of a time when you had to deliver results under a tight deadline."
+    }
+]
+
+def question_bank():
+    """Shared, lazily indexed question store seeded with the built-in banks"""
+    return shared_question_store({
+        "DSA": DSA_QUESTIONS,
+        "System Design": SYSTEM_DESIGN_QUESTIONS,
+        "Behavioral": BEHAVIORAL_QUESTIONS
+    })
@@ -0,0 +1,219 @@
+"""Tail-latency and outage protection for model calls: deadlines, hedged attempts and a circuit breaker
+
+client_pool.ManagedClient combines them for every create and stream call:
+- each call gets a deadline that covers admission, retries and the upstream wait;
+- if an attempt has not produced its first token (or, for create, its response) by an
+  adaptive threshold (a high percentile of recent latencies), a second attempt is fired
+  and whichever answers first is used; hedges are capped at a share of all calls;
+- once the share of failing calls crosses a threshold the breaker opens and calls fail
+  fast with CircuitOpen until a probe call succeeds.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's deadline passed before any attempt answered"""
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while the breaker is open"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(
+            f"The AI service is failing right now, so requests are paused; retrying in about {max(1, math.ceil(retry_in))}s"
+        )
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Recent latencies of one kind of call; the hedge threshold is a percentile of them"""
+
+    def __init__(self, percentile: float = 95, window: int = 200, min_samples: int = 20,
+                 floor: float = 0.05):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.floor = floor
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which an attempt counts as slow, or None until there are enough samples"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(math.ceil(self.percentile / 100 * len(ordered))) - 1)
+        return max(self.floor, ordered[index])
+
+
+class _Race:
+    """First successful attempt wins; later ones are handed to discard"""
+
+    def __init__(self, discard: Callable[[Any], None]):
+        self.discard = discard
+        self.started = 0
+        self.failed: List[BaseException] = []
+        self.winner: Optional[int] = None
+        self.value: Any = None
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def run(self, number: int, attempt: Callable[[], Any]):
+        try:
+            value = attempt()
+        except Exception as e:
+            with self._cond:
+                self.failed.append(e)
+                self._cond.notify_all()
+            return
+        with self._cond:
+            won = self.winner is None and not self.closed
+            if won:
+                self.winner, self.value = number, value
+                self._cond.notify_all()
+        if not won:
+            self.discard(value)
+
+    def add_attempt(self):
+        with self._cond:
+            self.started += 1
+
+    def settled(self) -> bool:
+        return self.winner is not None or len(self.failed) == self.started
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Whether the race settled (a winner, or every attempt failed) within timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.settled():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self) -> Any:
+        """Stop accepting winners; returns the winner's value if there is one"""
+        with self._cond:
+            self.closed = True
+            return self.value
+
+
+def _start(race: _Race, number: int, attempt: Callable[[], Any]):
+    # Each attempt gets its own thread: a shared pool would cap concurrent calls and count its queueing against the deadline
+    threading.Thread(target=race.run, args=(number, attempt), name=f"llm-attempt-{number}", daemon=True).start()
+
+
+def hedge(attempt: Callable[[], Any], delay: Optional[float], allow_hedge: Callable[[], bool], deadline: float,
+          discard: Callable[[Any], None] = lambda value: None) -> Tuple[Any, bool, bool]:
+    """attempt(), plus a second copy if the first has not answered after delay seconds
+
+    Returns (value, hedged, hedge_won). With delay None (no latency history yet) or no hedge
+    allowance left, the attempt runs on the caller's thread. Otherwise it runs on a thread of
+    its own so the caller can take whichever copy answers first. Answers arriving after a
+    winner (or after the deadline) go to discard, e.g. to close a stream nobody will read.
+    """
+    if delay is None or not allow_hedge(peek=True):
+        return attempt(), False, False
+    race = _Race(discard)
+    race.add_attempt()
+    _start(race, 0, attempt)
+    hedged = False
+    if not race.wait(min(delay, max(0.0, deadline - time.monotonic()))) and allow_hedge():
+        race.add_attempt()
+        hedged = True
+        _start(race, 1, attempt)
+    race.wait(max(0.0, deadline - time.monotonic()))
+    value = race.close()
+    if race.winner is not None:
+        return value, hedged, race.winner == 1
+    if race.failed and len(race.failed) == race.started:
+        raise race.failed[0]
+    raise DeadlineExceeded("No response before the call's deadline")
+
+
+class CircuitBreaker:
+    """Closed -> open when the failure share of recent calls crosses failure_rate -> half-open probe
+
+    Outcomes older than window seconds are forgotten, and at least min_calls recent outcomes
+    are needed before the breaker can open. After cooldown seconds one probe call is let
+    through; its success closes the breaker, its failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 10, window: float = 30.0,
+                 cooldown: float = 15.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque()
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._counters = {'opened': 0, 'short_circuited': 0}
+
+    def _forget_old(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpen"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._counters['short_circuited'] += 1
+            retry_in = max(0.0, self.cooldown - (now - self._opened_at))
+        raise CircuitOpen(retry_in)
+
+    def record(self, success: bool):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            self._outcomes.append((now, success))
+            self._forget_old(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (self.state == self.CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._counters['opened'] += 1
+
+    def release(self):
+        """A call that was admitted but ended without an outcome (e.g. a bad request) frees the probe slot"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._forget_old(time.monotonic())
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return dict(self._counters, state=self.state, recent_calls=len(self._outcomes),
+                        recent_failure_rate=failures / len(self._outcomes) if self._outcomes else 0.0)
@@ -0,0 +1,167 @@
+"""Process-wide response cache for Claude calls (LRU + TTL, optional SQLite persistence)"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def make_cache_key(prompt: str, context: str, model: str, max_tokens: int,
+                   history: Optional[List[Dict[str, str]]] = None) -> str:
+    """Hash a normalized (prompt, context, model, max_tokens[, prior turns]) tuple into a cache key"""
+    normalized = {
+        'prompt': " ".join(prompt.split()),
+        'context': " ".join(context.split()),
+        'model': model,
+        'max_tokens': int(max_tokens),
+    }
+    if history:
+        normalized['history'] = [[turn['role'], " ".join(turn['content'].split())] for turn in history]
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL, shared by every Streamlit session in the process"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 24 * 3600,
+                 persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'saved_seconds': 0.0,
+            'saved_input_tokens': 0,
+            'saved_output_tokens': 0,
+        }
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, path: str):
+        """Open the on-disk store and warm the in-memory LRU from it"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                latency REAL NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL
+            )
+        """)
+        cutoff = time.time() - self.ttl_seconds
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+        rows = self._db.execute(
+            "SELECT key, value, created_at, latency, input_tokens, output_tokens "
+            "FROM responses ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        self._db.commit()
+        # Oldest first so the most recent rows end up at the MRU end
+        for key, value, created_at, latency, input_tokens, output_tokens in reversed(rows):
+            self._entries[key] = {
+                'value': value,
+                'created_at': created_at,
+                'latency': latency,
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+            }
+
+    def _delete_persisted(self, key: str):
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if time.time() - entry['created_at'] > self.ttl_seconds:
+                del self._entries[key]
+                self._delete_persisted(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            self._counters['saved_seconds'] += entry['latency']
+            self._counters['saved_input_tokens'] += entry['input_tokens']
+            self._counters['saved_output_tokens'] += entry['output_tokens']
+            return entry['value']
+
+    def set(self, key: str, value: str, latency: float = 0.0,
+            input_tokens: int = 0, output_tokens: int = 0):
+        """Store a response along with what it cost to produce"""
+        entry = {
+            'value': value,
+            'created_at': time.time(),
+            'latency': latency,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, entry['created_at'], latency, input_tokens, output_tokens)
+                )
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+                if self._db is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (evicted_key,))
+            if self._db is not None:
+                self._db.commit()
+
+    def clear(self):
+        """Drop every entry, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of hit/miss counters and what the hits saved"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_cache() -> ResponseCache:
+    """Process-wide cache instance, configured from the environment on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                max_entries=int(os.environ.get("AI_CACHE_MAX_ENTRIES", "512")),
+                ttl_seconds=float(os.environ.get("AI_CACHE_TTL_SECONDS", str(24 * 3600))),
+                persist_path=os.environ.get("AI_CACHE_PATH") or None,
+            )
+        return _shared_cache
@@ -0,0 +1,240 @@
+"""Spaced-repetition (SM-2 style) question scheduling with a per-user priority queue of due reviews"""
+import heapq
+import itertools
+import os
+import sqlite3
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, time as day_time
+from typing import Any, Dict, List, Optional, Tuple
+
+DAY_SECONDS = 24 * 3600
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Scores below this (out of 10) count as a failed recall and restart the interval
+PASSING_SCORE = 6
+# How many reviews to look through for one that matches the page filters
+FILTER_SCAN_LIMIT = 32
+# A review just served is held back this long, so drawing again moves on instead of repeating it
+SERVED_DEFERRAL_SECONDS = 15 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_state (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    last_score INTEGER NOT NULL,
+    due_at REAL NOT NULL,
+    PRIMARY KEY (user_id, category, question_id)
+);
+CREATE INDEX IF NOT EXISTS idx_review_state_due ON review_state (user_id, due_at);
+"""
+
+
+def next_review(state: Optional[Dict[str, Any]], score: int, now: float) -> Dict[str, Any]:
+    """SM-2 update for a 0-10 score (mapped onto SM-2's 0-5 quality scale)"""
+    state = dict(state or {'ease': DEFAULT_EASE, 'interval_days': 0.0, 'repetitions': 0})
+    quality = max(0, min(10, score)) / 2
+    if score < PASSING_SCORE:
+        state['repetitions'] = 0
+        state['interval_days'] = 1.0
+    else:
+        state['repetitions'] += 1
+        if state['repetitions'] == 1:
+            state['interval_days'] = 1.0
+        elif state['repetitions'] == 2:
+            state['interval_days'] = 6.0
+        else:
+            state['interval_days'] = round(state['interval_days'] * state['ease'], 2)
+    state['ease'] = max(MIN_EASE, state['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    state['last_score'] = score
+    state['due_at'] = now + state['interval_days'] * DAY_SECONDS
+    return state
+
+
+class _UserReviews:
+    """One user's review state plus a lazily-pruned min-heap of (due_at, seq, question_id) per category
+
+    Every current review has exactly one heap entry, so the heap orders upcoming reviews as
+    well as due ones. deferred holds when served-but-unanswered reviews may come back.
+    """
+
+    def __init__(self, deferred: Optional[Dict[Tuple[str, str], float]] = None):
+        self.states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self.deferred: Dict[Tuple[str, str], float] = dict(deferred or {})
+        self.loaded_at = time.monotonic()
+
+    def push(self, category: str, question_id: str, due_at: float, seq: int):
+        available_at = max(due_at, self.deferred.get((category, question_id), 0.0))
+        heapq.heappush(self.heaps.setdefault(category, []), (available_at, seq, question_id))
+
+    def is_current(self, category: str, entry: Tuple[float, int, str]) -> bool:
+        state = self.states.get((category, entry[2]))
+        return state is not None and state['seq'] == entry[1]
+
+
+class ReviewScheduler:
+    """Chooses the next question: due reviews first, then unseen questions, then the earliest upcoming review
+
+    Users' schedules are cached in memory for refresh_seconds, so reviews recorded by other
+    replicas show up, and only the max_users most recently active users are kept.
+    """
+
+    def __init__(self, path: str, max_users: int = 1000, refresh_seconds: float = 60.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self.max_users = max_users
+        self.refresh_seconds = refresh_seconds
+        self._users: "OrderedDict[str, _UserReviews]" = OrderedDict()
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _user(self, user_id: str) -> _UserReviews:
+        reviews = self._users.get(user_id)
+        if reviews is not None and time.monotonic() - reviews.loaded_at < self.refresh_seconds:
+            self._users.move_to_end(user_id)
+            return reviews
+        now = time.time()
+        # Deferrals only live in memory; carry over the ones still running
+        deferred = {key: until for key, until in reviews.deferred.items() if until > now} if reviews else None
+        reviews = _UserReviews(deferred)
+        rows = self._db.execute(
+            "SELECT category, question_id, ease, interval_days, repetitions, last_score, due_at "
+            "FROM review_state WHERE user_id = ?",
+            (user_id,)
+        ).fetchall()
+        for category, question_id, ease, interval_days, repetitions, last_score, due_at in rows:
+            seq = next(self._seq)
+            reviews.states[(category, question_id)] = {
+                'ease': ease, 'interval_days': interval_days, 'repetitions': repetitions,
+                'last_score': last_score, 'due_at': due_at, 'seq': seq,
+            }
+            reviews.push(category, question_id, due_at, seq)
+        self._users[user_id] = reviews
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return reviews
+
+    def record_review(self, user_id: str, category: str, question_id: Any, score: int,
+                      now: Optional[float] = None):
+        """Fold a graded attempt into the question's schedule"""
+        now = now if now is not None else time.time()
+        question_id = str(question_id)
+        with self._lock:
+            reviews = self._user(user_id)
+            reviews.deferred.pop((category, question_id), None)
+            state = next_review(reviews.states.get((category, question_id)), score, now)
+            state['seq'] = next(self._seq)
+            reviews.states[(category, question_id)] = state
+            # The old heap entry is left in place and skipped later because its seq no longer matches
+            reviews.push(category, question_id, state['due_at'], state['seq'])
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO review_state VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, category, question_id, state['ease'], state['interval_days'],
+                     state['repetitions'], score, state['due_at'])
+                )
+
+    def _pop_next(self, reviews: _UserReviews, category: str, bank, filters: Dict[str, Any],
+                  until: float, now: float) -> Optional[Dict[str, Any]]:
+        """Earliest review available by until that matches the filters, in O(log n) per heap operation
+
+        The review served is deferred by SERVED_DEFERRAL_SECONDS, so the next draw offers
+        another one unless this one is answered first.
+        """
+        heap = reviews.heaps.get(category, [])
+        skipped = []
+        found = None
+        while heap and heap[0][0] <= until and len(skipped) < FILTER_SCAN_LIMIT:
+            entry = heapq.heappop(heap)
+            if not reviews.is_current(category, entry):
+                continue
+            question = bank.get(category, entry[2])
+            if question is None:
+                # Dropped from the bank since it was last reviewed
+                continue
+            if matches(question, filters):
+                found = question
+                key = (category, entry[2])
+                reviews.deferred[key] = now + SERVED_DEFERRAL_SECONDS
+                state = reviews.states[key]
+                state['seq'] = next(self._seq)
+                reviews.push(category, entry[2], state['due_at'], state['seq'])
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    def next_question(self, user_id: str, category: str, bank, now: Optional[float] = None,
+                      **filters) -> Optional[Dict[str, Any]]:
+        """Next question for user in category from a question_bank.QuestionStore, honouring filters"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            reviews = self._user(user_id)
+            question = self._pop_next(reviews, category, bank, filters, now, now)
+            if question is not None:
+                return question
+
+            # Nothing due: introduce a question the user has not seen yet
+            index = bank.index(category)
+            for _ in range(8):
+                candidate = index.draw(**filters)
+                if candidate is None:
+                    return None
+                if (category, str(candidate['id'])) not in reviews.states:
+                    return candidate
+
+            # Probably everything matching has been seen; review ahead of schedule, earliest first
+            question = self._pop_next(reviews, category, bank, filters, math.inf, now)
+            return question if question is not None else index.draw(**filters)
+
+    def due_count(self, user_id: str, until: Optional[float] = None) -> int:
+        """Reviews due by `until` (default: end of today) across all categories"""
+        if until is None:
+            until = datetime.combine(datetime.now().date(), day_time.max).timestamp()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) FROM review_state WHERE user_id = ? AND due_at <= ?", (user_id, until)
+            ).fetchone()
+        return row[0]
+
+
+def matches(question: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Whether a question satisfies page filters like topic=..., focus_areas=..."""
+    for field, wanted in filters.items():
+        if wanted is None:
+            continue
+        value = question.get(field)
+        values = value if isinstance(value, list) else [value]
+        if str(wanted) not in [str(v) for v in values]:
+            return False
+    return True
+
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def shared_scheduler() -> ReviewScheduler:
+    """Process-wide scheduler, stored alongside the attempts in PERFORMANCE_DB_PATH"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = ReviewScheduler(
+                os.environ.get("PERFORMANCE_DB_PATH", os.path.join("data", "performance.sqlite3")),
+                max_users=int(os.environ.get("SCHEDULER_CACHE_USERS", "1000")),
+                refresh_seconds=float(os.environ.get("SCHEDULER_REFRESH_SECONDS", "60")),
+            )
+        return _shared_scheduler
@@ -0,0 +1,210 @@
+"""Similarity cache for chat coach replies: a close rewording of an earlier question reuses its answer
+
+It sits behind the exact-match response cache. A question is reduced to its content words
+(lower case, stop words dropped, plural and -ing endings stripped), and two questions match
+when the Jaccard similarity of those word sets reaches the threshold and the words they
+share come in the same order, so "How should I structure my system design answers?" reuses
+the answer to "how do I structure system design answers" while "convert BFS to DFS" and
+"convert DFS to BFS" stay apart. Synonyms are not matched; the threshold keeps "time
+complexity of quicksort" and "space complexity of quicksort" apart. Candidates come from a MinHash/LSH index
+(near_duplicates.LSHIndex) and are confirmed on the exact word sets, so a lookup touches a
+few buckets however many entries there are.
+
+Entries live in a scope: everything besides the question that shapes the answer (model,
+instructions, context). Only questions asked in the same scope are ever matched.
+"""
+import itertools
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple
+
+STOP_WORDS = frozenset("""
+a about also an and any are as at be best can could describe do does explain for from give good
+help how i im in into is it its just me my need of on or please should so some tell that the there
+this to want way what whats when where which why will with would you your
+""".split())
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def content_sequence(text: str) -> Tuple[str, ...]:
+    """The words of text that carry its meaning, in order, normalized so rewordings compare equal"""
+    return tuple(_stem(word) for word in _WORD.findall(text.lower().replace("'", "")) if word not in STOP_WORDS)
+
+
+def content_words(text: str) -> FrozenSet[str]:
+    return frozenset(content_sequence(text))
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    return len(first & second) / len(first | second) if first or second else 1.0
+
+
+def same_order(first: Sequence[str], second: Sequence[str]) -> bool:
+    """Whether the words the two sequences share first appear in the same order in both"""
+    shared = set(first) & set(second)
+
+    def order(sequence: Sequence[str]) -> list:
+        return list(dict.fromkeys(word for word in sequence if word in shared))
+
+    return order(first) == order(second)
+
+
+class SemanticCache:
+    """LRU + TTL cache of replies, looked up by question similarity within a scope"""
+
+    def __init__(self, threshold: float = 0.8, max_entries: int = 5000, ttl_seconds: float = 24 * 3600,
+                 num_perm: int = 64):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.num_perm = num_perm
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._indexes: Dict[str, Any] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._lookup_seconds = deque(maxlen=1000)
+        self._hit_similarities = deque(maxlen=1000)
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'saved_seconds': 0.0,
+            'saved_input_tokens': 0,
+            'saved_output_tokens': 0,
+        }
+
+    def _index(self, scope: str):
+        index = self._indexes.get(scope)
+        if index is None:
+            # Imported here so pages (and the sidebar's stats) render without loading numpy until a chat reply is cached
+            from near_duplicates import LSHIndex
+            # Every scope shares the seed, so a question's signature is the same in all of them
+            index = self._indexes[scope] = LSHIndex(threshold=self.threshold, num_perm=self.num_perm)
+        return index
+
+    def _drop(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        index = self._indexes[entry['scope']]
+        index.remove(entry_id)
+        if not len(index):
+            del self._indexes[entry['scope']]
+
+    def _match(self, scope: str, sequence: Tuple[str, ...]) -> Tuple[Optional[int], float]:
+        """(entry id, similarity) of the closest live entry at or above the threshold with its words in the same order"""
+        words = frozenset(sequence)
+        index = self._indexes.get(scope)
+        if index is None:
+            return None, 0.0
+        best, best_similarity = None, 0.0
+        now = time.time()
+        for entry_id in index.candidates(index.minhash(words)):
+            entry = self._entries[entry_id]
+            if now - entry['created_at'] > self.ttl_seconds:
+                self._drop(entry_id)
+                self._counters['expirations'] += 1
+                continue
+            similarity = jaccard(words, entry['words'])
+            # Word sets ignore order, which would make "convert BFS to DFS" answer "convert DFS to BFS"
+            if similarity >= self.threshold and similarity > best_similarity and same_order(sequence, entry['sequence']):
+                best, best_similarity = entry_id, similarity
+        return best, best_similarity
+
+    def get(self, scope: str, question: str) -> Optional[Tuple[str, float]]:
+        """(cached reply, similarity) for a question close enough to one answered in scope, or None"""
+        start = time.perf_counter()
+        sequence = content_sequence(question)
+        with self._lock:
+            entry_id, similarity = self._match(scope, sequence) if sequence else (None, 0.0)
+            if entry_id is None:
+                self._counters['misses'] += 1
+                self._lookup_seconds.append(time.perf_counter() - start)
+                return None
+            entry = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            self._counters['hits'] += 1
+            self._counters['saved_seconds'] += entry['latency']
+            self._counters['saved_input_tokens'] += entry['input_tokens']
+            self._counters['saved_output_tokens'] += entry['output_tokens']
+            self._hit_similarities.append(similarity)
+            self._lookup_seconds.append(time.perf_counter() - start)
+            return entry['value'], similarity
+
+    def set(self, scope: str, question: str, value: str, latency: float = 0.0,
+            input_tokens: int = 0, output_tokens: int = 0):
+        """Remember a reply; an entry for the same content words in the same order in scope is replaced"""
+        sequence = content_sequence(question)
+        words = frozenset(sequence)
+        if not words or self.max_entries <= 0:
+            return
+        with self._lock:
+            index = self._index(scope)
+            signature = index.minhash(words)
+            for entry_id in index.candidates(signature):
+                if self._entries[entry_id]['sequence'] == sequence:
+                    self._drop(entry_id)
+                    index = self._index(scope)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {
+                'scope': scope,
+                'words': words,
+                'sequence': sequence,
+                'value': value,
+                'created_at': time.time(),
+                'latency': latency,
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+            }
+            index.add(entry_id, signature)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, what the hits saved, and recent lookup latency"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(size=len(self._entries), scopes=len(self._indexes), threshold=self.threshold)
+            timings = sorted(self._lookup_seconds)
+            similarities = list(self._hit_similarities)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['mean_hit_similarity'] = sum(similarities) / len(similarities) if similarities else 0.0
+        for name, pct in (('lookup_ms_p50', 50), ('lookup_ms_p99', 99)):
+            stats[name] = timings[min(len(timings) - 1, int(len(timings) * pct / 100))] * 1000 if timings else 0.0
+        return stats
+
+
+_shared_semantic_cache = None
+_shared_semantic_cache_lock = threading.Lock()
+
+
+def shared_semantic_cache() -> SemanticCache:
+    """Process-wide similarity cache, configured from the environment on first use"""
+    global _shared_semantic_cache
+    with _shared_semantic_cache_lock:
+        if _shared_semantic_cache is None:
+            _shared_semantic_cache = SemanticCache(
+                threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.8")),
+                max_entries=int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "5000")),
+                ttl_seconds=float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600))),
+            )
+        return _shared_semantic_cache
@@ -0,0 +1,580 @@
+"""Per-user session state that outlives a Streamlit session, so any replica can pick up a user
+
+A SessionSync attached to each Streamlit session restores the persisted keys when the
+session starts. At the end of every rerun it hashes those keys and hands only the changed
+ones to the process-wide SessionStore. The store writes them behind in batches, one
+versioned write per user per flush.
+
+Every write names the version it was based on. If another replica wrote in between, the
+write is retried on top of the newer version, key by key: a key only this replica changed
+is written, while a key the other replica changed too keeps the other replica's value. The
+sessions whose change was dropped are told which keys (SessionSync.lost_keys), and every
+session reloads what it is missing on its next rerun. Values are JSON with datetimes tagged,
+zlib-compressed when large.
+
+SESSION_STATE_BACKEND picks the storage: "sqlite" (default, SESSION_STATE_PATH), "redis"
+(SESSION_STATE_REDIS_URL; `python fake_redis_server.py` is a local stand-in) or "off".
+"""
+import abc
+import atexit
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Tuple
+from urllib.parse import urlparse
+
+from telemetry import span
+
+# Values whose JSON is longer than this are stored zlib-compressed
+COMPRESS_OVER_BYTES = 512
+# Attempts at a write before the batch is put back for the next flush
+MAX_WRITE_ATTEMPTS = 5
+VERSION_FIELD = b"__version__"
+
+
+class VersionConflict(Exception):
+    """Raised by SessionBackend.save when the stored version is not the expected one"""
+
+    def __init__(self, user_id: str, expected: int, current: int):
+        super().__init__(f"Session state for {user_id} is at version {current}, expected {expected}")
+        self.expected = expected
+        self.current = current
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not serializable as session state")
+
+
+def _json_object_hook(value: Dict[str, Any]) -> Any:
+    if len(value) == 1:
+        if "$datetime" in value:
+            return datetime.fromisoformat(value["$datetime"])
+        if "$date" in value:
+            return date.fromisoformat(value["$date"])
+    return value
+
+
+def dump_value(value: Any) -> bytes:
+    """Canonical compact JSON for a session value (also what change detection hashes)"""
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False,
+                      default=_json_default).encode("utf-8")
+
+
+def load_value(raw: bytes) -> Any:
+    return json.loads(raw, object_hook=_json_object_hook)
+
+
+def pack(raw: bytes) -> bytes:
+    """Stored form of dumped JSON: a one-byte tag, then the JSON or its zlib compression"""
+    if len(raw) > COMPRESS_OVER_BYTES:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+
+def unpack(stored: bytes) -> bytes:
+    return zlib.decompress(stored[1:]) if stored[:1] == b"z" else stored[1:]
+
+
+def digest(raw: bytes) -> bytes:
+    """Hash of a value's dumped JSON, for change and conflict detection"""
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class SessionBackend(abc.ABC):
+    """Versioned key/value storage per user; version 0 means nothing is stored"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def load(self, user_id: str) -> Tuple[int, Dict[str, bytes]]:
+        """(stored version, packed values) for user_id"""
+
+    @abc.abstractmethod
+    def version(self, user_id: str) -> int:
+        """Stored version for user_id without reading its values"""
+
+    @abc.abstractmethod
+    def save(self, user_id: str, expected_version: int, changes: Dict[str, Optional[bytes]]) -> int:
+        """Apply changes (None deletes a key) if the stored version is expected_version; returns the new version"""
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """A local SQLite file; replicas on one host can share it"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode so save() can take the write lock up front with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS session_versions (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_values (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                PRIMARY KEY (user_id, key)
+            );
+        """)
+        self._lock = threading.Lock()
+
+    def _version(self, user_id: str) -> int:
+        row = self._db.execute("SELECT version FROM session_versions WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, user_id: str) -> Tuple[int, Dict[str, bytes]]:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                version = self._version(user_id)
+                rows = self._db.execute("SELECT key, value FROM session_values WHERE user_id = ?", (user_id,)).fetchall()
+            finally:
+                self._db.execute("COMMIT")
+        return version, {key: bytes(value) for key, value in rows}
+
+    def version(self, user_id: str) -> int:
+        with self._lock:
+            return self._version(user_id)
+
+    def save(self, user_id: str, expected_version: int, changes: Dict[str, Optional[bytes]]) -> int:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                current = self._version(user_id)
+                if current != expected_version:
+                    raise VersionConflict(user_id, expected_version, current)
+                for key, value in changes.items():
+                    if value is None:
+                        self._db.execute("DELETE FROM session_values WHERE user_id = ? AND key = ?", (user_id, key))
+                    else:
+                        self._db.execute(
+                            "INSERT INTO session_values (user_id, key, value) VALUES (?, ?, ?) "
+                            "ON CONFLICT (user_id, key) DO UPDATE SET value = excluded.value",
+                            (user_id, key, value)
+                        )
+                self._db.execute(
+                    "INSERT INTO session_versions (user_id, version, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET version = excluded.version, updated_at = excluded.updated_at",
+                    (user_id, current + 1, time.time())
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return current + 1
+
+
+class RedisError(Exception):
+    """An error reply from the Redis server"""
+
+
+class RedisConnection:
+    """Minimal RESP2 client: one socket, reconnecting when it breaks"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._file = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = sock.makefile("rwb")
+        if self.password:
+            self._call(b"AUTH", self.password.encode())
+        if self.db:
+            self._call(b"SELECT", str(self.db).encode())
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            return None if length < 0 else self._file.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    def _call(self, *args: bytes) -> Any:
+        self._file.write(b"*%d\r\n" % len(args) + b"".join(b"$%d\r\n%s\r\n" % (len(arg), arg) for arg in args))
+        self._file.flush()
+        return self._read_reply()
+
+    def execute(self, *args: Any) -> Any:
+        """Send one command and return its reply; str and int arguments are encoded as UTF-8"""
+        encoded = [arg if isinstance(arg, bytes) else str(arg).encode("utf-8") for arg in args]
+        if self._file is None:
+            self._connect()
+        try:
+            return self._call(*encoded)
+        except (OSError, ConnectionError):
+            self.close()
+            raise
+
+
+class RedisSessionBackend(SessionBackend):
+    """One Redis hash per user, updated with WATCH/MULTI/EXEC so replicas never lose each other's writes"""
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "interview-prep:session:", ttl_seconds: int = 30 * 24 * 3600):
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+        self._connection = RedisConnection(url)
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: str) -> bytes:
+        return (self.key_prefix + user_id).encode("utf-8")
+
+    def load(self, user_id: str) -> Tuple[int, Dict[str, bytes]]:
+        with self._lock:
+            reply = self._connection.execute(b"HGETALL", self._key(user_id)) or []
+        fields = dict(zip(reply[::2], reply[1::2]))
+        version = int(fields.pop(VERSION_FIELD, 0))
+        return version, {field.decode("utf-8"): value for field, value in fields.items()}
+
+    def version(self, user_id: str) -> int:
+        with self._lock:
+            return int(self._connection.execute(b"HGET", self._key(user_id), VERSION_FIELD) or 0)
+
+    def save(self, user_id: str, expected_version: int, changes: Dict[str, Optional[bytes]]) -> int:
+        key = self._key(user_id)
+        with self._lock:
+            connection = self._connection
+            connection.execute(b"WATCH", key)
+            try:
+                current = int(connection.execute(b"HGET", key, VERSION_FIELD) or 0)
+                if current != expected_version:
+                    raise VersionConflict(user_id, expected_version, current)
+                pairs: List[Any] = [VERSION_FIELD, current + 1]
+                for field, value in changes.items():
+                    if value is not None:
+                        pairs += [field, value]
+                deleted = [field for field, value in changes.items() if value is None]
+                connection.execute(b"MULTI")
+                connection.execute(b"HSET", key, *pairs)
+                if deleted:
+                    connection.execute(b"HDEL", key, *deleted)
+                connection.execute(b"EXPIRE", key, self.ttl_seconds)
+                if connection.execute(b"EXEC") is None:
+                    # The hash changed between WATCH and EXEC
+                    current = int(connection.execute(b"HGET", key, VERSION_FIELD) or 0)
+                    raise VersionConflict(user_id, expected_version, current)
+                return current + 1
+            except VersionConflict:
+                connection.execute(b"UNWATCH")
+                raise
+            except RedisError:
+                # Dropping the connection also drops any WATCH or half-built MULTI
+                connection.close()
+                raise
+
+
+class SessionStore:
+    """Write-behind front of a SessionBackend, shared by every session in the process
+
+    Staged changes are merged per user (the latest value of a key wins) and flushed every
+    flush_interval seconds, so a burst of reruns costs one backend write per user.
+    """
+
+    def __init__(self, backend: SessionBackend, flush_interval: float = 0.5):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Optional[bytes]]] = {}
+        self._pending_writers: Dict[str, set] = {}
+        # Digest of each pending key's value before this process changed it (None: it was not stored)
+        self._pending_bases: Dict[str, Dict[str, Optional[bytes]]] = {}
+        # Keys whose staged change lost a conflict, per user and staging session, until the session asks
+        self._lost: Dict[str, Dict[Optional[str], set]] = {}
+        # Last version of each user this process has loaded or written
+        self._known_versions: Dict[str, int] = {}
+        # (version, writer) for versions one session wrote straight on top of the previous one;
+        # that session already holds the data, so it need not reload
+        self._clean_writes: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._counters = {'loads': 0, 'writes': 0, 'keys_written': 0, 'bytes_written': 0, 'conflicts': 0,
+                          'keys_lost': 0}
+        self._lock = threading.Lock()
+        # Serializes flushes so two writers never race on the same expected version
+        self._flush_lock = threading.Lock()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="session-state-flush", daemon=True)
+        self._flusher.start()
+
+    def stage(self, user_id: str, changes: Dict[str, Optional[bytes]], writer: Optional[str] = None,
+              bases: Optional[Dict[str, Optional[bytes]]] = None):
+        """Queue changed keys for the next flush
+
+        writer identifies the staging session; bases holds the digest each key had when that
+        session last loaded or wrote it, which is how a conflicting write is told apart.
+        """
+        with self._lock:
+            self._pending.setdefault(user_id, {}).update(changes)
+            self._pending_writers.setdefault(user_id, set()).add(writer)
+            pending_bases = self._pending_bases.setdefault(user_id, {})
+            for key in changes:
+                # A key staged twice before a flush still conflicts against its first base
+                pending_bases.setdefault(key, (bases or {}).get(key))
+
+    def load(self, user_id: str) -> Tuple[int, Dict[str, bytes]]:
+        """Stored (version, packed values) for user_id, after writing anything still pending for them"""
+        self.flush(user_id)
+        with span("session_state.load", backend=self.backend.name) as attributes:
+            version, values = self.backend.load(user_id)
+            attributes['keys'] = len(values)
+        with self._lock:
+            self._known_versions[user_id] = version
+            self._counters['loads'] += 1
+        return version, values
+
+    def version(self, user_id: str) -> int:
+        return self.backend.version(user_id)
+
+    def take_lost_keys(self, user_id: str, writer: str) -> List[str]:
+        """Keys writer staged that lost a conflict since it last asked; their stored values are the other writer's"""
+        with self._lock:
+            lost = self._lost.get(user_id, {}).pop(writer, set())
+            if user_id in self._lost and not self._lost[user_id]:
+                del self._lost[user_id]
+        return sorted(lost)
+
+    def is_clean_write(self, user_id: str, version: int, writer: str) -> bool:
+        """Whether version holds only writer's changes, written straight on top of the version before it"""
+        with self._lock:
+            return self._clean_writes.get(user_id) == (version, writer)
+
+    def flush(self, user_id: Optional[str] = None):
+        """Write pending changes now, for one user or for everyone"""
+        with self._flush_lock:
+            with self._lock:
+                users = [user_id] if user_id is not None else list(self._pending)
+                batches = {
+                    user: (self._pending.pop(user), self._pending_writers.pop(user), self._pending_bases.pop(user, {}))
+                    for user in users if user in self._pending
+                }
+            for user, (changes, writers, bases) in batches.items():
+                try:
+                    self._write(user, changes, writers, bases)
+                except Exception:
+                    # Put the batch back under anything staged since, and retry on the next flush
+                    with self._lock:
+                        self._pending[user] = {**changes, **self._pending.get(user, {})}
+                        self._pending_writers.setdefault(user, set()).update(writers)
+                        self._pending_bases[user] = {**self._pending_bases.get(user, {}), **bases}
+                    raise
+
+    def _drop_conflicting(self, user_id: str, changes: Dict[str, Optional[bytes]],
+                          bases: Dict[str, Optional[bytes]]) -> Tuple[int, Dict[str, Optional[bytes]], set]:
+        """(stored version, changes that do not conflict, keys that do) after another writer got in first
+
+        A key conflicts when its stored value is no longer the one this change was based on
+        (and is not already what this change wants).
+        """
+        version, stored = self.backend.load(user_id)
+        keep, lost = {}, set()
+        for key, value in changes.items():
+            current = stored.get(key)
+            current_digest = None if current is None else digest(unpack(current))
+            wanted_digest = None if value is None else digest(unpack(value))
+            if current_digest == bases.get(key) or current_digest == wanted_digest:
+                keep[key] = value
+            else:
+                lost.add(key)
+        return version, keep, lost
+
+    def _write(self, user_id: str, changes: Dict[str, Optional[bytes]], writers: set,
+               bases: Optional[Dict[str, Optional[bytes]]] = None):
+        bases = bases or {}
+        with self._lock:
+            expected = self._known_versions.get(user_id)
+        with span("session_state.save", backend=self.backend.name, keys=len(changes)) as attributes:
+            if expected is None:
+                expected = self.backend.version(user_id)
+            clean = True
+            lost = set()
+            for attempt in range(MAX_WRITE_ATTEMPTS):
+                try:
+                    version = self.backend.save(user_id, expected, changes) if changes else expected
+                    break
+                except VersionConflict:
+                    # Another replica wrote since: keep only the keys it did not change as well
+                    clean = False
+                    with self._lock:
+                        self._counters['conflicts'] += 1
+                    if attempt == MAX_WRITE_ATTEMPTS - 1:
+                        raise
+                    expected, changes, newly_lost = self._drop_conflicting(user_id, changes, bases)
+                    lost |= newly_lost
+            attributes.update(conflict=not clean, keys_lost=len(lost))
+        with self._lock:
+            if lost:
+                self._counters['keys_lost'] += len(lost)
+                lost_by_writer = self._lost.setdefault(user_id, {})
+                for writer in writers:
+                    lost_by_writer.setdefault(writer, set()).update(lost)
+            self._known_versions[user_id] = version
+            if clean and len(writers) == 1:
+                self._clean_writes[user_id] = (version, next(iter(writers)))
+            else:
+                self._clean_writes.pop(user_id, None)
+            self._counters['writes'] += 1
+            self._counters['keys_written'] += len(changes)
+            self._counters['bytes_written'] += sum(len(value) for value in changes.values() if value)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except (sqlite3.Error, OSError, RedisError, VersionConflict):
+                # The batch was put back; try again on the next tick
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, pending_users=len(self._pending))
+
+
+# Converts a value to plain JSON data and back; the second function also gets the session's current value
+Adapter = Tuple[Callable[[Any], Any], Callable[[Any, Any], Any]]
+
+
+class SessionSync:
+    """One Streamlit session's view of its persisted keys
+
+    Works on any mutable mapping (st.session_state in the app), so it has no Streamlit
+    dependency. Call restore() when the session starts, refresh() at the start of each
+    rerun and persist() at the end.
+    """
+
+    def __init__(self, store: SessionStore, user_id: str, keys: Tuple[str, ...],
+                 adapters: Optional[Dict[str, Adapter]] = None):
+        self.store = store
+        self.user_id = user_id
+        self.keys = keys
+        self.adapters = adapters or {}
+        self.version = 0
+        self.token = uuid.uuid4().hex
+        # Keys whose last change here lost to another replica's and were reloaded, as of the last refresh
+        self.lost_keys: List[str] = []
+        # Hash of each key's JSON as last loaded or written, for change detection
+        self._digests: Dict[str, bytes] = {}
+
+    def restore(self, state: MutableMapping[str, Any]) -> int:
+        """Overwrite keys in state with their stored values; returns how many changed"""
+        version, values = self.store.load(self.user_id)
+        changed = 0
+        for key, stored in values.items():
+            if key not in self.keys:
+                continue
+            raw = unpack(stored)
+            stored_digest = digest(raw)
+            if self._digests.get(key) == stored_digest:
+                continue
+            value = load_value(raw)
+            if key in self.adapters:
+                value = self.adapters[key][1](value, state.get(key))
+            state[key] = value
+            self._digests[key] = stored_digest
+            changed += 1
+        self.version = version
+        return changed
+
+    def refresh(self, state: MutableMapping[str, Any]) -> int:
+        """Reload if another replica or session has written since; one version lookup otherwise"""
+        self.lost_keys = self.store.take_lost_keys(self.user_id, self.token)
+        current = self.store.version(self.user_id)
+        if current == self.version:
+            return 0
+        if self.store.is_clean_write(self.user_id, current, self.token):
+            self.version = current
+            return 0
+        return self.restore(state)
+
+    def persist(self, state: MutableMapping[str, Any]) -> List[str]:
+        """Stage the keys whose value changed since they were last loaded or written"""
+        changes = {}
+        bases = {}
+        for key in self.keys:
+            if key not in state:
+                continue
+            value = state[key]
+            if key in self.adapters:
+                value = self.adapters[key][0](value)
+            raw = dump_value(value)
+            value_digest = digest(raw)
+            if self._digests.get(key) != value_digest:
+                changes[key] = pack(raw)
+                bases[key] = self._digests.get(key)
+                self._digests[key] = value_digest
+        if changes:
+            self.store.stage(self.user_id, changes, writer=self.token, bases=bases)
+        return list(changes)
+
+
+BACKENDS: Dict[str, Callable[[], SessionBackend]] = {
+    'sqlite': lambda: SQLiteSessionBackend(
+        os.environ.get("SESSION_STATE_PATH", os.path.join("data", "session_state.sqlite3"))
+    ),
+    'redis': lambda: RedisSessionBackend(
+        os.environ.get("SESSION_STATE_REDIS_URL", "redis://127.0.0.1:6379/0"),
+        ttl_seconds=int(os.environ.get("SESSION_STATE_TTL_SECONDS", str(30 * 24 * 3600))),
+    ),
+}
+
+_shared_session_store = None
+_shared_session_store_lock = threading.Lock()
+
+
+def shared_session_store() -> Optional[SessionStore]:
+    """Process-wide store for SESSION_STATE_BACKEND, or None when it is "off" """
+    global _shared_session_store
+    name = os.environ.get("SESSION_STATE_BACKEND", "sqlite")
+    if name == "off":
+        return None
+    with _shared_session_store_lock:
+        if _shared_session_store is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown SESSION_STATE_BACKEND {name!r}, expected one of {', '.join(BACKENDS)} or off")
+            _shared_session_store = SessionStore(
+                BACKENDS[name](),
+                flush_interval=float(os.environ.get("SESSION_STATE_FLUSH_SECONDS", "0.5")),
+            )
+            # Don't lose the last half second of writes on a clean shutdown
+            atexit.register(_shared_session_store.flush)
+        return _shared_session_store
@@ -0,0 +1,189 @@
+"""Single-flight coalescing of identical in-flight model calls
+
+While a call for a key is running, identical requests wait on it instead of making their
+own upstream call. The first caller leads and the rest follow:
+
+    text, shared = shared_single_flight().do(cache_key, lambda: call_model(...))
+
+Errors fan out: every follower gets the leader's exception. Nothing is remembered once a
+flight lands, so the next identical request tries again. Successful results are kept by
+the response cache, not here.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class FlightTimeout(TimeoutError):
+    """Raised to a caller that waited longer than its timeout on a shared call"""
+
+
+class FlightAbandoned(Exception):
+    """The leader stopped (e.g. its script run was interrupted) before its call finished"""
+
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else time.monotonic() + timeout
+
+
+class Flight:
+    """One upstream call, shared by every identical request that arrives while it runs"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.chunks: List[str] = []
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self._cond = threading.Condition()
+
+    def publish(self, chunk: str):
+        """Append a streamed chunk and wake everyone reading the flight"""
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None):
+        with self._cond:
+            self.result, self.error, self.done = result, error, True
+            self._cond.notify_all()
+
+    def _wait_until(self, ready: Callable[[], bool], deadline: Optional[float]):
+        """Block until ready() holds; the condition must be held by the caller"""
+        while not ready():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise FlightTimeout("Timed out waiting for an identical request that is still in flight")
+            self._cond.wait(remaining)
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """The call's result once it lands, re-raising its error; timeout defaults to the flight's"""
+        deadline = _deadline(self.timeout if timeout is None else timeout)
+        with self._cond:
+            self._wait_until(lambda: self.done, deadline)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Chunks published so far, then each new one until the call lands
+
+        The timeout is an idle limit: it restarts with every new chunk, so a long reply that
+        keeps streaming is never cut off, while one that stalls is.
+        """
+        position = 0
+        while True:
+            with self._cond:
+                self._wait_until(lambda: self.done or len(self.chunks) > position, _deadline(self.timeout))
+                chunks = self.chunks[position:]
+                done = self.done
+            position += len(chunks)
+            yield from chunks
+            if done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    """Per-key registry of in-flight calls; callers time out after timeout seconds of waiting"""
+
+    def __init__(self, timeout: Optional[float] = 120.0):
+        self.timeout = timeout
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self._counters = {'leaders': 0, 'coalesced': 0}
+        self._streaming = 0
+
+    def _join(self, key: str) -> Tuple[Flight, bool]:
+        """The in-flight call for key and whether the caller has to make it (is the leader)"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self._counters['coalesced'] += 1
+                return flight, False
+            flight = self._flights[key] = Flight(self.timeout)
+            self._counters['leaders'] += 1
+            return flight, True
+
+    def _land(self, key: str, flight: Flight, result: Any = None, error: Optional[BaseException] = None):
+        # Finished before it is forgotten, so a caller joining in between still gets the result
+        flight.finish(result, error)
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn() at most once at a time per key; returns (result, shared)
+
+        shared is True when the result came from another caller's call. The leader runs fn
+        on its own thread; if it is interrupted, a waiting follower takes over the call.
+        """
+        deadline = _deadline(self.timeout)
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                try:
+                    result = fn()
+                except Exception as e:
+                    self._land(key, flight, error=e)
+                    raise
+                except BaseException:
+                    self._land(key, flight, error=FlightAbandoned("The request this one was waiting on was interrupted"))
+                    raise
+                self._land(key, flight, result=result)
+                return result, False
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                return flight.wait(remaining), True
+            except FlightAbandoned:
+                continue
+
+    def do_stream(self, key: str, fn: Callable[[Callable[[str], None]], Any]) -> Tuple[Flight, bool]:
+        """Start fn(publish) on its own thread unless an identical stream is in flight; returns (flight, shared)
+
+        Every caller, leader included, reads flight.iter_chunks(). The call runs off the
+        caller's thread so it still completes (and can be cached) if the caller that started
+        it stops reading, e.g. when its script run is interrupted by a rerun. There is no
+        cap on concurrent streams here; the client's rate limiter is the only admission control.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            with self._lock:
+                self._streaming += 1
+            threading.Thread(target=self._run_stream, args=(key, flight, fn), name="single-flight-stream",
+                             daemon=True).start()
+        return flight, not leader
+
+    def _run_stream(self, key: str, flight: Flight, fn: Callable[[Callable[[str], None]], Any]):
+        try:
+            result = fn(flight.publish)
+        except BaseException as e:
+            self._land(key, flight, error=e)
+        else:
+            self._land(key, flight, result=result)
+        finally:
+            with self._lock:
+                self._streaming -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Upstream calls made, requests that shared one instead, and calls (and streams) in flight now"""
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._flights), streaming=self._streaming)
+
+
+_shared_single_flight = None
+_shared_single_flight_lock = threading.Lock()
+
+
+def shared_single_flight() -> SingleFlight:
+    """Process-wide coalescing layer, configured from the environment on first use"""
+    global _shared_single_flight
+    with _shared_single_flight_lock:
+        if _shared_single_flight is None:
+            timeout = float(os.environ.get("SINGLE_FLIGHT_TIMEOUT_SECONDS", "120"))
+            _shared_single_flight = SingleFlight(timeout=timeout if timeout > 0 else None)
+        return _shared_single_flight
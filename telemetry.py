@@ -0,0 +1,306 @@
+"""Lightweight spans and metrics for the app's hot paths
+
+    with span("evaluate_answer") as attrs:
+        ...
+        attrs['cache_hit'] = True
+
+    @traced("analytics.build_report")
+    def build_report(...): ...
+
+Finished spans go into an in-process ring buffer (for the admin performance page) and into
+cumulative per-name histograms (for Prometheus text). Optionally they are exported:
+- TELEMETRY_PROMETHEUS_PORT serves the Prometheus text format on http://127.0.0.1:<port>/metrics
+- TELEMETRY_OTLP_ENDPOINT receives batches of spans as OTLP/JSON (http://host:4318/v1/traces);
+  `python telemetry.py collector` is a local stand-in for an OpenTelemetry collector
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf implied)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Numeric span attributes that are also summed per span name
+COUNTED_ATTRIBUTES = ("input_tokens", "output_tokens", "cache_read_input_tokens")
+
+
+class Telemetry:
+    """Ring buffer of recent spans plus cumulative per-name aggregates"""
+
+    def __init__(self, buffer_size: int = 5000):
+        self._spans = deque(maxlen=buffer_size)
+        self._aggregates: Dict[str, Dict[str, Any]] = {}
+        self._exporters: List[Callable[[Dict[str, Any]], None]] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: Callable[[Dict[str, Any]], None]):
+        """exporter(span) is called for every finished span; it must not block"""
+        self._exporters.append(exporter)
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        """collector() returns extra Prometheus text lines (gauges, counters kept elsewhere) for every scrape"""
+        self._collectors.append(collector)
+
+    def record(self, name: str, start: float, duration: float, attributes: Dict[str, Any]):
+        record = {'name': name, 'start': start, 'duration': duration, **attributes}
+        with self._lock:
+            self._spans.append(record)
+            aggregate = self._aggregates.get(name)
+            if aggregate is None:
+                aggregate = self._aggregates[name] = {
+                    'count': 0, 'sum': 0.0, 'errors': 0, 'cache_hits': 0,
+                    'buckets': [0] * (len(BUCKETS) + 1),
+                    **{attribute: 0 for attribute in COUNTED_ATTRIBUTES},
+                }
+            aggregate['count'] += 1
+            aggregate['sum'] += duration
+            aggregate['buckets'][bisect_left(BUCKETS, duration)] += 1
+            aggregate['errors'] += bool(attributes.get('error'))
+            aggregate['cache_hits'] += bool(attributes.get('cache_hit'))
+            for attribute in COUNTED_ATTRIBUTES:
+                aggregate[attribute] += attributes.get(attribute) or 0
+        for exporter in self._exporters:
+            exporter(record)
+
+    def spans(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recent spans, oldest first"""
+        with self._lock:
+            spans = list(self._spans)
+        return spans if name is None else [s for s in spans if s['name'] == name]
+
+    def aggregates(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(aggregate, buckets=list(aggregate['buckets']))
+                    for name, aggregate in self._aggregates.items()}
+
+    def prometheus_text(self) -> str:
+        """Cumulative metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP interview_prep_span_duration_seconds Time spent in instrumented code paths",
+            "# TYPE interview_prep_span_duration_seconds histogram",
+        ]
+        aggregates = self.aggregates()
+        for name, aggregate in sorted(aggregates.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), aggregate['buckets']):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'interview_prep_span_duration_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'interview_prep_span_duration_seconds_sum{{span="{name}"}} {aggregate["sum"]:.6f}')
+            lines.append(f'interview_prep_span_duration_seconds_count{{span="{name}"}} {aggregate["count"]}')
+        for metric, field, help_text in (
+            ("interview_prep_span_errors_total", 'errors', "Instrumented calls that failed"),
+            ("interview_prep_cache_hits_total", 'cache_hits', "Instrumented calls served from a cache"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{span="{name}"}} {aggregate[field]}' for name, aggregate in sorted(aggregates.items())]
+        lines += ["# HELP interview_prep_tokens_total Model tokens by span and kind",
+                  "# TYPE interview_prep_tokens_total counter"]
+        for name, aggregate in sorted(aggregates.items()):
+            for attribute in COUNTED_ATTRIBUTES:
+                if aggregate[attribute]:
+                    kind = attribute[:-len("_tokens")]
+                    lines.append(f'interview_prep_tokens_total{{span="{name}",kind="{kind}"}} {aggregate[attribute]}')
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed block; the yielded dict takes extra attributes (tokens, cache_hit, ...)
+
+    An exception escaping the block marks the span with error=<exception type> and is re-raised;
+    BaseExceptions used for control flow (st.rerun, generator close) are not errors.
+    """
+    attributes = dict(attributes)
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield attributes
+    except Exception as e:
+        attributes.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        shared_telemetry().record(name, start, time.perf_counter() - started, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); the span is named after the function unless name is given"""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = shared_telemetry().prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="telemetry-metrics", daemon=True).start()
+    return server
+
+
+def otlp_payload(spans: List[Dict[str, Any]], service: str = "interview-prep") -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of span records"""
+    def value(v: Any) -> Dict[str, Any]:
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+
+    otlp_spans = []
+    for record in spans:
+        start_ns = int(record['start'] * 1e9)
+        otlp_spans.append({
+            "traceId": uuid.uuid4().hex,
+            "spanId": uuid.uuid4().hex[:16],
+            "name": record['name'],
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(record['duration'] * 1e9)),
+            "attributes": [{"key": k, "value": value(v)} for k, v in record.items()
+                           if k not in ('name', 'start', 'duration') and v is not None],
+            "status": {"code": 2 if record.get('error') else 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+        "scopeSpans": [{"scope": {"name": "telemetry"}, "spans": otlp_spans}],
+    }]}
+
+
+class OTLPExporter:
+    """Batches spans and POSTs them as OTLP/JSON from a background thread; drops on overflow"""
+
+    def __init__(self, endpoint: str, interval: float = 5.0, max_queue: int = 10000):
+        self.endpoint = endpoint
+        self.interval = interval
+        self._queue = deque(maxlen=max_queue)
+        self.failures = 0
+        threading.Thread(target=self._run, name="telemetry-otlp", daemon=True).start()
+
+    def __call__(self, record: Dict[str, Any]):
+        self._queue.append(record)
+
+    def flush(self):
+        batch = []
+        while self._queue and len(batch) < 1000:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(otlp_payload(batch)).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            # Telemetry must never take the app down; the batch is dropped
+            self.failures += 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+_shared_telemetry = None
+_shared_telemetry_lock = threading.Lock()
+
+
+def shared_telemetry() -> Telemetry:
+    """Process-wide telemetry, with exporters configured from the environment on first use"""
+    global _shared_telemetry
+    with _shared_telemetry_lock:
+        if _shared_telemetry is None:
+            telemetry = Telemetry(int(os.environ.get("TELEMETRY_BUFFER_SIZE", "5000")))
+            endpoint = os.environ.get("TELEMETRY_OTLP_ENDPOINT")
+            if endpoint:
+                telemetry.add_exporter(OTLPExporter(endpoint))
+            _shared_telemetry = telemetry
+            port = os.environ.get("TELEMETRY_PROMETHEUS_PORT")
+            if port:
+                try:
+                    serve_prometheus(int(port))
+                except OSError:
+                    # Another process (or a previous reload) already serves this port
+                    pass
+        return _shared_telemetry
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        spans = [span for resource in payload.get('resourceSpans', [])
+                 for scope in resource.get('scopeSpans', []) for span in scope.get('spans', [])]
+        with self.server.lock:
+            with open(self.server.output, "a", encoding="utf-8") as f:
+                for received in spans:
+                    f.write(json.dumps(received) + "\n")
+            self.server.received += len(spans)
+            print(f"received {len(spans)} spans ({self.server.received} total)")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry helpers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    collector = commands.add_parser("collector", help="Local stand-in for an OpenTelemetry collector (OTLP/JSON over HTTP)")
+    collector.add_argument("--port", type=int, default=4318)
+    collector.add_argument("--output", default="spans.jsonl", help="Received spans are appended here")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), _CollectorHandler)
+    server.output = args.output
+    server.lock = threading.Lock()
+    server.received = 0
+    print(f"Collecting OTLP/JSON spans on http://127.0.0.1:{args.port}/v1/traces into {args.output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""One module per app page, imported by interview_prep_main only when the page is opened
+
+Keeping pages apart means a session that never opens the Dashboard or Progress Tracking
+never pays for importing pandas and plotly.
+"""
@@ -0,0 +1,128 @@
+"""AI Chat Coach page"""
+import os
+
+import streamlit as st
+
+from model_calls import get_ai_response, stream_ai_response
+
+# Messages rendered per page; older pages are read back from the chat log only when opened
+CHAT_PAGE_SIZE = int(os.environ.get("CHAT_PAGE_SIZE", "20"))
+
+def streaming_enabled() -> bool:
+    """Whether responses should be rendered token by token"""
+    return st.session_state.get('stream_responses', True)
+
+def render_chat_message(role: str, content: str) -> str:
+    """HTML for a single chat bubble"""
+    if role == 'user':
+        return f"""
+                <div class="chat-message user-message">
+                    <strong>You:</strong> {content}
+                </div>
+                """
+    return f"""
+                <div class="chat-message ai-message">
+                    <strong>AI Coach:</strong> {content}
+                </div>
+                """
+
+def chat_page_number() -> int:
+    """Page of chat history being viewed, 0 being the newest"""
+    pages = st.session_state.chat_history.page_count(CHAT_PAGE_SIZE)
+    return min(st.session_state.get('chat_page', 0), pages - 1)
+
+def show_chat_pager():
+    """Older/newer buttons and the position in the conversation; hidden while it fits on one page"""
+    chat_log = st.session_state.chat_history
+    pages = chat_log.page_count(CHAT_PAGE_SIZE)
+    if pages <= 1:
+        return
+    page = chat_page_number()
+    newest = len(chat_log) - page * CHAT_PAGE_SIZE
+    oldest = max(newest - CHAT_PAGE_SIZE, chat_log.available_from) + 1
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("⬆️ Older", disabled=page >= pages - 1, use_container_width=True):
+            st.session_state.chat_page = page + 1
+            st.rerun()
+    with col2:
+        st.caption(f"Messages {oldest}–{newest} of {len(chat_log)}")
+        if chat_log.available_from:
+            st.caption(f"The first {chat_log.available_from} messages were saved on another server.")
+    with col3:
+        if st.button("⬇️ Newer", disabled=page == 0, use_container_width=True):
+            st.session_state.chat_page = page - 1
+            st.rerun()
+
+def send_chat_message(chat_container, message: str, context: str, use_memory: bool = True):
+    """Record a user message, get the coach's reply (streamed if enabled) and rerun
+
+    With use_memory the reply sees recent turns verbatim plus a summary of older ones;
+    canned suggestions skip it so identical clicks stay cacheable across users.
+    """
+    memory = st.session_state.conversation_memory
+    history = memory.build_messages(st.session_state.chat_history) if use_memory else None
+    if use_memory:
+        context = memory.context(context)
+    
+    st.session_state.chat_history.append('user', message)
+    # A new message jumps back to the newest page
+    st.session_state.chat_page = 0
+    
+    if streaming_enabled():
+        with chat_container:
+            st.markdown(render_chat_message('user', message), unsafe_allow_html=True)
+            placeholder = st.empty()
+        ai_response = ""
+        for chunk in stream_ai_response(message, context, history=history, semantic=True):
+            ai_response += chunk
+            placeholder.markdown(render_chat_message('assistant', ai_response), unsafe_allow_html=True)
+    else:
+        ai_response = get_ai_response(message, context, history=history, semantic=True)
+    
+    st.session_state.chat_history.append('assistant', ai_response)
+    
+    # Turns that no longer fit the verbatim budget are summarized in the background
+    memory.fold_async(st.session_state.chat_history, st.session_state.claude_client)
+    
+    st.rerun()
+
+def show_chat_coach():
+    """AI Chat Coach interface"""
+    st.header("💬 AI Interview Coach")
+    st.write("Chat with your AI coach for personalized guidance and feedback.")
+    
+    memory_state = st.session_state.conversation_memory.snapshot()
+    if memory_state['summarized_upto']:
+        st.caption(f"🧠 {memory_state['summarized_upto']} earlier messages are remembered as a ~{memory_state['summary_tokens']}-token summary.")
+    
+    # Chat interface
+    chat_container = st.container()
+    
+    with chat_container:
+        # Display one page of chat history, so a rerun costs the same however long the chat gets
+        for message in st.session_state.chat_history.page(chat_page_number(), CHAT_PAGE_SIZE):
+            st.markdown(render_chat_message(message.role, message.content), unsafe_allow_html=True)
+    show_chat_pager()
+    
+    context = f"Amazon SDE II interview preparation. User has been practicing for the interview in 3 days."
+    
+    # Chat input
+    user_input = st.chat_input("Ask your AI coach anything about the interview...")
+    
+    if user_input:
+        send_chat_message(chat_container, user_input, context)
+    
+    # Suggested questions
+    st.subheader("💡 Suggested Questions")
+    suggestions = [
+        "How should I structure my system design answers?",
+        "What are the most important Amazon Leadership Principles to focus on?",
+        "How can I improve my coding interview performance?",
+        "What are common mistakes in behavioral interviews?",
+        "How should I prepare for the bar raiser round?"
+    ]
+    
+    for suggestion in suggestions:
+        if st.button(suggestion, key=f"suggestion_{suggestion}"):
+            send_chat_message(chat_container, suggestion, context, use_memory=False)
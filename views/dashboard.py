@@ -0,0 +1,148 @@
+"""Dashboard page: readiness, study time and skill charts"""
+from datetime import date
+from typing import Any, Dict
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from performance_store import SOLVED_SCORE, shared_store
+from question_data import CATEGORIES
+from scheduler import shared_scheduler
+from telemetry import traced
+
+def readiness_label(readiness: float) -> str:
+    """Short caption under the readiness score"""
+    if readiness >= 80:
+        return "Interview ready!"
+    if readiness >= 60:
+        return "Good progress!"
+    return "Keep practicing!"
+
+@st.cache_resource(max_entries=256)
+@traced("dashboard_view")
+def dashboard_view(user_id: str, version: int, today: date) -> Dict[str, Any]:
+    """Metric values and figures for the dashboard, rebuilt only when the running aggregates change"""
+    store = shared_store()
+    totals = store.category_totals(user_id)
+    averages = {
+        category: totals[category]['score_sum'] / totals[category]['attempts'] if category in totals else 0.0
+        for category in CATEGORIES
+    }
+    
+    # Untried categories count as zero so readiness rewards covering every round
+    readiness = sum(averages.values()) / len(CATEGORIES) * 10
+    
+    daily = store.daily_totals(user_id)
+    trend = pd.DataFrame({
+        'Date': [row['day'] for row in daily],
+        'Average score': [row['score_sum'] / row['attempts'] for row in daily]
+    })
+    trend_fig = px.line(trend, x='Date', y='Average score', title="Average Interview Scores Over Time")
+    trend_fig.update_layout(height=300)
+    
+    skills_fig = go.Figure(data=go.Scatterpolar(
+        r=[averages[category] for category in CATEGORIES],
+        theta=CATEGORIES,
+        fill='toself'
+    ))
+    skills_fig.update_layout(height=300, polar=dict(radialaxis=dict(range=[0, 10])))
+    
+    return {
+        'readiness': readiness,
+        'study_hours': store.study_seconds_since(user_id, days=7) / 3600,
+        'questions_solved': sum(category_totals['solved'] for category_totals in totals.values()),
+        'mock_interviews': sum(category_totals['attempts'] for category_totals in totals.values()),
+        'due_today': shared_scheduler().due_count(user_id),
+        'trend_fig': trend_fig,
+        'skills_fig': skills_fig,
+    }
+
+def show_dashboard():
+    """Main dashboard showing overview"""
+    st.header("📊 Interview Preparation Dashboard")
+    
+    user_id = st.session_state.user_id
+    view = dashboard_view(user_id, shared_store().version(user_id), date.today())
+    
+    # Metrics row
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🎯 Readiness Score</h3>
+            <h2>{view['readiness']:.0f}%</h2>
+            <p>{readiness_label(view['readiness'])}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>⏱️ Study Time</h3>
+            <h2>{view['study_hours']:.1f}h</h2>
+            <p>This week</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>📝 Questions Solved</h3>
+            <h2>{view['questions_solved']}</h2>
+            <p>Scored {SOLVED_SCORE}+ out of 10</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🎯 Mock Interviews</h3>
+            <h2>{view['mock_interviews']}</h2>
+            <p>Completed</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col5:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🔁 Due Today</h3>
+            <h2>{view['due_today']}</h2>
+            <p>Questions to review</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Progress charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📈 Performance Trends")
+        if view['mock_interviews']:
+            st.plotly_chart(view['trend_fig'], use_container_width=True)
+        else:
+            st.info("Complete a mock interview to start your trend line.")
+    
+    with col2:
+        st.subheader("🎯 Skill Breakdown")
+        st.plotly_chart(view['skills_fig'], use_container_width=True)
+    
+    # Quick actions
+    st.subheader("🚀 Quick Actions")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("Start DSA Practice", use_container_width=True):
+            st.session_state.quick_start = "dsa"
+            st.rerun()
+    
+    with col2:
+        if st.button("System Design Mock", use_container_width=True):
+            st.session_state.quick_start = "system_design"
+            st.rerun()
+    
+    with col3:
+        if st.button("Behavioral Practice", use_container_width=True):
+            st.session_state.quick_start = "behavioral"
+            st.rerun()
@@ -0,0 +1,429 @@
+"""Mock interview page: question selection, answer forms and background evaluation cards"""
+import html
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import streamlit as st
+
+from code_runner import has_tests, shared_runner
+from eval_queue import shared_queue
+from model_calls import evaluate_answer
+from performance_store import shared_store
+from prefetch import PrefetchJob, shared_prefetcher
+from question_data import question_bank
+from scheduler import shared_scheduler
+
+FEEDBACK_TITLES = {
+    "DSA": ("✅ Great Job!", "📈 Room for Improvement -"),
+    "System Design": ("✅ Excellent Design!", "📈 Areas to Improve -"),
+    "Behavioral": ("✅ Strong STAR Response!", "📈 Strengthen Your STAR -")
+}
+
+# Longest an evaluation waits for a prefetched question rubric that is already being written
+RUBRIC_WAIT_SECONDS = float(os.environ.get("PREFETCH_RUBRIC_WAIT_SECONDS", "10"))
+
+def filter_choice(label: str, options: List[str], key: str) -> Optional[str]:
+    """Selectbox with an 'Any' option; returns None when unfiltered"""
+    choice = st.selectbox(label, ["Any"] + options, key=key)
+    return None if choice == "Any" else choice
+
+def start_question(question: Optional[Dict], category: str):
+    """Make question the active one for category, or warn if the filters matched nothing"""
+    if question is None:
+        st.warning("No questions match those filters.")
+        return
+    st.session_state.current_question = question
+    st.session_state.current_category = category
+    st.session_state.question_start_time = datetime.now()
+    clear_finished_evaluations(category)
+    # Moving on: whatever is still queued for the previous question is no longer worth a call
+    prefetcher = shared_prefetcher()
+    prefetcher.cancel(st.session_state.get('prefetch_job'))
+    st.session_state.prefetch_job = None
+    if st.session_state.claude_client:
+        st.session_state.prefetch_job = prefetcher.start(question, category, st.session_state.claude_client)
+
+def active_prefetch(question: Dict, category: str) -> Optional[PrefetchJob]:
+    """This session's prefetch for question, restarted if it is gone (e.g. after a restart or on another replica)"""
+    prefetcher = shared_prefetcher()
+    job = prefetcher.get(st.session_state.get('prefetch_job'))
+    if job is not None and job.is_for(question, category):
+        return job
+    if not st.session_state.claude_client:
+        return None
+    st.session_state.prefetch_job = prefetcher.start(question, category, st.session_state.claude_client)
+    return prefetcher.get(st.session_state.prefetch_job)
+
+def submit_evaluation(question: Dict, full_answer: str, category: str, code: Optional[str] = None):
+    """Queue an answer for background evaluation; the attempt is recorded when the job finishes
+
+    code, when given, is a Python solution that is run against the question's test cases
+    first, so the grade rests on what it measurably does.
+    """
+    # Captured here because worker threads cannot read st.session_state
+    client = st.session_state.claude_client
+    user_id = st.session_state.user_id
+    question_id = question.get('id', question.get('principle'))
+    started = st.session_state.question_start_time
+    time_to_answer = (datetime.now() - started).total_seconds() if started else None
+    prefetch = active_prefetch(question, category)
+    
+    def evaluate(job) -> Dict:
+        execution = shared_runner().run(question, code) if code else None
+        # Usually ready by now. One still being written is worth a short wait; one still queued behind other
+        # sessions' prefetches is not, so the answer is graded without it rather than holding this worker
+        wait = RUBRIC_WAIT_SECONDS if prefetch and prefetch.status('rubric') == 'running' else 0
+        rubric = prefetch.result('rubric', timeout=wait) if prefetch else None
+        evaluation = evaluate_answer(question, full_answer, category, client=client, execution=execution,
+                                     question_rubric=rubric or "")
+        evaluation['prefetch_job'] = prefetch.id if prefetch else None
+        return evaluation
+    
+    def record(evaluation: Dict):
+        # Scheduled before the attempt is stored so a dashboard keyed on the store version never sees a stale due count
+        shared_scheduler().record_review(user_id, category, question_id, evaluation['score'])
+        
+        # Store performance data, even if the user has left the page by now
+        shared_store().record_attempt(
+            user_id,
+            category,
+            evaluation['score'],
+            question_id=question_id,
+            topic=question.get('topic', question.get('principle')),
+            time_to_answer=time_to_answer,
+            feedback=evaluation['feedback'],
+            sub_scores=evaluation['sub_scores'],
+            created_at=evaluation['timestamp'].timestamp()
+        )
+    
+    job_id = shared_queue().submit(category, evaluate, on_done=record)
+    st.session_state.pending_evaluations.append(job_id)
+
+def clear_finished_evaluations(category: str):
+    """Forget finished evaluation cards for a category, e.g. when a new question is drawn"""
+    queue = shared_queue()
+    st.session_state.pending_evaluations = [
+        job_id for job_id in st.session_state.pending_evaluations
+        if (job := queue.get(job_id)) and not (job.category == category and job.finished)
+    ]
+
+def execution_summary(execution: Optional[Dict]) -> str:
+    """One line on what running the code measured, empty when it was not run"""
+    if not execution:
+        return ""
+    parts = [f"🧪 Tests passed: {execution['passed']}/{execution['total']}"]
+    if execution['complexity']:
+        parts.append(f"measured {execution['complexity']['label']}")
+    if execution['error']:
+        parts.append(f"stopped: {execution['error']}")
+    return " · ".join(parts)
+
+def render_feedback_card(evaluation: Dict, category: str) -> str:
+    """HTML for a graded feedback card"""
+    good_title, bad_title = FEEDBACK_TITLES[category]
+    feedback = evaluation['feedback'].replace("\n", "<br>")
+    summary = execution_summary(evaluation.get('execution'))
+    if summary:
+        feedback = f"<strong>{html.escape(summary)}</strong><br>{feedback}"
+    if evaluation['score'] >= 7:
+        return f"""
+                    <div class="feedback-positive">
+                        <h4>{good_title} Score: {evaluation['score']}/10</h4>
+                        <p>{feedback}</p>
+                    </div>
+                    """
+    return f"""
+                    <div class="feedback-negative">
+                        <h4>{bad_title} Score: {evaluation['score']}/10</h4>
+                        <p>{feedback}</p>
+                    </div>
+                    """
+
+def render_evaluation_cards(category: str, polling: bool):
+    """Draw pending and finished evaluation cards; reruns the app once polling is no longer needed"""
+    queue = shared_queue()
+    jobs = [queue.get(job_id) for job_id in st.session_state.pending_evaluations]
+    jobs = [job for job in jobs if job and job.category == category]
+    
+    for job in reversed(jobs):
+        if job.status == 'done':
+            st.markdown(render_feedback_card(job.result, category), unsafe_allow_html=True)
+            prefetch = shared_prefetcher().get(job.result.get('prefetch_job'))
+            reference = prefetch.result('reference') if prefetch else None
+            if reference:
+                with st.expander("💡 Model answer"):
+                    st.markdown(reference)
+        elif job.status == 'failed':
+            st.error(f"Evaluation failed: {job.error}")
+        else:
+            st.markdown(f"""
+            <div class="question-card">
+                <h4>⏳ Evaluating your answer...</h4>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    if polling and all(job.finished for job in jobs):
+        st.rerun()
+
+def render_reference_material(job: PrefetchJob, polling: bool):
+    """Model answer and likely follow-ups as they become ready; reruns the app once polling is no longer needed"""
+    for name, title in (('reference', "💡 Show model answer"), ('follow_ups', "🔁 Likely follow-up questions")):
+        with st.expander(title):
+            status = job.status(name)
+            if status == 'done':
+                st.markdown(job.result(name))
+            elif status == 'failed':
+                st.error(f"Could not prepare this: {job.error(name)}")
+            elif status == 'cancelled':
+                st.caption("Not prepared for this question.")
+            else:
+                st.caption("⏳ Being prepared in the background...")
+    
+    if polling and job.finished:
+        st.rerun()
+
+def show_reference_material(question: Dict, category: str):
+    """Prefetched reference material for the active question, polled via a fragment until it is ready"""
+    job = active_prefetch(question, category)
+    if job is None:
+        return
+    polling = not job.finished
+    st.fragment(run_every=2 if polling else None)(render_reference_material)(job, polling)
+
+def show_evaluation_results(category: str):
+    """Evaluation cards for this category, polled via a fragment while any job is still running"""
+    queue = shared_queue()
+    jobs = [queue.get(job_id) for job_id in st.session_state.pending_evaluations]
+    jobs = [job for job in jobs if job and job.category == category]
+    if not jobs:
+        return
+    
+    polling = not all(job.finished for job in jobs)
+    st.fragment(run_every=1 if polling else None)(render_evaluation_cards)(category, polling)
+
+def show_mock_interview():
+    """Mock interview interface"""
+    st.header("📝 Mock Interview Session")
+    
+    # Interview type selection
+    interview_type = st.selectbox(
+        "Select Interview Type",
+        ["Data Structures & Algorithms", "System Design", "Behavioral (Leadership Principles)"]
+    )
+    
+    if interview_type == "Data Structures & Algorithms":
+        show_dsa_interview()
+    elif interview_type == "System Design":
+        show_system_design_interview()
+    else:
+        show_behavioral_interview()
+
+def show_dsa_interview():
+    """DSA mock interview"""
+    st.subheader("💻 Data Structures & Algorithms")
+    
+    bank = question_bank()
+    col1, col2 = st.columns(2)
+    with col1:
+        topic = filter_choice("Topic", bank.values("DSA", "topic"), key="dsa_topic")
+    with col2:
+        difficulty = filter_choice("Difficulty", bank.values("DSA", "difficulty"), key="dsa_difficulty")
+    
+    if st.button("Generate New DSA Question"):
+        question = shared_scheduler().next_question(
+            st.session_state.user_id, "DSA", bank, topic=topic, difficulty=difficulty
+        )
+        start_question(question, "DSA")
+    
+    if st.session_state.current_question and st.session_state.current_category == "DSA":
+        question = st.session_state.current_question
+        
+        st.markdown(f"""
+        <div class="question-card">
+            <h4>🎯 {question['topic']} - {question['difficulty']}</h4>
+            <p><strong>Question:</strong> {question['question']}</p>
+            <p><strong>Hints:</strong> {', '.join(question['hints'])}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        show_reference_material(question, "DSA")
+        
+        # Code input
+        st.subheader("💻 Your Solution")
+        language = st.selectbox("Programming Language", ["Python", "Java", "C++", "JavaScript"])
+        # Submissions only run when a sandbox is configured (CODE_RUNNER_SANDBOX); otherwise they are graded from the code
+        runnable = language == "Python" and has_tests(question) and shared_runner().enabled
+        if runnable:
+            signature = f" Implement `{question['signature']}`." if question.get('signature') else ""
+            st.caption(f"Python solutions are run against {len(question['test_cases'])} test cases "
+                       f"and timed at growing input sizes.{signature}")
+        
+        code_solution = st.text_area(
+            "Write your code solution:",
+            height=300,
+            placeholder=f"{question.get('signature', 'def solution(nums, target)')}:\n    # Your code here\n    pass"
+        )
+        
+        # Explanation input
+        explanation = st.text_area(
+            "Explain your approach and time/space complexity:",
+            height=150,
+            placeholder="My approach is to..."
+        )
+        
+        if st.button("Submit Solution", type="primary"):
+            if code_solution and explanation:
+                # Evaluate the solution
+                full_answer = f"Code:\n{code_solution}\n\nExplanation:\n{explanation}"
+                submit_evaluation(question, full_answer, "DSA", code=code_solution if runnable else None)
+                
+                # Clear current question
+                st.session_state.current_question = None
+                st.session_state.current_category = None
+                st.rerun()
+            else:
+                st.error("Please provide both code solution and explanation.")
+    
+    show_evaluation_results("DSA")
+
+def show_system_design_interview():
+    """System design mock interview"""
+    st.subheader("🏗️ System Design")
+    
+    bank = question_bank()
+    focus_area = filter_choice("Focus Area", bank.values("System Design", "focus_areas"), key="system_design_focus")
+    
+    if st.button("Generate New System Design Question"):
+        question = shared_scheduler().next_question(
+            st.session_state.user_id, "System Design", bank, focus_areas=focus_area
+        )
+        start_question(question, "System Design")
+    
+    if st.session_state.current_question and st.session_state.current_category == "System Design":
+        question = st.session_state.current_question
+        
+        st.markdown(f"""
+        <div class="question-card">
+            <h4>🎯 {question['question']}</h4>
+            <p><strong>Focus Areas:</strong> {', '.join(question['focus_areas'])}</p>
+            <p><strong>Key Components:</strong> {', '.join(question['key_components'])}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        show_reference_material(question, "System Design")
+        
+        # System design response sections
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("📋 Requirements & Scale")
+            requirements = st.text_area(
+                "Functional and Non-functional Requirements:",
+                height=150,
+                placeholder="Functional: Users can...\nNon-functional: Handle 1M users..."
+            )
+            
+            st.subheader("🎯 High-Level Design")
+            high_level = st.text_area(
+                "High-level architecture:",
+                height=150,
+                placeholder="Client -> Load Balancer -> API Gateway..."
+            )
+        
+        with col2:
+            st.subheader("🗄️ Database Design")
+            database = st.text_area(
+                "Database schema and choices:",
+                height=150,
+                placeholder="Tables, relationships, indexing..."
+            )
+            
+            st.subheader("⚡ Deep Dive")
+            deep_dive = st.text_area(
+                "Detailed component discussion:",
+                height=150,
+                placeholder="Caching strategy, load balancing..."
+            )
+        
+        if st.button("Submit Design", type="primary"):
+            if all([requirements, high_level, database, deep_dive]):
+                full_answer = f"Requirements: {requirements}\nHigh-level: {high_level}\nDatabase: {database}\nDeep dive: {deep_dive}"
+                submit_evaluation(question, full_answer, "System Design")
+                
+                # Clear current question
+                st.session_state.current_question = None
+                st.session_state.current_category = None
+                st.rerun()
+            else:
+                st.error("Please fill in all sections of the system design.")
+    
+    show_evaluation_results("System Design")
+
+def show_behavioral_interview():
+    """Behavioral interview with STAR format"""
+    st.subheader("🎭 Behavioral Interview (Leadership Principles)")
+    
+    bank = question_bank()
+    principle = filter_choice("Leadership Principle", bank.values("Behavioral", "principle"), key="behavioral_principle")
+    
+    if st.button("Generate New Behavioral Question"):
+        question = shared_scheduler().next_question(
+            st.session_state.user_id, "Behavioral", bank, principle=principle
+        )
+        start_question(question, "Behavioral")
+    
+    if st.session_state.current_question and st.session_state.current_category == "Behavioral":
+        question = st.session_state.current_question
+        
+        st.markdown(f"""
+        <div class="question-card">
+            <h4>🎯 {question['principle']}</h4>
+            <p><strong>Question:</strong> {question['question']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        show_reference_material(question, "Behavioral")
+        
+        st.subheader("⭐ STAR Format Response")
+        st.info("Structure your answer using the STAR method: Situation, Task, Action, Result")
+        
+        # STAR format inputs
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            situation = st.text_area(
+                "🎬 Situation:",
+                height=100,
+                placeholder="Describe the context and background..."
+            )
+            
+            action = st.text_area(
+                "⚡ Action:",
+                height=100,
+                placeholder="What specific actions did you take..."
+            )
+        
+        with col2:
+            task = st.text_area(
+                "📋 Task:",
+                height=100,
+                placeholder="What was your responsibility or goal..."
+            )
+            
+            result = st.text_area(
+                "🎯 Result:",
+                height=100,
+                placeholder="What was the outcome and impact..."
+            )
+        
+        if st.button("Submit STAR Response", type="primary"):
+            if all([situation, task, action, result]):
+                full_answer = f"Situation: {situation}\nTask: {task}\nAction: {action}\nResult: {result}"
+                submit_evaluation(question, full_answer, "Behavioral")
+                
+                # Clear current question
+                st.session_state.current_question = None
+                st.session_state.current_category = None
+                st.rerun()
+            else:
+                st.error("Please complete all STAR components.")
+    
+    show_evaluation_results("Behavioral")
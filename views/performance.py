@@ -0,0 +1,52 @@
+"""Admin-only Performance page over the in-process telemetry"""
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from telemetry import shared_telemetry
+
+def show_performance():
+    """Admin-only view of the instrumented hot paths: latency, tokens, cache hits and errors"""
+    st.header("⏱️ Performance")
+    telemetry = shared_telemetry()
+    spans = pd.DataFrame(telemetry.spans())
+    if spans.empty:
+        st.info("No spans recorded yet. Use the app for a bit and come back.")
+        return
+    
+    spans['ms'] = spans['duration'] * 1000
+    for column in ('error', 'cache_hit', 'input_tokens', 'output_tokens'):
+        if column not in spans:
+            spans[column] = None
+    by_name = spans.groupby('name')
+    summary = pd.DataFrame({
+        'calls': by_name.size(),
+        'p50 ms': by_name['ms'].quantile(0.5),
+        'p95 ms': by_name['ms'].quantile(0.95),
+        'p99 ms': by_name['ms'].quantile(0.99),
+        'error rate': by_name['error'].apply(lambda errors: errors.notna().mean()),
+        'cache hit rate': by_name['cache_hit'].apply(lambda hits: hits.fillna(False).astype(bool).mean()),
+        'input tokens': by_name['input_tokens'].sum(min_count=1),
+        'output tokens': by_name['output_tokens'].sum(min_count=1),
+    }).sort_values('p95 ms', ascending=False)
+    st.caption(f"Last {len(spans)} spans (ring buffer, this process)")
+    st.dataframe(summary.style.format({
+        'p50 ms': '{:.1f}', 'p95 ms': '{:.1f}', 'p99 ms': '{:.1f}',
+        'error rate': '{:.1%}', 'cache hit rate': '{:.1%}',
+        'input tokens': '{:.0f}', 'output tokens': '{:.0f}',
+    }, na_rep='–'), use_container_width=True)
+    
+    name = st.selectbox("Span", list(summary.index))
+    selected = spans[spans['name'] == name]
+    fig = px.histogram(selected, x='ms', nbins=40, title=f"{name} latency (ms)")
+    fig.update_layout(height=300)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    recent = selected.tail(50).iloc[::-1].copy()
+    recent['start'] = pd.to_datetime(recent['start'], unit='s').dt.strftime('%H:%M:%S')
+    st.dataframe(recent.drop(columns=['name', 'duration']), hide_index=True, use_container_width=True)
+    
+    with st.expander("Prometheus export"):
+        metrics = telemetry.prometheus_text()
+        st.download_button("Download metrics", metrics, file_name="metrics.prom")
+        st.code(metrics, language="text")
@@ -0,0 +1,67 @@
+"""Progress Tracking page: per-category averages, trends and topic breakdown"""
+import plotly.express as px
+import streamlit as st
+
+from analytics import DAILY_ROLLING_DAYS, ROLLING_WINDOW, progress_report
+from performance_store import shared_store
+from question_data import CATEGORIES
+from telemetry import traced
+
+@st.cache_resource(max_entries=64)
+@traced("progress_trend_figure")
+def progress_trend_figure(user_id: str, version: int):
+    """Daily score trend per category, rebuilt only when the user's attempt history changes"""
+    daily_rolling = progress_report(user_id, version)['daily_rolling']
+    fig = px.line(
+        daily_rolling,
+        labels={'value': 'Score', 'timestamp': 'Date', 'category': 'Type'},
+        title=f"Score Progression Over Time ({DAILY_ROLLING_DAYS}-day rolling mean)"
+    )
+    return fig
+
+def show_progress_tracking():
+    """Progress tracking and analytics"""
+    st.header("📈 Progress Tracking & Analytics")
+    
+    user_id = st.session_state.user_id
+    version = shared_store().version(user_id)
+    report = progress_report(user_id, version)
+    summary = report['summary']
+    
+    # Performance overview
+    if not summary.empty:
+        columns = st.columns(len(CATEGORIES))
+        
+        for column, category in zip(columns, CATEGORIES):
+            with column:
+                if category in summary.index:
+                    row = summary.loc[category]
+                    st.metric(
+                        f"{category} Average",
+                        f"{row['average']:.1f}/10",
+                        f"{row['improvement']:+.1f}",
+                        help=f"{int(row['attempts'])} attempts; delta compares your latest {ROLLING_WINDOW} with your first {ROLLING_WINDOW}"
+                    )
+        
+        # Detailed charts
+        st.subheader("📊 Performance Trends")
+        st.plotly_chart(progress_trend_figure(user_id, version), use_container_width=True)
+        
+        if not report['topics'].empty:
+            st.subheader("🧩 Scores by Topic & Leadership Principle")
+            st.dataframe(report['topics'], use_container_width=True)
+    else:
+        st.info("Complete some mock interviews to see your progress here!")
+    
+    # Study recommendations
+    st.subheader("🎯 Personalized Recommendations")
+    
+    recommendations = [
+        "Focus on dynamic programming problems - detected weakness in recent DSA sessions",
+        "Practice more system design scalability questions",
+        "Work on Leadership Principle: 'Dive Deep' - strengthen your examples",
+        "Schedule a full mock interview session tomorrow"
+    ]
+    
+    for rec in recommendations:
+        st.markdown(f"• {rec}")
@@ -0,0 +1,57 @@
+"""Resources page: curated links, study guides and videos"""
+import streamlit as st
+
+def show_resources():
+    """Curated resources and links"""
+    st.header("📚 Interview Resources & Links")
+    
+    tabs = st.tabs(["🔗 External Resources", "📖 Study Guides", "🎥 Video Resources"])
+    
+    with tabs[0]:
+        st.subheader("Essential Preparation Links")
+        
+        resources = {
+            "LeetCode": "https://leetcode.com/problemset/all/",
+            "System Design Primer": "https://github.com/donnemartin/system-design-primer",
+            "Grokking the System Design": "https://www.educative.io/courses/grokking-the-system-design-interview",
+            "Amazon Leadership Principles": "https://www.amazon.jobs/en/principles",
+            "Glassdoor Amazon Reviews": "https://www.glassdoor.com/Interview/Amazon-Interview-Questions-E6036.htm"
+        }
+        
+        for name, url in resources.items():
+            st.markdown(f"[{name}]({url})")
+    
+    with tabs[1]:
+        st.subheader("Study Guides")
+        st.markdown("""
+        ## DSA Study Plan (3 days)
+        - **Day 1**: Arrays, Strings, Hash Maps (8 problems)
+        - **Day 2**: Trees, Graphs, Dynamic Programming (6 problems)  
+        - **Day 3**: Review and mock interviews
+        
+        ## System Design Checklist
+        - [ ] Requirements gathering
+        - [ ] Capacity estimation
+        - [ ] High-level design
+        - [ ] Database design
+        - [ ] Detailed component design
+        - [ ] Scaling and optimization
+        
+        ## Leadership Principles Focus
+        - **Customer Obsession**: 2 stories prepared
+        - **Ownership**: 2 stories prepared
+        - **Dive Deep**: 1 technical deep-dive story
+        - **Deliver Results**: 1 challenging project story
+        """)
+    
+    with tabs[2]:
+        st.subheader("Recommended Videos")
+        video_resources = [
+            "Amazon System Design Interview - Real Example",
+            "Leadership Principles Deep Dive",
+            "Coding Interview Strategies",
+            "Behavioral Interview Best Practices"
+        ]
+        
+        for video in video_resources:
+            st.markdown(f"🎥 {video}")